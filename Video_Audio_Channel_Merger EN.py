@@ -1,122 +1,249 @@
 import sys
 import os
-import subprocess
-import re
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QFileDialog, QTextEdit, QCheckBox, QGroupBox, QListWidget, QListWidgetItem,
-    QHBoxLayout, QScrollArea, QProgressBar
+    QFileDialog, QPlainTextEdit, QCheckBox, QGroupBox, QTableView, QHeaderView, QAbstractItemView,
+    QHBoxLayout, QScrollArea, QProgressBar, QSpinBox, QComboBox, QLineEdit, QFormLayout
 )
-from PyQt5.QtCore import QThread, pyqtSignal, QMimeData, Qt
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, QMimeData, Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QFont
+
+from audio_merger.concurrency import ConcurrencyController
+from audio_merger.encoding import PRESETS, EncoderSettings
+from audio_merger.engine import AUDIO_ONLY_FORMATS, MergeJob, create_runner, default_output_path, segment_duration
+from audio_merger.filelist import (
+    FileRecord, FileStore, STATUS_PROBING, STATUS_PROBE_FAILED, STATUS_READY, STATUS_QUEUED, STATUS_RUNNING,
+    STATUS_DONE, STATUS_SKIPPED, STATUS_FAILED, STATUS_STOPPED
+)
+from audio_merger.journal import JobJournal, journal_path
+from audio_merger.logsink import LogBuffer, default_log_path
+from audio_merger.mixing import (
+    LOUDNESS_DYNAUDNORM, LOUDNESS_LOUDNORM, MIXER_AMIX, MIXER_NUMPY, MixSettings, numpy_available, parse_gains,
+    parse_weights
+)
+from audio_merger.outputs import parse_profiles
+from audio_merger.probe import ProbeCache, ProbePool, describe_audio_stream
+from audio_merger.progress import BatchProgress
+from audio_merger.report import BatchReport, default_report_path
+from audio_merger.scan import DEFAULT_PATTERNS, FolderScan, MediaFilter, parse_patterns
+from audio_merger.scheduler import (
+    QUEUE_FIFO, QUEUE_LONGEST_FIRST, QUEUE_SHORTEST_FIRST, JobScheduler, default_concurrency, default_queue_policy,
+    order_jobs
+)
+from audio_merger.selection import RuleError, apply_rule, parse_rule
+from audio_merger.tracks import KEEP_ALL, KEEP_SELECTED, TrackSettings
+from audio_merger.utils import file_size, parse_time
+
+TOTAL_PROGRESS_LABEL = "Total Processing Progress:"
+UI_REFRESH_INTERVAL_MS = 100  # Console and progress bars are refreshed this often
+CONSOLE_MAX_LINES = 5000  # Older console lines are discarded, full logs are kept on disk
+ENCODER_PRESET_LABELS = {
+    'default': "FFmpeg default",
+    'fast-aac': "Fast AAC (192k stereo)",
+    'flac-archive': "FLAC archive (lossless)",
+    'opus-small': "Opus (small files)",
+}
+CUSTOM_PRESET_LABEL = "Custom"
+STATUS_LABELS = {
+    STATUS_PROBING: "Probing…",
+    STATUS_PROBE_FAILED: "Probe failed",
+    STATUS_READY: "Ready",
+    STATUS_QUEUED: "Queued",
+    STATUS_RUNNING: "Processing",
+    STATUS_DONE: "Done",
+    STATUS_SKIPPED: "Skipped",
+    STATUS_FAILED: "Failed",
+    STATUS_STOPPED: "Stopped",
+}
+FILE_COLUMNS = ("File", "Duration", "Audio Streams", "Status", "Progress")
+STATUS_COLORS = {
+    STATUS_PROBING: Qt.gray,
+    STATUS_PROBE_FAILED: Qt.red,
+    STATUS_DONE: Qt.darkGreen,
+    STATUS_SKIPPED: Qt.darkGreen,
+    STATUS_FAILED: Qt.red,
+    STATUS_STOPPED: Qt.red,
+}
+QUEUE_POLICY_LABELS = {QUEUE_FIFO: "as added", QUEUE_LONGEST_FIRST: "longest first", QUEUE_SHORTEST_FIRST: "shortest first"}
 
 class FFmpegWorker(QThread):
-    log_output = pyqtSignal(str)
-    progress_update = pyqtSignal(int)  # Reflects current file progress in percentage
+    progress_update = pyqtSignal(object)  # FFmpegProgress of the current file
     finished_single_file = pyqtSignal(str, bool) 
     finished_all_files = pyqtSignal()
 
-    def __init__(self, input_file, output_file, selected_channels, total_duration_sec):
+    def __init__(self, input_file, output_file, selected_channels, total_duration_sec, log_sink, encoder=None,
+                 journal=None, mix=None, tracks=None, audio_streams=None, profiles=None, start_sec=None, end_sec=None,
+                 audio_only=False):
         super().__init__()
         self.input_file = input_file
         self.output_file = output_file
         self.selected_channels = selected_channels
-        self.total_duration_sec = total_duration_sec  # Total duration for FFmpeg progress
-        self.is_running = True
+        self.log = log_sink  # Thread-safe callable, e.g. LogBuffer.write
+        self.log_file = default_log_path(output_file)
+        self.runner = create_runner(
+            MergeJob(input_file, output_file, selected_channels, total_duration_sec, self.log_file, encoder, mix,
+                     tracks, audio_streams, profiles, start_sec, end_sec, audio_only),
+            on_output=self.log,
+            on_progress=self.progress_update.emit,
+            journal=journal
+        )
+
+    @property
+    def is_running(self):
+        return not self.runner.stopped
 
     def stop(self):
-        self.is_running = False
+        self.runner.stop()
 
     def run(self):
         if not self.is_running:
-            self.log_output.emit(f"Processing stopped: {os.path.basename(self.input_file)}")
+            self.log(f"Processing stopped: {os.path.basename(self.input_file)}")
             self.finished_single_file.emit(self.input_file, False) 
             return
 
         if not self.selected_channels:
-            self.log_output.emit(f"No audio channels selected for '{os.path.basename(self.input_file)}'. Skipping.")
+            self.log(f"No audio channels selected for '{os.path.basename(self.input_file)}'. Skipping.")
             self.finished_single_file.emit(self.input_file, False) 
             return
 
-        num_selected_channels = len(self.selected_channels)
-        corrected_ffmpeg_indices = list(range(num_selected_channels)) 
-        
-        audio_inputs = ''.join([f"[0:a:{i}]" for i in corrected_ffmpeg_indices])
-        
-        command = [
-            "ffmpeg",
-            "-i", self.input_file,
-            "-map", "0:v",
-            "-c:v", "copy",
-            "-filter_complex", f"{audio_inputs}amix=inputs={num_selected_channels}:duration=longest[a]",
-            "-map", "[a]",
-            "-y",  # Overwrite output file if exists
-            self.output_file
-        ]
-
-        self.log_output.emit(f"\n--- Starting FFmpeg process for '{os.path.basename(self.input_file)}' ---")
-        self.log_output.emit(f"Output file: {os.path.basename(self.output_file)}")
-        self.log_output.emit(f"Command: {' '.join(command)}")
-
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # Hide window
-
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # Redirect stderr to stdout
-            text=True,
-            startupinfo=startupinfo
-        )
+        job = self.runner.job
+        if job.total_duration_sec > 0 and job.duration_sec <= 0:
+            self.log(f"The segment starts after the end of '{os.path.basename(self.input_file)}'. Skipping.")
+            self.finished_single_file.emit(self.input_file, False)
+            return
 
-        success = True
-        for line in process.stdout:
-            if not self.is_running:
-                process.terminate()
-                self.log_output.emit(f"Processing stopped: {os.path.basename(self.input_file)}")
-                success = False
-                break
-            
-            self.log_output.emit(line.strip())  # Log each line
-
-            # Parse FFmpeg progress output
-            time_match = re.search(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})", line)
-            if time_match:
-                time_str = time_match.group(1)
-                h, m, s = map(float, time_str.split(':'))
-                current_time_sec = h * 3600 + m * 60 + s
-
-                if self.total_duration_sec > 0:
-                    progress_percent = int((current_time_sec / self.total_duration_sec) * 100)
-                    self.progress_update.emit(min(100, progress_percent))  # Don't exceed 100%
-
-        process.wait()
-        if process.returncode != 0 and self.is_running:
-            self.log_output.emit(f"ERROR: An error occurred while processing '{os.path.basename(self.input_file)}'. Error code: {process.returncode}")
-            success = False
-        
-        if self.is_running and success:
-            self.log_output.emit(f"--- Processing completed for '{os.path.basename(self.input_file)}' ---")
-            self.progress_update.emit(100)  # Set to 100% when done
+        if self.runner.already_complete():
+            self.log(f"--- Skipped '{os.path.basename(self.input_file)}': output already completed with the same settings ---")
+            self.finished_single_file.emit(self.input_file, True)
+            return
+
+        self.log(f"\n--- Starting FFmpeg process for '{os.path.basename(self.input_file)}' ---")
+        for variant in self.runner.pending:
+            self.log(f"Output file: {os.path.basename(variant.output_file)}")
+        self.log(f"Command: {' '.join(self.runner.command)}")
+
+        success = self.runner.run()
+        if not self.is_running:
+            self.log(f"Processing stopped: {os.path.basename(self.input_file)}")
+        elif self.runner.returncode != 0:
+            self.log(f"ERROR: An error occurred while processing '{os.path.basename(self.input_file)}'. Error code: {self.runner.returncode}")
+            self.log(f"Full FFmpeg log: {self.log_file}")
+
+        if self.runner.job.profiles:  # Outcome of every output written by this run
+            for output_file, written in self.runner.results.items():
+                self.log(f"Output '{os.path.basename(output_file)}': {'written' if written else 'failed'}")
+
+        if success:
+            self.log(f"--- Processing completed for '{os.path.basename(self.input_file)}' ---")
         elif not self.is_running:
-            self.log_output.emit(f"--- Processing for '{os.path.basename(self.input_file)}' stopped by user ---")
-            self.progress_update.emit(0)  # Reset to 0 when stopped
+            self.log(f"--- Processing for '{os.path.basename(self.input_file)}' stopped by user ---")
 
         self.finished_single_file.emit(self.input_file, success)
 
 
+class FileTableModel(QAbstractTableModel):
+    """Table view of the FileStore; cells are only formatted for the rows the view paints."""
+
+    def __init__(self, store, format_duration):
+        super().__init__()
+        self.store = store
+        self.format_duration = format_duration
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(FILE_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return FILE_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        file_data = self.store[index.row()]
+        status = file_data.status
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return os.path.basename(file_data.path)
+            if column == 1:
+                return "" if status == STATUS_PROBING else self.format_duration(file_data.duration_sec)
+            if column == 2:
+                return "" if status == STATUS_PROBING else f"{len(file_data.selected_channels)} of {len(file_data.all_channels)} selected"
+            if column == 3:
+                return STATUS_LABELS[status]
+            if column == 4:
+                percent = file_data.percent
+                return "" if percent is None else f"{percent}%"
+        elif role == Qt.ToolTipRole and column == 0:
+            return file_data.path
+        elif role == Qt.ForegroundRole and status in STATUS_COLORS:
+            return QBrush(STATUS_COLORS[status])
+        elif role == Qt.BackgroundRole and status == STATUS_RUNNING:
+            return QBrush(Qt.yellow)
+        elif role == Qt.FontRole and file_data.priority:
+            font = QFont()
+            font.setBold(True)  # Pinned to the front of the queue
+            return font
+        return None
+
+    def add_file(self, file_data):
+        """Appends a row and returns it, or None when the path is already listed."""
+        row = len(self.store)
+        if self.store.row_of(file_data.path) is not None:
+            return None
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.add(file_data)
+        self.endInsertRows()
+        return row
+
+    def update_rows(self, first_row, last_row=None):
+        last_row = first_row if last_row is None else last_row
+        self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, len(FILE_COLUMNS) - 1))
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
+
+
 class AudioMergeGUI(QWidget):
+    probe_finished = pyqtSignal(str, object, str)  # path, media info (None on error), error message
+    scan_files_found = pyqtSignal(object, list)  # scan, found paths
+    scan_finished = pyqtSignal(object, int)  # scan, number of files found
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FFmpeg Audio Merger (Batch Processing & Channel Selection) by alfa")
         self.setGeometry(100, 100, 1000, 800)  # Increased window size
         self.setAcceptDrops(True)
 
-        self.input_files_data = [] 
-        self.current_processing_index = 0
-        self.worker = None
+        self.input_files_data = FileStore()
+        self.probe_cache = ProbeCache()
+        self.probe_pool = ProbePool(self.probe_cache)
+        self.pending_probes = {}  # path -> row of files still being probed
+        self.probe_finished.connect(self.on_probe_finished)
+        self.folder_scans = set()  # FolderScans still enumerating
+        self.scan_files_found.connect(self.on_scan_files_found)
+        self.scan_finished.connect(self.on_scan_finished)
+        self.scheduler = None
+        self.encoder_settings = None
+        self.mix_settings = None
+        self.track_settings = None
+        self.output_profiles = []
+        self.segment_start_sec = None
+        self.segment_end_sec = None
+        self.audio_only_format = None  # None keeps the video
+        self.journal = None
+        self.applying_preset = False
+        self.batch_progress = None
+        self.batch_report = None
+        self.concurrency_controller = None  # Tunes the parallel job count during an adaptive batch
+        self.log_buffer = LogBuffer()  # Filled from any thread, flushed to the console by ui_timer
+        self.pending_progress = {}  # file index -> latest FFmpegProgress, applied on the next ui_timer tick
+        self.workers = {}  # file index -> running FFmpegWorker
 
         main_layout = QHBoxLayout() 
 
@@ -130,19 +257,47 @@ class AudioMergeGUI(QWidget):
         self.btn_select_files = QPushButton("Select File(s)")
         self.btn_select_files.clicked.connect(self.select_input_files)
         input_button_layout.addWidget(self.btn_select_files)
+
+        self.btn_select_folder = QPushButton("Add Folder")
+        self.btn_select_folder.clicked.connect(self.select_input_folder)
+        input_button_layout.addWidget(self.btn_select_folder)
         
         self.btn_clear_files = QPushButton("Clear List")
         self.btn_clear_files.clicked.connect(self.clear_file_list)
         input_button_layout.addWidget(self.btn_clear_files)
+
+        self.btn_pin_file = QPushButton("Pin to Front")
+        self.btn_pin_file.setToolTip("Process the selected file before all others (click again to unpin). Pinned files are shown in bold.")
+        self.btn_pin_file.clicked.connect(self.toggle_pinned_file)
+        input_button_layout.addWidget(self.btn_pin_file)
         
         input_layout.addLayout(input_button_layout)
 
-        self.file_list_widget = QListWidget()
-        self.file_list_widget.setSelectionMode(QListWidget.SingleSelection)
-        self.file_list_widget.itemSelectionChanged.connect(self.on_file_selected)
-        input_layout.addWidget(self.file_list_widget)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Filter:"))
+        self.edit_file_filter = QLineEdit(" ".join(DEFAULT_PATTERNS))
+        self.edit_file_filter.setToolTip("File name patterns or extensions picked from folders, e.g. *.mkv *.mp4")
+        filter_layout.addWidget(self.edit_file_filter)
+        self.checkbox_recursive = QCheckBox("Include Subfolders")
+        self.checkbox_recursive.setChecked(True)
+        filter_layout.addWidget(self.checkbox_recursive)
+        input_layout.addLayout(filter_layout)
+
+        self.file_model = FileTableModel(self.input_files_data, self.format_duration)
+        self.file_table = QTableView()
+        self.file_table.setModel(self.file_model)
+        self.file_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.file_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.file_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_table.setWordWrap(False)
+        self.file_table.verticalHeader().hide()
+        self.file_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Rows are never measured one by one
+        self.file_table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.file_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.file_table.selectionModel().selectionChanged.connect(self.on_file_selected)
+        input_layout.addWidget(self.file_table)
         
-        input_layout.addWidget(QLabel("You can drag and drop files here."))
+        input_layout.addWidget(QLabel("You can drag and drop files and folders here."))
         input_group.setLayout(input_layout)
         left_layout.addWidget(input_group)
 
@@ -157,17 +312,139 @@ class AudioMergeGUI(QWidget):
         output_group.setLayout(output_layout)
         left_layout.addWidget(output_group)
 
+        # Output Audio Encoding Section
+        encoding_group = QGroupBox("Output Audio Encoding")
+        encoding_layout = QFormLayout()
+        self.combo_encoder_preset = QComboBox()
+        for preset_name, label in ENCODER_PRESET_LABELS.items():
+            self.combo_encoder_preset.addItem(label, preset_name)
+        self.combo_encoder_preset.addItem(CUSTOM_PRESET_LABEL, None)
+        self.combo_encoder_preset.currentIndexChanged.connect(self.apply_encoder_preset)
+        encoding_layout.addRow("Preset:", self.combo_encoder_preset)
+
+        self.combo_codec = QComboBox()
+        self.combo_codec.setEditable(True)
+        self.combo_codec.addItems(["", "aac", "flac", "libopus", "ac3", "pcm_s16le"])
+        self.combo_codec.lineEdit().setPlaceholderText("default")
+        encoding_layout.addRow("Codec:", self.combo_codec)
+
+        self.edit_bitrate = QLineEdit()
+        self.edit_bitrate.setPlaceholderText("default, e.g. 192k")
+        encoding_layout.addRow("Bitrate:", self.edit_bitrate)
+
+        self.combo_sample_rate = QComboBox()
+        self.combo_sample_rate.setEditable(True)
+        self.combo_sample_rate.addItems(["", "44100", "48000", "96000"])
+        self.combo_sample_rate.lineEdit().setPlaceholderText("default")
+        encoding_layout.addRow("Sample Rate:", self.combo_sample_rate)
+
+        self.combo_channel_layout = QComboBox()
+        self.combo_channel_layout.setEditable(True)
+        self.combo_channel_layout.addItems(["", "mono", "stereo", "5.1", "7.1"])
+        self.combo_channel_layout.lineEdit().setPlaceholderText("default")
+        encoding_layout.addRow("Channel Layout:", self.combo_channel_layout)
+
+        self.spin_encoder_threads = QSpinBox()
+        self.spin_encoder_threads.setRange(0, 64)
+        self.spin_encoder_threads.setSpecialValueText("auto")
+        encoding_layout.addRow("Encoder Threads:", self.spin_encoder_threads)
+
+        self.combo_mixer = QComboBox()
+        self.combo_mixer.addItem("FFmpeg amix", MIXER_AMIX)
+        self.combo_mixer.addItem("NumPy (sum + limiter)", MIXER_NUMPY)
+        self.combo_mixer.setToolTip("amix lowers every stream by the number of mixed streams. The NumPy mixer keeps each stream at full level and a limiter prevents clipping.")
+        if not numpy_available():  # Offered only when NumPy can be imported
+            self.combo_mixer.model().item(1).setEnabled(False)
+            self.combo_mixer.setItemData(1, "NumPy is not installed (pip install numpy).", Qt.ToolTipRole)
+        encoding_layout.addRow("Mixer:", self.combo_mixer)
+
+        self.edit_gains = QLineEdit()
+        self.edit_gains.setPlaceholderText("e.g. 1=-6 2=+3 (dB)")
+        self.edit_gains.setToolTip("Gain per stream index in dB, applied before mixing.")
+        encoding_layout.addRow("Stream Gains:", self.edit_gains)
+
+        self.edit_weights = QLineEdit()
+        self.edit_weights.setPlaceholderText("e.g. 2=0.5")
+        self.edit_weights.setToolTip("amix weight per stream index (default 1); with the NumPy mixer the weight multiplies the gain.")
+        encoding_layout.addRow("Stream Weights:", self.edit_weights)
+
+        self.checkbox_normalize = QCheckBox("Scale amix inputs")
+        self.checkbox_normalize.setChecked(True)
+        self.checkbox_normalize.setToolTip("Off: amix sums the streams instead of lowering each by the number of streams.")
+        encoding_layout.addRow("", self.checkbox_normalize)
+
+        self.combo_loudness = QComboBox()
+        self.combo_loudness.addItem("Off", None)
+        self.combo_loudness.addItem("loudnorm (EBU R128, -23 LUFS)", LOUDNESS_LOUDNORM)
+        self.combo_loudness.addItem("dynaudnorm (dynamic)", LOUDNESS_DYNAUDNORM)
+        self.combo_loudness.setToolTip("Normalizes the loudness of the mix in the same ffmpeg pass.")
+        encoding_layout.addRow("Loudness:", self.combo_loudness)
+
+        for field_signal in (self.combo_codec.editTextChanged, self.edit_bitrate.textChanged,
+                             self.combo_sample_rate.editTextChanged, self.combo_channel_layout.editTextChanged,
+                             self.spin_encoder_threads.valueChanged):
+            field_signal.connect(self.on_encoder_field_edited)
+        encoding_group.setLayout(encoding_layout)
+        left_layout.addWidget(encoding_group)
+
+        # Output Tracks Section
+        tracks_group = QGroupBox("Output Tracks")
+        tracks_layout = QFormLayout()
+        self.combo_keep_audio = QComboBox()
+        self.combo_keep_audio.addItem("No", None)
+        self.combo_keep_audio.addItem("Mixed streams", KEEP_SELECTED)
+        self.combo_keep_audio.addItem("All audio streams", KEEP_ALL)
+        self.combo_keep_audio.setToolTip("Copies original audio streams into the output next to the mix, without re-encoding them.")
+        tracks_layout.addRow("Keep Original Audio:", self.combo_keep_audio)
+        self.checkbox_keep_subtitles = QCheckBox("Keep subtitles")
+        tracks_layout.addRow("", self.checkbox_keep_subtitles)
+        self.checkbox_keep_data = QCheckBox("Keep data streams")
+        self.checkbox_keep_data.setToolTip("Data streams need a container that stores them, e.g. MP4 or MOV.")
+        tracks_layout.addRow("", self.checkbox_keep_data)
+        self.edit_mix_title = QLineEdit()
+        self.edit_mix_title.setPlaceholderText("e.g. Mix")
+        tracks_layout.addRow("Mix Title:", self.edit_mix_title)
+        self.edit_mix_language = QLineEdit()
+        self.edit_mix_language.setPlaceholderText("e.g. eng")
+        tracks_layout.addRow("Mix Language:", self.edit_mix_language)
+        self.edit_profiles = QLineEdit()
+        self.edit_profiles.setPlaceholderText("e.g. master=mkv:flac-archive proxy=mp4:fast-aac")
+        self.edit_profiles.setToolTip("Writes one file per profile (NAME=CONTAINER[:PRESET]) from a single decode of the input. Profiles without a preset use the encoding settings above.")
+        tracks_layout.addRow("Output Profiles:", self.edit_profiles)
+        tracks_group.setLayout(tracks_layout)
+        left_layout.addWidget(tracks_group)
+
+        # Segment and Format Section
+        segment_group = QGroupBox("Segment and Format")
+        segment_layout = QFormLayout()
+        self.edit_segment_start = QLineEdit()
+        self.edit_segment_start.setPlaceholderText("e.g. 1:30 (default: beginning)")
+        self.edit_segment_start.setToolTip("Processes only this part of each file, e.g. a 30-second excerpt to check the mix. Stream-copied video starts at the keyframe before the start.")
+        segment_layout.addRow("Start:", self.edit_segment_start)
+        self.edit_segment_end = QLineEdit()
+        self.edit_segment_end.setPlaceholderText("e.g. 2:00 (default: end)")
+        self.edit_segment_end.setToolTip("Processes only this part of each file, e.g. a 30-second excerpt to check the mix. Stream-copied video starts at the keyframe before the start.")
+        segment_layout.addRow("End:", self.edit_segment_end)
+        self.combo_output_format = QComboBox()
+        self.combo_output_format.addItem("Video + mixed audio (MKV)", None)
+        for audio_format in AUDIO_ONLY_FORMATS:
+            self.combo_output_format.addItem(f"Audio only ({audio_format.upper()})", audio_format)
+        self.combo_output_format.setToolTip("Audio only writes just the mix without the video, which takes seconds instead of a full remux.")
+        segment_layout.addRow("Output:", self.combo_output_format)
+        segment_group.setLayout(segment_layout)
+        left_layout.addWidget(segment_group)
+
         # Progress Bars
         progress_group = QGroupBox("Progress")
         progress_layout = QVBoxLayout()
 
-        self.label_current_file_progress = QLabel("Current File Progress:")
+        self.label_current_file_progress = QLabel("Running Jobs Progress:")
         progress_layout.addWidget(self.label_current_file_progress)
         self.current_file_progressbar = QProgressBar()
         self.current_file_progressbar.setTextVisible(True)
         progress_layout.addWidget(self.current_file_progressbar)
 
-        self.label_total_progress = QLabel("Total Processing Progress:")
+        self.label_total_progress = QLabel(TOTAL_PROGRESS_LABEL)
         progress_layout.addWidget(self.label_total_progress)
         self.total_progressbar = QProgressBar()
         self.total_progressbar.setTextVisible(True)
@@ -179,6 +456,34 @@ class AudioMergeGUI(QWidget):
 
         # Process Buttons
         process_button_layout = QHBoxLayout()
+        process_button_layout.addWidget(QLabel("Parallel Jobs:"))
+        self.spin_parallel_jobs = QSpinBox()
+        self.spin_parallel_jobs.setRange(1, max(64, default_concurrency()))
+        self.spin_parallel_jobs.setValue(default_concurrency())
+        process_button_layout.addWidget(self.spin_parallel_jobs)
+        self.checkbox_adaptive = QCheckBox("Adaptive")
+        self.checkbox_adaptive.setToolTip("Tune the number of parallel jobs during the batch from the measured throughput, CPU load and disk wait, starting at the value on the left.")
+        process_button_layout.addWidget(self.checkbox_adaptive)
+
+        process_button_layout.addWidget(QLabel("Queue Order:"))
+        self.combo_queue_order = QComboBox()
+        self.combo_queue_order.addItem("Automatic", None)
+        self.combo_queue_order.addItem("As Added", QUEUE_FIFO)
+        self.combo_queue_order.addItem("Longest First", QUEUE_LONGEST_FIRST)
+        self.combo_queue_order.addItem("Shortest First", QUEUE_SHORTEST_FIRST)
+        self.combo_queue_order.setToolTip("Order in which files are started. Automatic runs the longest files first when several jobs run in parallel, so the batch does not end with one long file running alone.")
+        process_button_layout.addWidget(self.combo_queue_order)
+
+        self.checkbox_skip_completed = QCheckBox("Skip Completed")
+        self.checkbox_skip_completed.setToolTip("Skip files whose output was already completed with the same settings (resume an interrupted batch).")
+        self.checkbox_skip_completed.setChecked(True)
+        process_button_layout.addWidget(self.checkbox_skip_completed)
+
+        self.checkbox_incremental = QCheckBox("Incremental")
+        self.checkbox_incremental.setToolTip("Trust the recorded input fingerprint (path, size, modification time, streams, settings) and skip unchanged files without re-reading their outputs.")
+        self.checkbox_skip_completed.toggled.connect(self.checkbox_incremental.setEnabled)
+        process_button_layout.addWidget(self.checkbox_incremental)
+
         self.btn_run = QPushButton("Process All")
         self.btn_run.clicked.connect(self.start_batch_processing)
         process_button_layout.addWidget(self.btn_run)
@@ -191,8 +496,9 @@ class AudioMergeGUI(QWidget):
         left_layout.addLayout(process_button_layout)
         
         # Console Output
-        self.output_log = QTextEdit()
+        self.output_log = QPlainTextEdit()
         self.output_log.setReadOnly(True)
+        self.output_log.setMaximumBlockCount(CONSOLE_MAX_LINES)
         left_layout.addWidget(QLabel("Console Output:"))
         left_layout.addWidget(self.output_log)
 
@@ -202,6 +508,8 @@ class AudioMergeGUI(QWidget):
         right_layout = QVBoxLayout()
         self.channel_selection_group = QGroupBox("Selected File's Audio Channels")
         self.channel_checkbox_layout = QVBoxLayout()
+        self.channel_checkboxes = []  # Channel checkboxes are created once and reused for every file
+        self.selected_file_row = None
         
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -218,13 +526,42 @@ class AudioMergeGUI(QWidget):
         self.channel_selection_group.layout().addWidget(scroll_area)
         
         right_layout.addWidget(self.channel_selection_group)
+
+        rule_group = QGroupBox("Select Channels in All Files")
+        rule_layout = QVBoxLayout()
+        self.edit_channel_rule = QLineEdit()
+        self.edit_channel_rule.setPlaceholderText("e.g. lang=eng codec=aac, title!=commentary, index=1,2")
+        self.edit_channel_rule.setToolTip("Conditions on index, language, title (regex), codec and channels; a stream is selected when it meets all of them.")
+        self.edit_channel_rule.returnPressed.connect(self.apply_channel_rule)
+        rule_layout.addWidget(self.edit_channel_rule)
+        self.btn_apply_rule = QPushButton("Apply to All Files")
+        self.btn_apply_rule.clicked.connect(self.apply_channel_rule)
+        rule_layout.addWidget(self.btn_apply_rule)
+        rule_group.setLayout(rule_layout)
+        right_layout.addWidget(rule_group)
         main_layout.addLayout(right_layout, 1)
 
 
         self.setLayout(main_layout)
+
+        self.ui_timer = QTimer(self)
+        self.ui_timer.timeout.connect(self.flush_log)
+        self.ui_timer.timeout.connect(self.flush_progress)
+        self.ui_timer.timeout.connect(self.adapt_concurrency)
+        self.ui_timer.start(UI_REFRESH_INTERVAL_MS)
         
         self.output_directory = ""
 
+    def append_log(self, message):
+        """Queues a console message; it is shown on the next ui_timer tick."""
+        self.log_buffer.write(message)
+
+    def flush_log(self):
+        """Writes every buffered log line to the console in one update."""
+        lines = self.log_buffer.drain()
+        if lines:
+            self.output_log.appendPlainText("\n".join(lines))
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -232,86 +569,106 @@ class AudioMergeGUI(QWidget):
             event.ignore()
 
     def dropEvent(self, event):
+        media_filter = self.media_filter()
+        folders = []
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
-            if os.path.isfile(file_path) and (file_path.lower().endswith(('.mp4', '.mkv', '.mov', '.avi'))):
+            if os.path.isdir(file_path):
+                folders.append(file_path)
+            elif os.path.isfile(file_path) and media_filter.matches(os.path.basename(file_path)):
                 self.add_file_to_list(file_path)
             else:
-                self.output_log.append(f"Invalid file dragged: {os.path.basename(file_path) if os.path.isfile(file_path) else file_path}")
+                self.append_log(f"Invalid file dragged: {os.path.basename(file_path) if os.path.isfile(file_path) else file_path}")
+        if folders:
+            self.scan_folders(folders)
         event.acceptProposedAction()
 
     def select_input_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Input Video(s)", "", "Video Files (*.mp4 *.mkv *.mov *.avi)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Select Input Video(s)", "", f"Video Files ({self.media_filter().dialog_filter()})")
         if files:
             for file_path in files:
                 self.add_file_to_list(file_path)
 
+    def select_input_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Input Folder")
+        if folder:
+            self.scan_folders([folder])
+
+    def media_filter(self):
+        return MediaFilter(parse_patterns(self.edit_file_filter.text()))
+
+    def scan_folders(self, folders):
+        """Lists the folders on a background thread; found files are added and probed in batches."""
+        self.append_log(f"Scanning {', '.join(folders)} for {self.media_filter().dialog_filter()}...")
+        scan = FolderScan(
+            folders, self.media_filter(), self.checkbox_recursive.isChecked(),
+            on_files=self.scan_files_found.emit, on_finished=self.scan_finished.emit
+        )
+        self.folder_scans.add(scan)
+        scan.start()
+
+    def on_scan_files_found(self, scan, paths):
+        if scan not in self.folder_scans:
+            return  # The list was cleared while this folder was being scanned
+        for file_path in paths:
+            self.add_file_to_list(file_path)
+
+    def on_scan_finished(self, scan, count):
+        if scan in self.folder_scans:
+            self.folder_scans.discard(scan)
+            self.append_log(f"Folder scan finished: {count} file(s) found.")
+
+    def save_probe_cache(self):
+        """Persists probe results so re-added files are not probed again."""
+        try:
+            self.probe_cache.save()
+        except OSError as e:
+            self.append_log(f"ERROR: Could not save the probe cache: {e}")
+
     def add_file_to_list(self, file_path):
-        if any(data['path'] == file_path for data in self.input_files_data):
+        file_index = self.file_model.add_file(FileRecord(file_path))
+        if file_index is None:
             return
 
-        duration_sec = self.detect_video_duration(file_path)
-        duration_str = self.format_duration(duration_sec)
-        
-        all_channels = self.detect_audio_channels(file_path)
-        initial_selected_channels = list(all_channels)  # Initially all selected
-        
-        file_data = {
-            'path': file_path,
-            'duration_sec': duration_sec,  # Add duration info
-            'all_channels': all_channels,
-            'selected_channels': initial_selected_channels, 
-            'checkboxes': [] 
-        }
-        self.input_files_data.append(file_data)
-        item = QListWidgetItem(f"{os.path.basename(file_path)} ({duration_str})")  # Add duration to name
-        item.setData(Qt.UserRole, len(self.input_files_data) - 1)
-        self.file_list_widget.addItem(item)
-        self.output_log.append(f"'{os.path.basename(file_path)}' added. Duration: {duration_str}, Detected channels: {all_channels}")
+        self.pending_probes[file_path] = file_index
+        self.probe_pool.submit(file_path, lambda path, info, error: self.probe_finished.emit(path, info, error or ""))
+
+    def on_probe_finished(self, file_path, media_info, error):
+        file_index = self.pending_probes.pop(file_path, None)
+        if file_index is None:
+            return  # The list was cleared while this file was being probed
+        status = STATUS_READY
+        if media_info is None:
+            self.append_log(f"ERROR: FFprobe error while probing '{os.path.basename(file_path)}': {error}")
+            media_info = {'duration_sec': 0.0, 'audio_streams': []}
+            status = STATUS_PROBE_FAILED
+
+        file_data = self.input_files_data[file_index]
+        file_data.set_media_info(media_info, status)
+        duration_str = self.format_duration(file_data.duration_sec)
+        all_channels = file_data.all_channels
+
+        self.file_model.update_rows(file_index)
+        self.append_log(f"'{os.path.basename(file_path)}' added. Duration: {duration_str}, Detected channels: {all_channels}")
+
+        if self.selected_file_index() == file_index:
+            self.on_file_selected()
+        if not self.pending_probes:
+            self.save_probe_cache()
 
     def clear_file_list(self):
-        self.input_files_data.clear()
-        self.file_list_widget.clear()
+        for scan in self.folder_scans:
+            scan.cancel()
+        self.folder_scans.clear()
+        self.probe_pool.cancel()
+        self.pending_probes.clear()
+        self.file_model.clear()
         self.clear_channel_checkboxes() 
         self.label_selected_file_name.setText("No File Selected")
-        self.output_log.append("File list cleared.")
+        self.append_log("File list cleared.")
         self.current_file_progressbar.setValue(0)
         self.total_progressbar.setValue(0)
 
-    def detect_video_duration(self, file_path):
-        """Detects video duration in seconds using FFprobe."""
-        command = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            file_path
-        ]
-        
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # Hide CMD window
-
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # To capture errors
-                text=True,
-                startupinfo=startupinfo
-            )
-            stdout, stderr = process.communicate()
-            if process.returncode == 0:
-                duration_str = stdout.strip()
-                if duration_str:
-                    return float(duration_str)
-            else:
-                self.output_log.append(f"ERROR: FFprobe error while detecting duration for '{os.path.basename(file_path)}': {stderr.strip()}")
-        except Exception as e:
-            self.output_log.append(f"ERROR: Exception while detecting duration for '{os.path.basename(file_path)}': {e}")
-        return 0.0
-
     def format_duration(self, seconds):
         """Converts seconds to HH:MM:SS format."""
         if seconds is None or seconds < 0:
@@ -322,205 +679,373 @@ class AudioMergeGUI(QWidget):
         return f"{hours:02}:{minutes:02}:{secs:02}"
 
 
-    def detect_audio_channels(self, file_path):
-        command = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a",
-            "-show_entries", "stream=index",
-            "-of", "csv=p=0",
-            file_path
-        ]
+    def selected_file_index(self):
+        rows = self.file_table.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
 
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # Hide CMD window
-
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # To capture errors
-                text=True,
-                startupinfo=startupinfo
-            )
-            stdout, stderr = process.communicate()
-            if process.returncode == 0:
-                channels = stdout.strip().split('\n')
-            else:
-                self.output_log.append(f"ERROR: FFprobe error while detecting audio channels for '{os.path.basename(file_path)}': {stderr.strip()}")
-                channels = []  # Return empty list on error
-        except Exception as e:
-            self.output_log.append(f"ERROR: Exception while detecting audio channels for '{os.path.basename(file_path)}': {e}")
-            channels = []
-
-        detected_indices = []
-        for ch in channels:
-            try:
-                if ch.strip(): 
-                    idx = int(ch)
-                    detected_indices.append(idx)
-            except ValueError:
-                self.output_log.append(f"Invalid channel value detected from FFprobe: '{ch}'")
-                continue
-        detected_indices.sort()
-        return detected_indices
+    def toggle_pinned_file(self):
+        file_index = self.selected_file_index()
+        if file_index is None:
+            self.append_log("Please select a file to pin.")
+            return
+        file_data = self.input_files_data[file_index]
+        file_data.priority = 0 if file_data.priority else 1
+        self.file_model.update_rows(file_index)
+        self.append_log(f"Pinned '{os.path.basename(file_data.path)}' to the front of the queue." if file_data.priority else f"Unpinned '{os.path.basename(file_data.path)}'.")
 
     def on_file_selected(self):
-        selected_items = self.file_list_widget.selectedItems()
-        if not selected_items:
+        file_index = self.selected_file_index()
+        if file_index is None:
             self.clear_channel_checkboxes()
             self.label_selected_file_name.setText("No File Selected")
             return
 
-        item = selected_items[0]
-        file_index = item.data(Qt.UserRole)
         current_file_data = self.input_files_data[file_index]
         
-        self.label_selected_file_name.setText(f"Selected File: {os.path.basename(current_file_data['path'])}")
+        self.label_selected_file_name.setText(f"Selected File: {os.path.basename(current_file_data.path)}")
         
-        self.clear_channel_checkboxes()
-
-        current_file_data['checkboxes'] = [] 
-        for idx in current_file_data['all_channels']:
-            checkbox = QCheckBox(f"Audio Channel {idx}")
-            checkbox.setChecked(idx in current_file_data['selected_channels'])
-            
-            checkbox.stateChanged.connect(lambda state, i=idx, f_idx=file_index: self.update_channel_selection(f_idx, i, state == Qt.Checked))
-            
+        self.selected_file_row = file_index
+        streams = current_file_data.audio_streams
+        while len(self.channel_checkboxes) < len(streams):
+            checkbox = QCheckBox()
+            slot = len(self.channel_checkboxes)
+            checkbox.toggled.connect(lambda checked, slot=slot: self.on_channel_checkbox_toggled(slot, checked))
             self.channel_checkbox_layout.addWidget(checkbox)
-            current_file_data['checkboxes'].append(checkbox)
+            self.channel_checkboxes.append(checkbox)
+
+        for checkbox, stream in zip(self.channel_checkboxes, streams):
+            channel_index = stream['index']
+            checkbox.blockSignals(True)
+            checkbox.setText(f"Audio Channel {channel_index} ({describe_audio_stream(stream)})")
+            checkbox.setChecked(channel_index in current_file_data.selected_channels)
+            checkbox.blockSignals(False)
+            checkbox.setVisible(True)
+        for checkbox in self.channel_checkboxes[len(streams):]:
+            checkbox.setVisible(False)
 
     def clear_channel_checkboxes(self):
-        while self.channel_checkbox_layout.count():
-            item = self.channel_checkbox_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        self.selected_file_row = None
+        for checkbox in self.channel_checkboxes:
+            checkbox.setVisible(False)
+
+    def on_channel_checkbox_toggled(self, slot, checked):
+        if self.selected_file_row is None:
+            return
+        channel_index = self.input_files_data[self.selected_file_row].audio_streams[slot]['index']
+        self.update_channel_selection(self.selected_file_row, channel_index, checked)
 
     def update_channel_selection(self, file_index, channel_idx, is_checked):
         file_data = self.input_files_data[file_index]
-        if is_checked:
-            if channel_idx not in file_data['selected_channels']:
-                file_data['selected_channels'].append(channel_idx)
-                file_data['selected_channels'].sort() 
-        else:
-            if channel_idx in file_data['selected_channels']:
-                file_data['selected_channels'].remove(channel_idx)
-                file_data['selected_channels'].sort() 
+        file_data.select_channel(channel_idx, is_checked)
+        self.file_model.update_rows(file_index)
 
 
+    def apply_channel_rule(self):
+        """Selects the matching streams in every probed file, deciding once per stream layout."""
+        rule_text = self.edit_channel_rule.text().strip()
+        try:
+            rule = parse_rule(rule_text)
+        except RuleError as e:
+            self.append_log(f"ERROR: {e}")
+            return
+        records = [file_data for file_data in self.input_files_data if file_data.status != STATUS_PROBING]
+        if not records:
+            self.append_log("No probed files to apply the rule to.")
+            return
+
+        groups, unmatched = apply_rule(records, rule)
+        self.append_log(f"Rule '{rule_text}' applied to {len(records)} file(s) with {groups} different stream layout(s).")
+        if unmatched:
+            self.append_log(f"WARNING: No stream matched in {unmatched} file(s); select their channels before processing.")
+        self.file_model.update_rows(0, len(self.input_files_data) - 1)
+        self.on_file_selected()
+
     def select_output_directory(self):
         dir_path = QFileDialog.getExistingDirectory(self, "Select Output Directory")
         if dir_path:
             self.output_directory = dir_path
             self.label_output_dir.setText(f"Output Directory: {dir_path}")
 
+    def apply_encoder_preset(self, index):
+        """Fills the encoder fields with the values of the chosen preset."""
+        preset_name = self.combo_encoder_preset.itemData(index)
+        if preset_name is None:
+            return  # Custom keeps the current field values
+        settings = PRESETS[preset_name]
+        self.applying_preset = True
+        self.combo_codec.setEditText(settings.codec or "")
+        self.edit_bitrate.setText(settings.bitrate or "")
+        self.combo_sample_rate.setEditText(str(settings.sample_rate or ""))
+        self.combo_channel_layout.setEditText(settings.channel_layout or "")
+        self.spin_encoder_threads.setValue(settings.threads or 0)
+        self.applying_preset = False
+
+    def on_encoder_field_edited(self):
+        """Switches the preset box to Custom once a field is edited by hand."""
+        if self.applying_preset:
+            return
+        self.combo_encoder_preset.blockSignals(True)
+        self.combo_encoder_preset.setCurrentIndex(self.combo_encoder_preset.count() - 1)
+        self.combo_encoder_preset.blockSignals(False)
+
     def start_batch_processing(self):
         if not self.input_files_data:
-            self.output_log.append("Please select at least one file to process.")
+            self.append_log("Please select at least one file to process.")
             return
         if not self.output_directory:
-            self.output_log.append("Please specify the output directory.")
+            self.append_log("Please specify the output directory.")
+            return
+        if self.pending_probes or self.folder_scans:
+            self.append_log("Please wait until all folders have been scanned and all files have been probed.")
+            return
+
+        sample_rate = self.combo_sample_rate.currentText().strip()
+        if sample_rate and not sample_rate.isdigit():
+            self.append_log("ERROR: Sample rate must be a number of Hz, e.g. 48000.")
+            return
+
+        try:
+            encoder_settings = EncoderSettings(
+                codec=self.combo_codec.currentText().strip(),
+                bitrate=self.edit_bitrate.text().strip(),
+                sample_rate=sample_rate,
+                channel_layout=self.combo_channel_layout.currentText().strip(),
+                threads=self.spin_encoder_threads.value()
+            )
+            profiles = parse_profiles(self.edit_profiles.text().split(), encoder_settings)
+            mix_settings = MixSettings(
+                self.combo_mixer.currentData(), parse_gains(self.edit_gains.text().split()),
+                parse_weights(self.edit_weights.text().split()), self.checkbox_normalize.isChecked(),
+                loudness=self.combo_loudness.currentData()
+            )
+            track_settings = TrackSettings(
+                self.combo_keep_audio.currentData(), self.checkbox_keep_subtitles.isChecked(),
+                self.checkbox_keep_data.isChecked(), self.edit_mix_title.text().strip(), self.edit_mix_language.text().strip()
+            )
+            start_text = self.edit_segment_start.text().strip()
+            end_text = self.edit_segment_end.text().strip()
+            start_sec = (parse_time(start_text) if start_text else None) or None  # Starting at 0 is the whole input
+            end_sec = parse_time(end_text) if end_text else None
+            if end_sec is not None and end_sec <= (start_sec or 0):
+                raise ValueError("The segment end must be after its start.")
+            audio_only_format = self.combo_output_format.currentData()
+            if audio_only_format in ('wav', 'flac') and track_settings.keeps_streams():
+                raise ValueError(f"{audio_only_format.upper()} files hold only the mix. Choose M4A to keep original streams.")
+        except ValueError as e:
+            self.append_log(f"ERROR: {e}")
             return
 
         for file_data in self.input_files_data:
-            if not file_data['selected_channels']:
-                self.output_log.append(f"ERROR: No audio channels selected for '{os.path.basename(file_data['path'])}'. Please select at least one channel or remove the file from the list.")
+            if not file_data.selected_channels:
+                self.append_log(f"ERROR: No audio channels selected for '{os.path.basename(file_data.path)}'. Please select at least one channel or remove the file from the list.")
                 return
 
+        self.log_buffer.drain()
         self.output_log.clear()
-        self.output_log.append("Starting batch processing...")
+        self.append_log("Starting batch processing...")
         self.btn_run.setEnabled(False)
         self.btn_stop.setEnabled(True)
-        self.current_processing_index = 0
+        self.btn_clear_files.setEnabled(False)  # Workers and the scheduler index the file list
         self.current_file_progressbar.setValue(0)
         self.total_progressbar.setValue(0)
-        self.update_total_progress()  # Set initial total progress
-        self.process_next_file()
-
-    def process_next_file(self):
-        if self.current_processing_index < len(self.input_files_data):
-            file_data = self.input_files_data[self.current_processing_index]
-            input_file = file_data['path']
-            selected_channels = file_data['selected_channels']
-            total_duration_sec = file_data['duration_sec']  # Get duration info
-
-            base_name = os.path.basename(input_file)
-            name_without_ext, ext = os.path.splitext(base_name)
-            output_file = os.path.join(self.output_directory, f"{name_without_ext}_merged.mkv")
-            
-            # Highlight the file in the list
-            for i in range(self.file_list_widget.count()):
-                item = self.file_list_widget.item(i)
-                item_file_index = item.data(Qt.UserRole)
-                if item_file_index == self.current_processing_index:
-                    item.setBackground(Qt.yellow)
-                else:
-                    item.setBackground(Qt.white)
-
-            self.worker = FFmpegWorker(input_file, output_file, selected_channels, total_duration_sec)
-            self.worker.log_output.connect(self.output_log.append)
-            self.worker.progress_update.connect(self.update_current_file_progress)  # Connect new signal
-            self.worker.finished_single_file.connect(self.on_single_file_finished)
-            self.worker.start()
-        else:
-            self.output_log.append("\nAll files processed successfully!")
-            self.btn_run.setEnabled(True)
-            self.btn_stop.setEnabled(False)
-            self.worker = None
-            self.total_progressbar.setValue(100)  # Set to 100% when all done
-            # Reset background for all files
-            for i in range(self.file_list_widget.count()):
-                self.file_list_widget.item(i).setBackground(Qt.white)
+        self.pending_progress.clear()
+
+        self.encoder_settings = encoder_settings
+        self.append_log(f"Audio encoding: {self.encoder_settings.describe()}")
+        self.mix_settings = mix_settings
+        self.append_log(f"Mixing: {self.mix_settings.describe()}")
+        self.track_settings = track_settings
+        if not self.track_settings.is_default():
+            self.append_log(f"Output tracks: {self.track_settings.describe()}")
+        self.output_profiles = profiles
+        for profile in self.output_profiles:
+            self.append_log(f"Output profiles: {profile.describe()}")
+        self.segment_start_sec = start_sec
+        self.segment_end_sec = end_sec
+        if start_sec is not None or end_sec is not None:
+            self.append_log(f"Segment: {start_text or 0} to {end_text or 'end'}.")
+        self.audio_only_format = audio_only_format
+        if audio_only_format:
+            self.append_log(f"Output: audio only ({audio_only_format.upper()}).")
+
+        self.journal = None
+        if self.checkbox_skip_completed.isChecked():
+            incremental = self.checkbox_incremental.isChecked()
+            self.journal = JobJournal(journal_path(self.output_directory), verify_outputs=not incremental)
+            self.append_log("Incremental mode: unchanged files will be skipped." if incremental else "Files already completed by an earlier run will be skipped.")
+
+        self.batch_progress = BatchProgress(len(self.input_files_data))
+        self.batch_report = BatchReport()
+        for file_index, file_data in enumerate(self.input_files_data):
+            self.batch_progress.add_job(
+                file_index, segment_duration(file_data.duration_sec, self.segment_start_sec, self.segment_end_sec)
+            )
+            file_data.status = STATUS_QUEUED
+            file_data.percent = None
+        self.file_model.update_rows(0, len(self.input_files_data) - 1)  # Repaint every row once, not once per file
+        self.concurrency_controller = None
+        concurrency = self.spin_parallel_jobs.value()
+        if self.checkbox_adaptive.isChecked():
+            self.concurrency_controller = ConcurrencyController(
+                concurrency, max_jobs=max(concurrency, 2 * default_concurrency()),
+                on_decision=lambda concurrency, reason: self.append_log(f"Parallel jobs set to {concurrency}: {reason}")
+            )
+        self.scheduler = JobScheduler(
+            self.start_file_job,
+            concurrency=concurrency,
+            on_batch_finished=self.on_batch_finished
+        )
+        self.append_log(f"Running up to {self.scheduler.concurrency} file(s) in parallel.")
+        policy = self.combo_queue_order.currentData() or default_queue_policy(concurrency)
+        self.append_log(f"Queue order: {QUEUE_POLICY_LABELS[policy]}.")
+        store = self.input_files_data
+        self.scheduler.run(order_jobs(
+            range(len(store)), policy,
+            duration_of=lambda file_index: store[file_index].duration_sec,
+            size_of=lambda file_index: file_size(store[file_index].path),
+            priority_of=lambda file_index: store[file_index].priority
+        ))
+
+    def start_file_job(self, file_index):
+        file_data = self.input_files_data[file_index]
+        input_file = file_data.path
+        selected_channels = file_data.selected_channels
+        total_duration_sec = file_data.duration_sec  # Get duration info
+
+        output_file = default_output_path(input_file, self.output_directory, self.audio_only_format or 'mkv',
+                                          self.segment_start_sec, self.segment_end_sec)
+
+        self.set_file_status(file_index, STATUS_RUNNING)
+
+        worker = FFmpegWorker(
+            input_file, output_file, selected_channels, total_duration_sec, self.log_buffer.write, self.encoder_settings,
+            self.journal, self.mix_settings, self.track_settings, file_data.all_channels, self.output_profiles,
+            self.segment_start_sec, self.segment_end_sec, bool(self.audio_only_format)
+        )
+        worker.progress_update.connect(lambda progress, i=file_index: self.update_file_progress(i, progress))
+        worker.finished_single_file.connect(lambda _, success, i=file_index: self.on_single_file_finished(i, success))
+        self.workers[file_index] = worker
+        worker.start()
+
+    def set_file_status(self, file_index, status):
+        self.input_files_data[file_index].status = status
+        self.file_model.update_rows(file_index)
+
+    def update_file_progress(self, file_index, progress):
+        self.pending_progress[file_index] = progress
+
+    def flush_progress(self):
+        """Applies all progress received since the last tick with a single repaint of the bars."""
+        if not self.pending_progress or not self.scheduler:
+            return
+        for file_index, progress in self.pending_progress.items():
+            self.batch_progress.update(file_index, progress.out_time_sec, progress.speed)
+            percent = progress.percent
+            if percent is None:
+                continue
+            self.scheduler.job_progress(file_index, percent)
+            self.input_files_data[file_index].percent = percent
+            self.file_model.update_rows(file_index)
+        self.pending_progress.clear()
+        self.update_total_progress()
+
+    def adapt_concurrency(self):
+        if not self.concurrency_controller or not self.scheduler or self.scheduler.stopped or not self.scheduler.is_active():
+            return
+        concurrency = self.concurrency_controller.sample(
+            self.batch_progress.processed_sec(), len(self.scheduler.running), len(self.scheduler.pending)
+        )
+        if concurrency is not None:
+            self.scheduler.set_concurrency(concurrency)
 
-    def update_current_file_progress(self, percent):
-        self.current_file_progressbar.setValue(percent)
-        self.update_total_progress()  # Update total progress when current file progress changes
-        
     def update_total_progress(self):
-        if not self.input_files_data:
+        if not self.scheduler:
+            self.current_file_progressbar.setValue(0)
             self.total_progressbar.setValue(0)
             return
-        
-        total_files = len(self.input_files_data)
-        completed_files = self.current_processing_index
-        
-        if total_files > 0:
-            current_file_progress_weight = self.current_file_progressbar.value() / 100.0 if self.worker and self.worker.isRunning() else 0
-            
-            total_progress_value = int(((completed_files + current_file_progress_weight) / total_files) * 100)
-            self.total_progressbar.setValue(total_progress_value)
-        else:
-            self.total_progressbar.setValue(0)
 
+        running = self.scheduler.running
+        running_progress = int(sum(running.values()) / len(running)) if running else 0
+        self.current_file_progressbar.setValue(running_progress)
+        self.total_progressbar.setValue(self.batch_progress.percent())
+        eta_sec = self.batch_progress.eta_sec()
+        if eta_sec is not None:
+            self.label_total_progress.setText(f"{TOTAL_PROGRESS_LABEL} ETA {self.format_duration(eta_sec)} at {self.batch_progress.throughput():.1f}x realtime")
+
+    def on_single_file_finished(self, file_index, success):
+        worker = self.workers.pop(file_index, None)
+        self.pending_progress.pop(file_index, None)
+        skipped = False
+        if worker:
+            worker.wait()  # finished_single_file is the worker's last action
+            skipped = worker.runner.skipped
+            self.batch_report.add(worker.runner.stats)
+
+        # Update the row of the processed file
+        if skipped:
+            status = STATUS_SKIPPED
+        elif success:
+            status = STATUS_DONE
+        else:
+            status = STATUS_STOPPED if worker and worker.runner.stopped else STATUS_FAILED
+        self.input_files_data[file_index].percent = 100 if success else None
+        self.set_file_status(file_index, status)
 
-    def on_single_file_finished(self, input_file_processed, success):
-        # Update the list item for the processed file
-        for i in range(self.file_list_widget.count()):
-            item = self.file_list_widget.item(i)
-            file_data_index = item.data(Qt.UserRole)
-            file_data = self.input_files_data[file_data_index]
-            if file_data['path'] == input_file_processed:
-                item.setBackground(Qt.white)
-                if success:
-                    item.setForeground(Qt.darkGreen)
-                else:
-                    item.setForeground(Qt.red)
-                break
-        
-        self.current_processing_index += 1
-        self.current_file_progressbar.setValue(0)  # Reset progress bar before next file
+        self.batch_progress.finish(file_index)
+        self.scheduler.job_finished(file_index, success, skipped, stopped=status == STATUS_STOPPED)
         self.update_total_progress()  # Update total progress
-        self.process_next_file()
+
+    def on_batch_finished(self):
+        scheduler = self.scheduler
+        if scheduler.stopped:
+            for file_data in self.input_files_data:  # Files the stop left in the queue can be run again
+                if file_data.status == STATUS_QUEUED:
+                    file_data.status = STATUS_READY
+            self.file_model.update_rows(0, len(self.input_files_data) - 1)
+            self.append_log(f"\nBatch processing stopped. {scheduler.succeeded} file(s) completed, "
+                            f"{scheduler.stopped_jobs} stopped, {scheduler.failed} failed.")
+        elif scheduler.failed:
+            self.append_log(f"\nBatch finished: {scheduler.succeeded} succeeded, {scheduler.failed} failed.")
+        elif scheduler.stopped_jobs:
+            self.append_log(f"\nBatch finished: {scheduler.succeeded} succeeded, {scheduler.stopped_jobs} stopped.")
+        else:
+            self.append_log("\nAll files processed successfully!")
+            self.total_progressbar.setValue(100)  # Set to 100% when all done
+        if scheduler.skipped:
+            self.append_log(f"{scheduler.skipped} file(s) skipped (already completed).")
+        self.write_batch_report()
+        self.btn_run.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+        self.btn_clear_files.setEnabled(True)
+        self.current_file_progressbar.setValue(0)
+        self.label_total_progress.setText(TOTAL_PROGRESS_LABEL)
+
+    def write_batch_report(self):
+        """Writes the per-file resource usage as CSV, with the aggregates in a JSON file next to it."""
+        self.batch_report.finish()
+        report_file = default_report_path(os.path.join(self.output_directory, "logs"), 'csv')
+        try:
+            self.batch_report.write(report_file)
+        except OSError as e:
+            self.append_log(f"Could not write the batch report: {e}")
+            return
+        self.append_log(f"Throughput: {self.batch_report.describe()}")
+        self.append_log(f"Batch report: {report_file}")
 
     def stop_processing(self):
-        if self.worker and self.worker.isRunning():
-            self.worker.stop()
+        if self.scheduler and self.scheduler.is_active():
+            for file_index in self.scheduler.stop():
+                self.workers[file_index].stop()
             self.btn_stop.setEnabled(False) 
         else:
-            self.output_log.append("No active process to stop.")
+            self.append_log("No active process to stop.")
+
+    def closeEvent(self, event):
+        for scan in self.folder_scans:
+            scan.cancel()
+        self.probe_pool.shutdown()
+        self.save_probe_cache()
+        super().closeEvent(event)
 
 
 if __name__ == '__main__':
@@ -1,122 +1,249 @@
 import sys
 import os
-import subprocess
-import re # Düzenli ifadeler için
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QFileDialog, QTextEdit, QCheckBox, QGroupBox, QListWidget, QListWidgetItem,
-    QHBoxLayout, QScrollArea, QProgressBar
+    QFileDialog, QPlainTextEdit, QCheckBox, QGroupBox, QTableView, QHeaderView, QAbstractItemView,
+    QHBoxLayout, QScrollArea, QProgressBar, QSpinBox, QComboBox, QLineEdit, QFormLayout
 )
-from PyQt5.QtCore import QThread, pyqtSignal, QMimeData, Qt
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, QMimeData, Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QFont
+
+from audio_merger.concurrency import ConcurrencyController
+from audio_merger.encoding import PRESETS, EncoderSettings
+from audio_merger.engine import AUDIO_ONLY_FORMATS, MergeJob, create_runner, default_output_path, segment_duration
+from audio_merger.filelist import (
+    FileRecord, FileStore, STATUS_PROBING, STATUS_PROBE_FAILED, STATUS_READY, STATUS_QUEUED, STATUS_RUNNING,
+    STATUS_DONE, STATUS_SKIPPED, STATUS_FAILED, STATUS_STOPPED
+)
+from audio_merger.journal import JobJournal, journal_path
+from audio_merger.logsink import LogBuffer, default_log_path
+from audio_merger.mixing import (
+    LOUDNESS_DYNAUDNORM, LOUDNESS_LOUDNORM, MIXER_AMIX, MIXER_NUMPY, MixSettings, numpy_available, parse_gains,
+    parse_weights
+)
+from audio_merger.outputs import parse_profiles
+from audio_merger.probe import ProbeCache, ProbePool, describe_audio_stream
+from audio_merger.progress import BatchProgress
+from audio_merger.report import BatchReport, default_report_path
+from audio_merger.scan import DEFAULT_PATTERNS, FolderScan, MediaFilter, parse_patterns
+from audio_merger.scheduler import (
+    QUEUE_FIFO, QUEUE_LONGEST_FIRST, QUEUE_SHORTEST_FIRST, JobScheduler, default_concurrency, default_queue_policy,
+    order_jobs
+)
+from audio_merger.selection import RuleError, apply_rule, parse_rule
+from audio_merger.tracks import KEEP_ALL, KEEP_SELECTED, TrackSettings
+from audio_merger.utils import file_size, parse_time
+
+TOTAL_PROGRESS_LABEL = "Toplam İşlem İlerlemesi:"
+UI_REFRESH_INTERVAL_MS = 100 # Konsol ve ilerleme çubukları bu aralıkla yenilenir
+CONSOLE_MAX_LINES = 5000 # Eski konsol satırları silinir, tam günlükler diskte tutulur
+ENCODER_PRESET_LABELS = {
+    'default': "FFmpeg varsayılanı",
+    'fast-aac': "Hızlı AAC (192k stereo)",
+    'flac-archive': "FLAC arşiv (kayıpsız)",
+    'opus-small': "Opus (küçük dosyalar)",
+}
+CUSTOM_PRESET_LABEL = "Özel"
+STATUS_LABELS = {
+    STATUS_PROBING: "İnceleniyor…",
+    STATUS_PROBE_FAILED: "İnceleme başarısız",
+    STATUS_READY: "Hazır",
+    STATUS_QUEUED: "Sırada",
+    STATUS_RUNNING: "İşleniyor",
+    STATUS_DONE: "Tamamlandı",
+    STATUS_SKIPPED: "Atlandı",
+    STATUS_FAILED: "Başarısız",
+    STATUS_STOPPED: "Durduruldu",
+}
+FILE_COLUMNS = ("Dosya", "Süre", "Ses Akışları", "Durum", "İlerleme")
+STATUS_COLORS = {
+    STATUS_PROBING: Qt.gray,
+    STATUS_PROBE_FAILED: Qt.red,
+    STATUS_DONE: Qt.darkGreen,
+    STATUS_SKIPPED: Qt.darkGreen,
+    STATUS_FAILED: Qt.red,
+    STATUS_STOPPED: Qt.red,
+}
+QUEUE_POLICY_LABELS = {QUEUE_FIFO: "eklenme sırası", QUEUE_LONGEST_FIRST: "önce en uzun", QUEUE_SHORTEST_FIRST: "önce en kısa"}
 
 class FFmpegWorker(QThread):
-    log_output = pyqtSignal(str)
-    progress_update = pyqtSignal(int) # Mevcut dosyanın ilerlemesini % olarak yansıtır
+    progress_update = pyqtSignal(object) # Mevcut dosyanın FFmpegProgress bilgisi
     finished_single_file = pyqtSignal(str, bool) 
     finished_all_files = pyqtSignal()
 
-    def __init__(self, input_file, output_file, selected_channels, total_duration_sec):
+    def __init__(self, input_file, output_file, selected_channels, total_duration_sec, log_sink, encoder=None,
+                 journal=None, mix=None, tracks=None, audio_streams=None, profiles=None, start_sec=None, end_sec=None,
+                 audio_only=False):
         super().__init__()
         self.input_file = input_file
         self.output_file = output_file
         self.selected_channels = selected_channels
-        self.total_duration_sec = total_duration_sec # FFmpeg progress için toplam süre
-        self.is_running = True
+        self.log = log_sink # Thread-safe çağrılabilir, ör. LogBuffer.write
+        self.log_file = default_log_path(output_file)
+        self.runner = create_runner(
+            MergeJob(input_file, output_file, selected_channels, total_duration_sec, self.log_file, encoder, mix,
+                     tracks, audio_streams, profiles, start_sec, end_sec, audio_only),
+            on_output=self.log,
+            on_progress=self.progress_update.emit,
+            journal=journal
+        )
+
+    @property
+    def is_running(self):
+        return not self.runner.stopped
 
     def stop(self):
-        self.is_running = False
+        self.runner.stop()
 
     def run(self):
         if not self.is_running:
-            self.log_output.emit(f"İşlem durduruldu: {os.path.basename(self.input_file)}")
+            self.log(f"İşlem durduruldu: {os.path.basename(self.input_file)}")
             self.finished_single_file.emit(self.input_file, False) 
             return
 
         if not self.selected_channels:
-            self.log_output.emit(f"'{os.path.basename(self.input_file)}' için hiçbir ses kanalı seçilmedi. Atlanıyor.")
+            self.log(f"'{os.path.basename(self.input_file)}' için hiçbir ses kanalı seçilmedi. Atlanıyor.")
             self.finished_single_file.emit(self.input_file, False) 
             return
 
-        num_selected_channels = len(self.selected_channels)
-        corrected_ffmpeg_indices = list(range(num_selected_channels)) 
-        
-        audio_inputs = ''.join([f"[0:a:{i}]" for i in corrected_ffmpeg_indices])
-        
-        command = [
-            "ffmpeg",
-            "-i", self.input_file,
-            "-map", "0:v",
-            "-c:v", "copy",
-            "-filter_complex", f"{audio_inputs}amix=inputs={num_selected_channels}:duration=longest[a]",
-            "-map", "[a]",
-            "-y", # Çıkış dosyası varsa üzerine yaz
-            self.output_file
-        ]
-
-        self.log_output.emit(f"\n--- '{os.path.basename(self.input_file)}' için FFmpeg işlemi başlatılıyor ---")
-        self.log_output.emit(f"Çıkış dosyası: {os.path.basename(self.output_file)}")
-        self.log_output.emit(f"Komut: {' '.join(command)}")
-
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW # Pencereyi gizle
-
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT, # stderr'i de stdout'a yönlendir
-            text=True,
-            startupinfo=startupinfo
-        )
+        job = self.runner.job
+        if job.total_duration_sec > 0 and job.duration_sec <= 0:
+            self.log(f"Bölüm, '{os.path.basename(self.input_file)}' dosyasının sonundan sonra başlıyor. Atlanıyor.")
+            self.finished_single_file.emit(self.input_file, False)
+            return
 
-        success = True
-        for line in process.stdout:
-            if not self.is_running:
-                process.terminate()
-                self.log_output.emit(f"İşlem durduruldu: {os.path.basename(self.input_file)}")
-                success = False
-                break
-            
-            self.log_output.emit(line.strip()) # Her satırı logla
-
-            # FFmpeg ilerleme çıktısını parse et
-            time_match = re.search(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})", line)
-            if time_match:
-                time_str = time_match.group(1)
-                h, m, s = map(float, time_str.split(':'))
-                current_time_sec = h * 3600 + m * 60 + s
-
-                if self.total_duration_sec > 0:
-                    progress_percent = int((current_time_sec / self.total_duration_sec) * 100)
-                    self.progress_update.emit(min(100, progress_percent)) # %100'ü geçmesin
-
-        process.wait()
-        if process.returncode != 0 and self.is_running:
-            self.log_output.emit(f"HATA: '{os.path.basename(self.input_file)}' işlemi sırasında bir hata oluştu. Hata kodu: {process.returncode}")
-            success = False
-        
-        if self.is_running and success:
-            self.log_output.emit(f"--- '{os.path.basename(self.input_file)}' işlemi tamamlandı ---")
-            self.progress_update.emit(100) # İşlem bitince %100'e set et
+        if self.runner.already_complete():
+            self.log(f"--- '{os.path.basename(self.input_file)}' atlandı: çıktı aynı ayarlarla zaten tamamlanmış ---")
+            self.finished_single_file.emit(self.input_file, True)
+            return
+
+        self.log(f"\n--- '{os.path.basename(self.input_file)}' için FFmpeg işlemi başlatılıyor ---")
+        for variant in self.runner.pending:
+            self.log(f"Çıkış dosyası: {os.path.basename(variant.output_file)}")
+        self.log(f"Komut: {' '.join(self.runner.command)}")
+
+        success = self.runner.run()
+        if not self.is_running:
+            self.log(f"İşlem durduruldu: {os.path.basename(self.input_file)}")
+        elif self.runner.returncode != 0:
+            self.log(f"HATA: '{os.path.basename(self.input_file)}' işlemi sırasında bir hata oluştu. Hata kodu: {self.runner.returncode}")
+            self.log(f"FFmpeg günlüğünün tamamı: {self.log_file}")
+
+        if self.runner.job.profiles: # Bu çalıştırmanın yazdığı her çıktının sonucu
+            for output_file, written in self.runner.results.items():
+                self.log(f"Çıktı '{os.path.basename(output_file)}': {'yazıldı' if written else 'başarısız'}")
+
+        if success:
+            self.log(f"--- '{os.path.basename(self.input_file)}' işlemi tamamlandı ---")
         elif not self.is_running:
-            self.log_output.emit(f"--- '{os.path.basename(self.input_file)}' işlemi kullanıcı tarafından durduruldu ---")
-            self.progress_update.emit(0) # Durdurulduysa sıfırla veya isteğe bağlı olarak son bilinen %de bırak
+            self.log(f"--- '{os.path.basename(self.input_file)}' işlemi kullanıcı tarafından durduruldu ---")
 
         self.finished_single_file.emit(self.input_file, success)
 
 
+class FileTableModel(QAbstractTableModel):
+    """FileStore'un tablo görünümü; hücreler yalnızca görünümün çizdiği satırlar için biçimlendirilir."""
+
+    def __init__(self, store, format_duration):
+        super().__init__()
+        self.store = store
+        self.format_duration = format_duration
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(FILE_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return FILE_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        file_data = self.store[index.row()]
+        status = file_data.status
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return os.path.basename(file_data.path)
+            if column == 1:
+                return "" if status == STATUS_PROBING else self.format_duration(file_data.duration_sec)
+            if column == 2:
+                return "" if status == STATUS_PROBING else f"{len(file_data.all_channels)} akıştan {len(file_data.selected_channels)} seçili"
+            if column == 3:
+                return STATUS_LABELS[status]
+            if column == 4:
+                percent = file_data.percent
+                return "" if percent is None else f"%{percent}"
+        elif role == Qt.ToolTipRole and column == 0:
+            return file_data.path
+        elif role == Qt.ForegroundRole and status in STATUS_COLORS:
+            return QBrush(STATUS_COLORS[status])
+        elif role == Qt.BackgroundRole and status == STATUS_RUNNING:
+            return QBrush(Qt.yellow)
+        elif role == Qt.FontRole and file_data.priority:
+            font = QFont()
+            font.setBold(True) # Kuyruğun önüne sabitlendi
+            return font
+        return None
+
+    def add_file(self, file_data):
+        """Bir satır ekler ve döndürür; yol zaten listedeyse None döndürür."""
+        row = len(self.store)
+        if self.store.row_of(file_data.path) is not None:
+            return None
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.add(file_data)
+        self.endInsertRows()
+        return row
+
+    def update_rows(self, first_row, last_row=None):
+        last_row = first_row if last_row is None else last_row
+        self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, len(FILE_COLUMNS) - 1))
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
+
+
 class AudioMergeGUI(QWidget):
+    probe_finished = pyqtSignal(str, object, str) # yol, medya bilgisi (hata durumunda None), hata mesajı
+    scan_files_found = pyqtSignal(object, list) # tarama, bulunan yollar
+    scan_finished = pyqtSignal(object, int) # tarama, bulunan dosya sayısı
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FFmpeg Ses Birleştirici (Toplu İşlem & Kanal Seçimi) by alfa")
         self.setGeometry(100, 100, 1000, 800) # Pencere boyutunu büyüttük
         self.setAcceptDrops(True)
 
-        self.input_files_data = [] 
-        self.current_processing_index = 0
-        self.worker = None
+        self.input_files_data = FileStore()
+        self.probe_cache = ProbeCache()
+        self.probe_pool = ProbePool(self.probe_cache)
+        self.pending_probes = {} # yol -> hâlâ incelenen dosyanın satırı
+        self.probe_finished.connect(self.on_probe_finished)
+        self.folder_scans = set() # Hâlâ listelenen FolderScan'ler
+        self.scan_files_found.connect(self.on_scan_files_found)
+        self.scan_finished.connect(self.on_scan_finished)
+        self.scheduler = None
+        self.encoder_settings = None
+        self.mix_settings = None
+        self.track_settings = None
+        self.output_profiles = []
+        self.segment_start_sec = None
+        self.segment_end_sec = None
+        self.audio_only_format = None # None: video korunur
+        self.journal = None
+        self.applying_preset = False
+        self.batch_progress = None
+        self.batch_report = None
+        self.concurrency_controller = None # Uyarlanabilir toplu işlemde paralel iş sayısını ayarlar
+        self.log_buffer = LogBuffer() # Her thread'den doldurulur, ui_timer ile konsola yazılır
+        self.pending_progress = {} # dosya indeksi -> son FFmpegProgress, bir sonraki ui_timer adımında uygulanır
+        self.workers = {} # dosya indeksi -> çalışan FFmpegWorker
 
         main_layout = QHBoxLayout() 
 
@@ -130,19 +257,47 @@ class AudioMergeGUI(QWidget):
         self.btn_select_files = QPushButton("Dosya(ları) Seç")
         self.btn_select_files.clicked.connect(self.select_input_files)
         input_button_layout.addWidget(self.btn_select_files)
+
+        self.btn_select_folder = QPushButton("Klasör Ekle")
+        self.btn_select_folder.clicked.connect(self.select_input_folder)
+        input_button_layout.addWidget(self.btn_select_folder)
         
         self.btn_clear_files = QPushButton("Listeyi Temizle")
         self.btn_clear_files.clicked.connect(self.clear_file_list)
         input_button_layout.addWidget(self.btn_clear_files)
+
+        self.btn_pin_file = QPushButton("Öne Sabitle")
+        self.btn_pin_file.setToolTip("Seçili dosyayı diğerlerinden önce işle (kaldırmak için tekrar tıkla). Sabitlenen dosyalar kalın gösterilir.")
+        self.btn_pin_file.clicked.connect(self.toggle_pinned_file)
+        input_button_layout.addWidget(self.btn_pin_file)
         
         input_layout.addLayout(input_button_layout)
 
-        self.file_list_widget = QListWidget()
-        self.file_list_widget.setSelectionMode(QListWidget.SingleSelection)
-        self.file_list_widget.itemSelectionChanged.connect(self.on_file_selected)
-        input_layout.addWidget(self.file_list_widget)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Filtre:"))
+        self.edit_file_filter = QLineEdit(" ".join(DEFAULT_PATTERNS))
+        self.edit_file_filter.setToolTip("Klasörlerden alınacak dosya adı desenleri veya uzantılar, örn. *.mkv *.mp4")
+        filter_layout.addWidget(self.edit_file_filter)
+        self.checkbox_recursive = QCheckBox("Alt Klasörler Dahil")
+        self.checkbox_recursive.setChecked(True)
+        filter_layout.addWidget(self.checkbox_recursive)
+        input_layout.addLayout(filter_layout)
+
+        self.file_model = FileTableModel(self.input_files_data, self.format_duration)
+        self.file_table = QTableView()
+        self.file_table.setModel(self.file_model)
+        self.file_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.file_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.file_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_table.setWordWrap(False)
+        self.file_table.verticalHeader().hide()
+        self.file_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed) # Satırlar tek tek ölçülmez
+        self.file_table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.file_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.file_table.selectionModel().selectionChanged.connect(self.on_file_selected)
+        input_layout.addWidget(self.file_table)
         
-        input_layout.addWidget(QLabel("Dosyaları buraya sürükleyip bırakabilirsiniz."))
+        input_layout.addWidget(QLabel("Dosyaları ve klasörleri buraya sürükleyip bırakabilirsiniz."))
         input_group.setLayout(input_layout)
         left_layout.addWidget(input_group)
 
@@ -157,17 +312,139 @@ class AudioMergeGUI(QWidget):
         output_group.setLayout(output_layout)
         left_layout.addWidget(output_group)
 
+        # Çıkış Ses Kodlaması Bölümü
+        encoding_group = QGroupBox("Çıkış Ses Kodlaması")
+        encoding_layout = QFormLayout()
+        self.combo_encoder_preset = QComboBox()
+        for preset_name, label in ENCODER_PRESET_LABELS.items():
+            self.combo_encoder_preset.addItem(label, preset_name)
+        self.combo_encoder_preset.addItem(CUSTOM_PRESET_LABEL, None)
+        self.combo_encoder_preset.currentIndexChanged.connect(self.apply_encoder_preset)
+        encoding_layout.addRow("Ön Ayar:", self.combo_encoder_preset)
+
+        self.combo_codec = QComboBox()
+        self.combo_codec.setEditable(True)
+        self.combo_codec.addItems(["", "aac", "flac", "libopus", "ac3", "pcm_s16le"])
+        self.combo_codec.lineEdit().setPlaceholderText("varsayılan")
+        encoding_layout.addRow("Kodek:", self.combo_codec)
+
+        self.edit_bitrate = QLineEdit()
+        self.edit_bitrate.setPlaceholderText("varsayılan, ör. 192k")
+        encoding_layout.addRow("Bit Hızı:", self.edit_bitrate)
+
+        self.combo_sample_rate = QComboBox()
+        self.combo_sample_rate.setEditable(True)
+        self.combo_sample_rate.addItems(["", "44100", "48000", "96000"])
+        self.combo_sample_rate.lineEdit().setPlaceholderText("varsayılan")
+        encoding_layout.addRow("Örnekleme Hızı:", self.combo_sample_rate)
+
+        self.combo_channel_layout = QComboBox()
+        self.combo_channel_layout.setEditable(True)
+        self.combo_channel_layout.addItems(["", "mono", "stereo", "5.1", "7.1"])
+        self.combo_channel_layout.lineEdit().setPlaceholderText("varsayılan")
+        encoding_layout.addRow("Kanal Düzeni:", self.combo_channel_layout)
+
+        self.spin_encoder_threads = QSpinBox()
+        self.spin_encoder_threads.setRange(0, 64)
+        self.spin_encoder_threads.setSpecialValueText("otomatik")
+        encoding_layout.addRow("Kodlayıcı İş Parçacığı:", self.spin_encoder_threads)
+
+        self.combo_mixer = QComboBox()
+        self.combo_mixer.addItem("FFmpeg amix", MIXER_AMIX)
+        self.combo_mixer.addItem("NumPy (toplama + sınırlayıcı)", MIXER_NUMPY)
+        self.combo_mixer.setToolTip("amix her akışı karıştırılan akış sayısı kadar kısar. NumPy karıştırıcısı her akışı tam seviyede tutar, sınırlayıcı kırpılmayı önler.")
+        if not numpy_available(): # Yalnızca NumPy yüklenebiliyorsa sunulur
+            self.combo_mixer.model().item(1).setEnabled(False)
+            self.combo_mixer.setItemData(1, "NumPy kurulu değil (pip install numpy).", Qt.ToolTipRole)
+        encoding_layout.addRow("Karıştırıcı:", self.combo_mixer)
+
+        self.edit_gains = QLineEdit()
+        self.edit_gains.setPlaceholderText("örn. 1=-6 2=+3 (dB)")
+        self.edit_gains.setToolTip("Akış indeksine göre dB cinsinden kazanç, karıştırmadan önce uygulanır.")
+        encoding_layout.addRow("Akış Kazançları:", self.edit_gains)
+
+        self.edit_weights = QLineEdit()
+        self.edit_weights.setPlaceholderText("örn. 2=0.5")
+        self.edit_weights.setToolTip("Akış indeksine göre amix ağırlığı (varsayılan 1); NumPy karıştırıcısında ağırlık kazançla çarpılır.")
+        encoding_layout.addRow("Akış Ağırlıkları:", self.edit_weights)
+
+        self.checkbox_normalize = QCheckBox("amix girişlerini ölçekle")
+        self.checkbox_normalize.setChecked(True)
+        self.checkbox_normalize.setToolTip("Kapalı: amix her akışı akış sayısı kadar kısmak yerine akışları toplar.")
+        encoding_layout.addRow("", self.checkbox_normalize)
+
+        self.combo_loudness = QComboBox()
+        self.combo_loudness.addItem("Kapalı", None)
+        self.combo_loudness.addItem("loudnorm (EBU R128, -23 LUFS)", LOUDNESS_LOUDNORM)
+        self.combo_loudness.addItem("dynaudnorm (dinamik)", LOUDNESS_DYNAUDNORM)
+        self.combo_loudness.setToolTip("Karışımın ses yüksekliğini aynı ffmpeg geçişinde normalleştirir.")
+        encoding_layout.addRow("Ses Yüksekliği:", self.combo_loudness)
+
+        for field_signal in (self.combo_codec.editTextChanged, self.edit_bitrate.textChanged,
+                             self.combo_sample_rate.editTextChanged, self.combo_channel_layout.editTextChanged,
+                             self.spin_encoder_threads.valueChanged):
+            field_signal.connect(self.on_encoder_field_edited)
+        encoding_group.setLayout(encoding_layout)
+        left_layout.addWidget(encoding_group)
+
+        # Çıkış Parçaları Bölümü
+        tracks_group = QGroupBox("Çıkış Parçaları")
+        tracks_layout = QFormLayout()
+        self.combo_keep_audio = QComboBox()
+        self.combo_keep_audio.addItem("Hayır", None)
+        self.combo_keep_audio.addItem("Karıştırılan akışlar", KEEP_SELECTED)
+        self.combo_keep_audio.addItem("Tüm ses akışları", KEEP_ALL)
+        self.combo_keep_audio.setToolTip("Orijinal ses akışlarını yeniden kodlamadan karışımın yanında çıkışa kopyalar.")
+        tracks_layout.addRow("Orijinal Sesi Koru:", self.combo_keep_audio)
+        self.checkbox_keep_subtitles = QCheckBox("Altyazıları koru")
+        tracks_layout.addRow("", self.checkbox_keep_subtitles)
+        self.checkbox_keep_data = QCheckBox("Veri akışlarını koru")
+        self.checkbox_keep_data.setToolTip("Veri akışları, bunları saklayabilen bir kapsayıcı gerektirir, örn. MP4 veya MOV.")
+        tracks_layout.addRow("", self.checkbox_keep_data)
+        self.edit_mix_title = QLineEdit()
+        self.edit_mix_title.setPlaceholderText("örn. Karışım")
+        tracks_layout.addRow("Karışım Başlığı:", self.edit_mix_title)
+        self.edit_mix_language = QLineEdit()
+        self.edit_mix_language.setPlaceholderText("örn. tur")
+        tracks_layout.addRow("Karışım Dili:", self.edit_mix_language)
+        self.edit_profiles = QLineEdit()
+        self.edit_profiles.setPlaceholderText("örn. master=mkv:flac-archive proxy=mp4:fast-aac")
+        self.edit_profiles.setToolTip("Girişin tek bir çözümlemesinden profil başına bir dosya yazar (AD=KAPSAYICI[:ÖN_AYAR]). Ön ayarı olmayan profiller yukarıdaki kodlama ayarlarını kullanır.")
+        tracks_layout.addRow("Çıkış Profilleri:", self.edit_profiles)
+        tracks_group.setLayout(tracks_layout)
+        left_layout.addWidget(tracks_group)
+
+        # Bölüm ve Biçim Bölümü
+        segment_group = QGroupBox("Bölüm ve Biçim")
+        segment_layout = QFormLayout()
+        self.edit_segment_start = QLineEdit()
+        self.edit_segment_start.setPlaceholderText("örn. 1:30 (varsayılan: baştan)")
+        self.edit_segment_start.setToolTip("Her dosyanın yalnızca bu bölümünü işler, örn. karışımı kontrol etmek için 30 saniyelik bir kesit. Kopyalanan video, başlangıçtan önceki anahtar kareden başlar.")
+        segment_layout.addRow("Başlangıç:", self.edit_segment_start)
+        self.edit_segment_end = QLineEdit()
+        self.edit_segment_end.setPlaceholderText("örn. 2:00 (varsayılan: sona kadar)")
+        self.edit_segment_end.setToolTip("Her dosyanın yalnızca bu bölümünü işler, örn. karışımı kontrol etmek için 30 saniyelik bir kesit. Kopyalanan video, başlangıçtan önceki anahtar kareden başlar.")
+        segment_layout.addRow("Bitiş:", self.edit_segment_end)
+        self.combo_output_format = QComboBox()
+        self.combo_output_format.addItem("Video + karışık ses (MKV)", None)
+        for audio_format in AUDIO_ONLY_FORMATS:
+            self.combo_output_format.addItem(f"Yalnızca ses ({audio_format.upper()})", audio_format)
+        self.combo_output_format.setToolTip("Yalnızca ses, videoyu atlayıp sadece karışımı yazar; tam bir yeniden paketleme yerine saniyeler sürer.")
+        segment_layout.addRow("Çıkış:", self.combo_output_format)
+        segment_group.setLayout(segment_layout)
+        left_layout.addWidget(segment_group)
+
         # İlerleme Çubukları
         progress_group = QGroupBox("İlerleme")
         progress_layout = QVBoxLayout()
 
-        self.label_current_file_progress = QLabel("Mevcut Dosya İlerlemesi:")
+        self.label_current_file_progress = QLabel("Çalışan İşlerin İlerlemesi:")
         progress_layout.addWidget(self.label_current_file_progress)
         self.current_file_progressbar = QProgressBar()
         self.current_file_progressbar.setTextVisible(True)
         progress_layout.addWidget(self.current_file_progressbar)
 
-        self.label_total_progress = QLabel("Toplam İşlem İlerlemesi:")
+        self.label_total_progress = QLabel(TOTAL_PROGRESS_LABEL)
         progress_layout.addWidget(self.label_total_progress)
         self.total_progressbar = QProgressBar()
         self.total_progressbar.setTextVisible(True)
@@ -179,6 +456,34 @@ class AudioMergeGUI(QWidget):
 
         # İşlem Butonları
         process_button_layout = QHBoxLayout()
+        process_button_layout.addWidget(QLabel("Paralel İş Sayısı:"))
+        self.spin_parallel_jobs = QSpinBox()
+        self.spin_parallel_jobs.setRange(1, max(64, default_concurrency()))
+        self.spin_parallel_jobs.setValue(default_concurrency())
+        process_button_layout.addWidget(self.spin_parallel_jobs)
+        self.checkbox_adaptive = QCheckBox("Uyarlanabilir")
+        self.checkbox_adaptive.setToolTip("Paralel iş sayısını toplu işlem sırasında ölçülen verime, CPU yüküne ve disk beklemesine göre ayarla; soldaki değerden başla.")
+        process_button_layout.addWidget(self.checkbox_adaptive)
+
+        process_button_layout.addWidget(QLabel("Kuyruk Sırası:"))
+        self.combo_queue_order = QComboBox()
+        self.combo_queue_order.addItem("Otomatik", None)
+        self.combo_queue_order.addItem("Eklenme Sırası", QUEUE_FIFO)
+        self.combo_queue_order.addItem("Önce En Uzun", QUEUE_LONGEST_FIRST)
+        self.combo_queue_order.addItem("Önce En Kısa", QUEUE_SHORTEST_FIRST)
+        self.combo_queue_order.setToolTip("Dosyaların başlatılma sırası. Otomatik, birden fazla iş paralel çalışırken en uzun dosyaları önce işler; böylece toplu işlem tek başına çalışan uzun bir dosyayla bitmez.")
+        process_button_layout.addWidget(self.combo_queue_order)
+
+        self.checkbox_skip_completed = QCheckBox("Tamamlananları Atla")
+        self.checkbox_skip_completed.setToolTip("Aynı ayarlarla çıktısı zaten tamamlanmış dosyaları atla (yarıda kalan toplu işleme devam et).")
+        self.checkbox_skip_completed.setChecked(True)
+        process_button_layout.addWidget(self.checkbox_skip_completed)
+
+        self.checkbox_incremental = QCheckBox("Artımlı")
+        self.checkbox_incremental.setToolTip("Kayıtlı giriş parmak izine (yol, boyut, değiştirilme zamanı, akışlar, ayarlar) güven ve değişmeyen dosyaları çıktılarını yeniden okumadan atla.")
+        self.checkbox_skip_completed.toggled.connect(self.checkbox_incremental.setEnabled)
+        process_button_layout.addWidget(self.checkbox_incremental)
+
         self.btn_run = QPushButton("Tümünü İşle")
         self.btn_run.clicked.connect(self.start_batch_processing)
         process_button_layout.addWidget(self.btn_run)
@@ -191,8 +496,9 @@ class AudioMergeGUI(QWidget):
         left_layout.addLayout(process_button_layout)
         
         # Konsol Çıkışı
-        self.output_log = QTextEdit()
+        self.output_log = QPlainTextEdit()
         self.output_log.setReadOnly(True)
+        self.output_log.setMaximumBlockCount(CONSOLE_MAX_LINES)
         left_layout.addWidget(QLabel("Konsol Çıkıtısı:"))
         left_layout.addWidget(self.output_log)
 
@@ -202,6 +508,8 @@ class AudioMergeGUI(QWidget):
         right_layout = QVBoxLayout()
         self.channel_selection_group = QGroupBox("Seçilen Dosyanın Ses Kanalları")
         self.channel_checkbox_layout = QVBoxLayout()
+        self.channel_checkboxes = [] # Kanal onay kutuları bir kez oluşturulur ve her dosya için yeniden kullanılır
+        self.selected_file_row = None
         
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -218,13 +526,42 @@ class AudioMergeGUI(QWidget):
         self.channel_selection_group.layout().addWidget(scroll_area)
         
         right_layout.addWidget(self.channel_selection_group)
+
+        rule_group = QGroupBox("Tüm Dosyalarda Kanal Seç")
+        rule_layout = QVBoxLayout()
+        self.edit_channel_rule = QLineEdit()
+        self.edit_channel_rule.setPlaceholderText("örn. lang=eng codec=aac, title!=commentary, index=1,2")
+        self.edit_channel_rule.setToolTip("index, language, title (regex), codec ve channels koşulları; tüm koşulları sağlayan akışlar seçilir.")
+        self.edit_channel_rule.returnPressed.connect(self.apply_channel_rule)
+        rule_layout.addWidget(self.edit_channel_rule)
+        self.btn_apply_rule = QPushButton("Tüm Dosyalara Uygula")
+        self.btn_apply_rule.clicked.connect(self.apply_channel_rule)
+        rule_layout.addWidget(self.btn_apply_rule)
+        rule_group.setLayout(rule_layout)
+        right_layout.addWidget(rule_group)
         main_layout.addLayout(right_layout, 1)
 
 
         self.setLayout(main_layout)
+
+        self.ui_timer = QTimer(self)
+        self.ui_timer.timeout.connect(self.flush_log)
+        self.ui_timer.timeout.connect(self.flush_progress)
+        self.ui_timer.timeout.connect(self.adapt_concurrency)
+        self.ui_timer.start(UI_REFRESH_INTERVAL_MS)
         
         self.output_directory = ""
 
+    def append_log(self, message):
+        """Konsol mesajını kuyruğa ekler; bir sonraki ui_timer adımında gösterilir."""
+        self.log_buffer.write(message)
+
+    def flush_log(self):
+        """Kuyruktaki tüm log satırlarını konsola tek seferde yazar."""
+        lines = self.log_buffer.drain()
+        if lines:
+            self.output_log.appendPlainText("\n".join(lines))
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -232,86 +569,106 @@ class AudioMergeGUI(QWidget):
             event.ignore()
 
     def dropEvent(self, event):
+        media_filter = self.media_filter()
+        folders = []
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
-            if os.path.isfile(file_path) and (file_path.lower().endswith(('.mp4', '.mkv', '.mov', '.avi'))):
+            if os.path.isdir(file_path):
+                folders.append(file_path)
+            elif os.path.isfile(file_path) and media_filter.matches(os.path.basename(file_path)):
                 self.add_file_to_list(file_path)
             else:
-                self.output_log.append(f"Geçersiz dosya sürükle-bırakıldı: {os.path.basename(file_path) if os.path.isfile(file_path) else file_path}")
+                self.append_log(f"Geçersiz dosya sürükle-bırakıldı: {os.path.basename(file_path) if os.path.isfile(file_path) else file_path}")
+        if folders:
+            self.scan_folders(folders)
         event.acceptProposedAction()
 
     def select_input_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Giriş Video(ları) Seç", "", "Video Dosyaları (*.mp4 *.mkv *.mov *.avi)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Giriş Video(ları) Seç", "", f"Video Dosyaları ({self.media_filter().dialog_filter()})")
         if files:
             for file_path in files:
                 self.add_file_to_list(file_path)
 
+    def select_input_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Giriş Klasörü Seç")
+        if folder:
+            self.scan_folders([folder])
+
+    def media_filter(self):
+        return MediaFilter(parse_patterns(self.edit_file_filter.text()))
+
+    def scan_folders(self, folders):
+        """Klasörleri arka planda listeler; bulunan dosyalar gruplar hâlinde eklenip incelenir."""
+        self.append_log(f"{', '.join(folders)} içinde {self.media_filter().dialog_filter()} aranıyor...")
+        scan = FolderScan(
+            folders, self.media_filter(), self.checkbox_recursive.isChecked(),
+            on_files=self.scan_files_found.emit, on_finished=self.scan_finished.emit
+        )
+        self.folder_scans.add(scan)
+        scan.start()
+
+    def on_scan_files_found(self, scan, paths):
+        if scan not in self.folder_scans:
+            return # Bu klasör taranırken liste temizlendi
+        for file_path in paths:
+            self.add_file_to_list(file_path)
+
+    def on_scan_finished(self, scan, count):
+        if scan in self.folder_scans:
+            self.folder_scans.discard(scan)
+            self.append_log(f"Klasör taraması bitti: {count} dosya bulundu.")
+
+    def save_probe_cache(self):
+        """Tekrar eklenen dosyaların yeniden incelenmemesi için FFprobe sonuçlarını kaydeder."""
+        try:
+            self.probe_cache.save()
+        except OSError as e:
+            self.append_log(f"HATA: FFprobe önbelleği kaydedilemedi: {e}")
+
     def add_file_to_list(self, file_path):
-        if any(data['path'] == file_path for data in self.input_files_data):
+        file_index = self.file_model.add_file(FileRecord(file_path))
+        if file_index is None:
             return
 
-        duration_sec = self.detect_video_duration(file_path)
-        duration_str = self.format_duration(duration_sec)
-        
-        all_channels = self.detect_audio_channels(file_path)
-        initial_selected_channels = list(all_channels) # Başlangıçta tümü seçili
-        
-        file_data = {
-            'path': file_path,
-            'duration_sec': duration_sec, # Süre bilgisini ekle
-            'all_channels': all_channels,
-            'selected_channels': initial_selected_channels, 
-            'checkboxes': [] 
-        }
-        self.input_files_data.append(file_data)
-        item = QListWidgetItem(f"{os.path.basename(file_path)} ({duration_str})") # Süreyi isme ekle
-        item.setData(Qt.UserRole, len(self.input_files_data) - 1)
-        self.file_list_widget.addItem(item)
-        self.output_log.append(f"'{os.path.basename(file_path)}' eklendi. Süre: {duration_str}, Algılanan kanallar: {all_channels}")
+        self.pending_probes[file_path] = file_index
+        self.probe_pool.submit(file_path, lambda path, info, error: self.probe_finished.emit(path, info, error or ""))
+
+    def on_probe_finished(self, file_path, media_info, error):
+        file_index = self.pending_probes.pop(file_path, None)
+        if file_index is None:
+            return # Dosya incelenirken liste temizlendi
+        status = STATUS_READY
+        if media_info is None:
+            self.append_log(f"HATA: '{os.path.basename(file_path)}' incelenirken FFprobe hatası: {error}")
+            media_info = {'duration_sec': 0.0, 'audio_streams': []}
+            status = STATUS_PROBE_FAILED
+
+        file_data = self.input_files_data[file_index]
+        file_data.set_media_info(media_info, status)
+        duration_str = self.format_duration(file_data.duration_sec)
+        all_channels = file_data.all_channels
+
+        self.file_model.update_rows(file_index)
+        self.append_log(f"'{os.path.basename(file_path)}' eklendi. Süre: {duration_str}, Algılanan kanallar: {all_channels}")
+
+        if self.selected_file_index() == file_index:
+            self.on_file_selected()
+        if not self.pending_probes:
+            self.save_probe_cache()
 
     def clear_file_list(self):
-        self.input_files_data.clear()
-        self.file_list_widget.clear()
+        for scan in self.folder_scans:
+            scan.cancel()
+        self.folder_scans.clear()
+        self.probe_pool.cancel()
+        self.pending_probes.clear()
+        self.file_model.clear()
         self.clear_channel_checkboxes() 
         self.label_selected_file_name.setText("Dosya Seçilmedi")
-        self.output_log.append("Dosya listesi temizlendi.")
+        self.append_log("Dosya listesi temizlendi.")
         self.current_file_progressbar.setValue(0)
         self.total_progressbar.setValue(0)
 
-    def detect_video_duration(self, file_path):
-        """FFprobe kullanarak videonun süresini saniye cinsinden algılar."""
-        command = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            file_path
-        ]
-        
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW # CMD penceresini gizle
-
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE, # Hataları da yakalamak için
-                text=True,
-                startupinfo=startupinfo
-            )
-            stdout, stderr = process.communicate()
-            if process.returncode == 0:
-                duration_str = stdout.strip()
-                if duration_str:
-                    return float(duration_str)
-            else:
-                self.output_log.append(f"HATA: '{os.path.basename(file_path)}' süresi algılanırken ffprobe hatası: {stderr.strip()}")
-        except Exception as e:
-            self.output_log.append(f"HATA: '{os.path.basename(file_path)}' süresi algılanırken istisna: {e}")
-        return 0.0
-
     def format_duration(self, seconds):
         """Saniyeyi HH:MM:SS formatına dönüştürür."""
         if seconds is None or seconds < 0:
@@ -322,205 +679,378 @@ class AudioMergeGUI(QWidget):
         return f"{hours:02}:{minutes:02}:{secs:02}"
 
 
-    def detect_audio_channels(self, file_path):
-        command = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a",
-            "-show_entries", "stream=index",
-            "-of", "csv=p=0",
-            file_path
-        ]
+    def selected_file_index(self):
+        rows = self.file_table.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
 
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW # CMD penceresini gizle
-
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE, # Hataları da yakalamak için
-                text=True,
-                startupinfo=startupinfo
-            )
-            stdout, stderr = process.communicate()
-            if process.returncode == 0:
-                channels = stdout.strip().split('\n')
-            else:
-                self.output_log.append(f"HATA: '{os.path.basename(file_path)}' ses kanalları algılanırken ffprobe hatası: {stderr.strip()}")
-                channels = [] # Hata durumunda boş liste döndür
-        except Exception as e:
-            self.output_log.append(f"HATA: '{os.path.basename(file_path)}' ses kanalları algılanırken istisna: {e}")
-            channels = []
-
-        detected_indices = []
-        for ch in channels:
-            try:
-                if ch.strip(): 
-                    idx = int(ch)
-                    detected_indices.append(idx)
-            except ValueError:
-                self.output_log.append(f"FFprobe'dan geçersiz kanal değeri algılandı: '{ch}'")
-                continue
-        detected_indices.sort()
-        return detected_indices
+    def toggle_pinned_file(self):
+        file_index = self.selected_file_index()
+        if file_index is None:
+            self.append_log("Lütfen sabitlemek için bir dosya seçin.")
+            return
+        file_data = self.input_files_data[file_index]
+        file_data.priority = 0 if file_data.priority else 1
+        self.file_model.update_rows(file_index)
+        self.append_log(f"'{os.path.basename(file_data.path)}' kuyruğun önüne sabitlendi." if file_data.priority else f"'{os.path.basename(file_data.path)}' sabitlemesi kaldırıldı.")
 
     def on_file_selected(self):
-        selected_items = self.file_list_widget.selectedItems()
-        if not selected_items:
+        file_index = self.selected_file_index()
+        if file_index is None:
             self.clear_channel_checkboxes()
             self.label_selected_file_name.setText("Dosya Seçilmedi")
             return
 
-        item = selected_items[0]
-        file_index = item.data(Qt.UserRole)
         current_file_data = self.input_files_data[file_index]
         
-        self.label_selected_file_name.setText(f"Seçilen Dosya: {os.path.basename(current_file_data['path'])}")
+        self.label_selected_file_name.setText(f"Seçilen Dosya: {os.path.basename(current_file_data.path)}")
         
-        self.clear_channel_checkboxes()
-
-        current_file_data['checkboxes'] = [] 
-        for idx in current_file_data['all_channels']:
-            checkbox = QCheckBox(f"Ses Kanalı {idx}")
-            checkbox.setChecked(idx in current_file_data['selected_channels'])
-            
-            checkbox.stateChanged.connect(lambda state, i=idx, f_idx=file_index: self.update_channel_selection(f_idx, i, state == Qt.Checked))
-            
+        self.selected_file_row = file_index
+        streams = current_file_data.audio_streams
+        while len(self.channel_checkboxes) < len(streams):
+            checkbox = QCheckBox()
+            slot = len(self.channel_checkboxes)
+            checkbox.toggled.connect(lambda checked, slot=slot: self.on_channel_checkbox_toggled(slot, checked))
             self.channel_checkbox_layout.addWidget(checkbox)
-            current_file_data['checkboxes'].append(checkbox)
+            self.channel_checkboxes.append(checkbox)
+
+        for checkbox, stream in zip(self.channel_checkboxes, streams):
+            channel_index = stream['index']
+            checkbox.blockSignals(True)
+            checkbox.setText(f"Ses Kanalı {channel_index} ({describe_audio_stream(stream)})")
+            checkbox.setChecked(channel_index in current_file_data.selected_channels)
+            checkbox.blockSignals(False)
+            checkbox.setVisible(True)
+        for checkbox in self.channel_checkboxes[len(streams):]:
+            checkbox.setVisible(False)
 
     def clear_channel_checkboxes(self):
-        while self.channel_checkbox_layout.count():
-            item = self.channel_checkbox_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        self.selected_file_row = None
+        for checkbox in self.channel_checkboxes:
+            checkbox.setVisible(False)
+
+    def on_channel_checkbox_toggled(self, slot, checked):
+        if self.selected_file_row is None:
+            return
+        channel_index = self.input_files_data[self.selected_file_row].audio_streams[slot]['index']
+        self.update_channel_selection(self.selected_file_row, channel_index, checked)
 
     def update_channel_selection(self, file_index, channel_idx, is_checked):
         file_data = self.input_files_data[file_index]
-        if is_checked:
-            if channel_idx not in file_data['selected_channels']:
-                file_data['selected_channels'].append(channel_idx)
-                file_data['selected_channels'].sort() 
-        else:
-            if channel_idx in file_data['selected_channels']:
-                file_data['selected_channels'].remove(channel_idx)
-                file_data['selected_channels'].sort() 
+        file_data.select_channel(channel_idx, is_checked)
+        self.file_model.update_rows(file_index)
 
 
+    def apply_channel_rule(self):
+        """İncelenen her dosyada eşleşen akışları seçer; her akış düzeni için bir kez karar verir."""
+        rule_text = self.edit_channel_rule.text().strip()
+        try:
+            rule = parse_rule(rule_text)
+        except RuleError as e:
+            self.append_log(f"HATA: {e}")
+            return
+        records = [file_data for file_data in self.input_files_data if file_data.status != STATUS_PROBING]
+        if not records:
+            self.append_log("Kuralın uygulanacağı incelenmiş dosya yok.")
+            return
+
+        groups, unmatched = apply_rule(records, rule)
+        self.append_log(f"'{rule_text}' kuralı {groups} farklı akış düzenine sahip {len(records)} dosyaya uygulandı.")
+        if unmatched:
+            self.append_log(f"UYARI: {unmatched} dosyada hiçbir akış eşleşmedi; işlemeden önce kanallarını seçin.")
+        self.file_model.update_rows(0, len(self.input_files_data) - 1)
+        self.on_file_selected()
+
     def select_output_directory(self):
         dir_path = QFileDialog.getExistingDirectory(self, "Çıkış Dizini Seç")
         if dir_path:
             self.output_directory = dir_path
             self.label_output_dir.setText(f"Çıkış Dizini: {dir_path}")
 
+    def apply_encoder_preset(self, index):
+        """Kodlayıcı alanlarını seçilen ön ayarın değerleriyle doldurur."""
+        preset_name = self.combo_encoder_preset.itemData(index)
+        if preset_name is None:
+            return # Özel seçeneği mevcut alan değerlerini korur
+        settings = PRESETS[preset_name]
+        self.applying_preset = True
+        self.combo_codec.setEditText(settings.codec or "")
+        self.edit_bitrate.setText(settings.bitrate or "")
+        self.combo_sample_rate.setEditText(str(settings.sample_rate or ""))
+        self.combo_channel_layout.setEditText(settings.channel_layout or "")
+        self.spin_encoder_threads.setValue(settings.threads or 0)
+        self.applying_preset = False
+
+    def on_encoder_field_edited(self):
+        """Bir alan elle değiştirildiğinde ön ayar kutusunu Özel'e çevirir."""
+        if self.applying_preset:
+            return
+        self.combo_encoder_preset.blockSignals(True)
+        self.combo_encoder_preset.setCurrentIndex(self.combo_encoder_preset.count() - 1)
+        self.combo_encoder_preset.blockSignals(False)
+
     def start_batch_processing(self):
         if not self.input_files_data:
-            self.output_log.append("Lütfen işlemek için en az bir dosya seçin veya sürükleyin.")
+            self.append_log("Lütfen işlemek için en az bir dosya seçin veya sürükleyin.")
             return
         if not self.output_directory:
-            self.output_log.append("Lütfen çıkış dizinini belirleyin.")
+            self.append_log("Lütfen çıkış dizinini belirleyin.")
+            return
+        if self.pending_probes or self.folder_scans:
+            self.append_log("Lütfen tüm klasörlerin taranması ve tüm dosyaların incelenmesi bitene kadar bekleyin.")
+            return
+
+        sample_rate = self.combo_sample_rate.currentText().strip()
+        if sample_rate and not sample_rate.isdigit():
+            self.append_log("HATA: Örnekleme hızı Hz cinsinden bir sayı olmalıdır, ör. 48000.")
+            return
+
+        try:
+            encoder_settings = EncoderSettings(
+                codec=self.combo_codec.currentText().strip(),
+                bitrate=self.edit_bitrate.text().strip(),
+                sample_rate=sample_rate,
+                channel_layout=self.combo_channel_layout.currentText().strip(),
+                threads=self.spin_encoder_threads.value()
+            )
+            profiles = parse_profiles(self.edit_profiles.text().split(), encoder_settings)
+            mix_settings = MixSettings(
+                self.combo_mixer.currentData(), parse_gains(self.edit_gains.text().split()),
+                parse_weights(self.edit_weights.text().split()), self.checkbox_normalize.isChecked(),
+                loudness=self.combo_loudness.currentData()
+            )
+            track_settings = TrackSettings(
+                self.combo_keep_audio.currentData(), self.checkbox_keep_subtitles.isChecked(),
+                self.checkbox_keep_data.isChecked(), self.edit_mix_title.text().strip(), self.edit_mix_language.text().strip()
+            )
+            start_text = self.edit_segment_start.text().strip()
+            end_text = self.edit_segment_end.text().strip()
+            start_sec = (parse_time(start_text) if start_text else None) or None # 0'dan başlamak girişin tamamıdır
+            end_sec = parse_time(end_text) if end_text else None
+            if end_sec is not None and end_sec <= (start_sec or 0):
+                raise ValueError("Bölümün bitişi başlangıcından sonra olmalıdır.")
+            audio_only_format = self.combo_output_format.currentData()
+            if audio_only_format in ('wav', 'flac') and track_settings.keeps_streams():
+                raise ValueError(f"{audio_only_format.upper()} dosyaları yalnızca karışımı tutar. Orijinal akışları korumak için M4A seçin.")
+        except ValueError as e:
+            self.append_log(f"HATA: {e}")
             return
 
         for file_data in self.input_files_data:
-            if not file_data['selected_channels']:
-                self.output_log.append(f"HATA: '{os.path.basename(file_data['path'])}' için hiçbir ses kanalı seçilmedi. Lütfen en az bir kanal seçin veya dosyayı listeden çıkarın.")
+            if not file_data.selected_channels:
+                self.append_log(f"HATA: '{os.path.basename(file_data.path)}' için hiçbir ses kanalı seçilmedi. Lütfen en az bir kanal seçin veya dosyayı listeden çıkarın.")
                 return
 
+        self.log_buffer.drain()
         self.output_log.clear()
-        self.output_log.append("Toplu işlem başlatılıyor...")
+        self.append_log("Toplu işlem başlatılıyor...")
         self.btn_run.setEnabled(False)
         self.btn_stop.setEnabled(True)
-        self.current_processing_index = 0
+        self.btn_clear_files.setEnabled(False) # Çalışanlar ve zamanlayıcı dosya listesini dizinler
         self.current_file_progressbar.setValue(0)
         self.total_progressbar.setValue(0)
-        self.update_total_progress() # Başlangıç toplam ilerlemeyi ayarla
-        self.process_next_file()
-
-    def process_next_file(self):
-        if self.current_processing_index < len(self.input_files_data):
-            file_data = self.input_files_data[self.current_processing_index]
-            input_file = file_data['path']
-            selected_channels = file_data['selected_channels']
-            total_duration_sec = file_data['duration_sec'] # Süre bilgisini al
-
-            base_name = os.path.basename(input_file)
-            name_without_ext, ext = os.path.splitext(base_name)
-            output_file = os.path.join(self.output_directory, f"{name_without_ext}_merged.mkv")
-            
-            # Dosya listede highlight edilsin
-            for i in range(self.file_list_widget.count()):
-                item = self.file_list_widget.item(i)
-                item_file_index = item.data(Qt.UserRole)
-                if item_file_index == self.current_processing_index:
-                    item.setBackground(Qt.yellow)
-                else:
-                    item.setBackground(Qt.white)
-
-            self.worker = FFmpegWorker(input_file, output_file, selected_channels, total_duration_sec)
-            self.worker.log_output.connect(self.output_log.append)
-            self.worker.progress_update.connect(self.update_current_file_progress) # Yeni sinyali bağla
-            self.worker.finished_single_file.connect(self.on_single_file_finished)
-            self.worker.start()
-        else:
-            self.output_log.append("\nTüm dosyalar başarıyla işlendi!")
-            self.btn_run.setEnabled(True)
-            self.btn_stop.setEnabled(False)
-            self.worker = None
-            self.total_progressbar.setValue(100) # Tüm işlem bitince %100 yap
-            # Tüm dosyaların arka planını sıfırla
-            for i in range(self.file_list_widget.count()):
-                self.file_list_widget.item(i).setBackground(Qt.white)
+        self.pending_progress.clear()
+
+        self.encoder_settings = encoder_settings
+        self.append_log(f"Ses kodlaması: {self.encoder_settings.describe()}")
+        self.mix_settings = mix_settings
+        self.append_log(f"Karıştırma: {self.mix_settings.describe()}")
+        self.track_settings = track_settings
+        if not self.track_settings.is_default():
+            self.append_log(f"Çıkış parçaları: {self.track_settings.describe()}")
+        self.output_profiles = profiles
+        for profile in self.output_profiles:
+            self.append_log(f"Çıkış profilleri: {profile.describe()}")
+        self.segment_start_sec = start_sec
+        self.segment_end_sec = end_sec
+        if start_sec is not None or end_sec is not None:
+            self.append_log(f"Bölüm: {start_text or 0} - {end_text or 'son'}.")
+        self.audio_only_format = audio_only_format
+        if audio_only_format:
+            self.append_log(f"Çıkış: yalnızca ses ({audio_only_format.upper()}).")
+
+        self.journal = None
+        if self.checkbox_skip_completed.isChecked():
+            incremental = self.checkbox_incremental.isChecked()
+            self.journal = JobJournal(journal_path(self.output_directory), verify_outputs=not incremental)
+            self.append_log("Artımlı mod: değişmeyen dosyalar atlanacak." if incremental else "Önceki bir çalıştırmada tamamlanan dosyalar atlanacak.")
+
+        self.batch_progress = BatchProgress(len(self.input_files_data))
+        self.batch_report = BatchReport()
+        for file_index, file_data in enumerate(self.input_files_data):
+            self.batch_progress.add_job(
+                file_index, segment_duration(file_data.duration_sec, self.segment_start_sec, self.segment_end_sec)
+            )
+            file_data.status = STATUS_QUEUED
+            file_data.percent = None
+        self.file_model.update_rows(0, len(self.input_files_data) - 1) # Tüm satırlar dosya başına değil, bir kez yeniden çizilir
+        self.concurrency_controller = None
+        concurrency = self.spin_parallel_jobs.value()
+        if self.checkbox_adaptive.isChecked():
+            self.concurrency_controller = ConcurrencyController(
+                concurrency, max_jobs=max(concurrency, 2 * default_concurrency()),
+                on_decision=lambda concurrency, reason: self.append_log(f"Paralel iş sayısı {concurrency} yapıldı: {reason}")
+            )
+        self.scheduler = JobScheduler(
+            self.start_file_job,
+            concurrency=concurrency,
+            on_batch_finished=self.on_batch_finished
+        )
+        self.append_log(f"Aynı anda en fazla {self.scheduler.concurrency} dosya işlenecek.")
+        policy = self.combo_queue_order.currentData() or default_queue_policy(concurrency)
+        self.append_log(f"Kuyruk sırası: {QUEUE_POLICY_LABELS[policy]}.")
+        store = self.input_files_data
+        self.scheduler.run(order_jobs(
+            range(len(store)), policy,
+            duration_of=lambda file_index: store[file_index].duration_sec,
+            size_of=lambda file_index: file_size(store[file_index].path),
+            priority_of=lambda file_index: store[file_index].priority
+        ))
+
+    def start_file_job(self, file_index):
+        file_data = self.input_files_data[file_index]
+        input_file = file_data.path
+        selected_channels = file_data.selected_channels
+        total_duration_sec = file_data.duration_sec # Süre bilgisini al
+
+        output_file = default_output_path(input_file, self.output_directory, self.audio_only_format or 'mkv',
+                                          self.segment_start_sec, self.segment_end_sec)
+
+        self.set_file_status(file_index, STATUS_RUNNING)
+
+        worker = FFmpegWorker(
+            input_file, output_file, selected_channels, total_duration_sec, self.log_buffer.write, self.encoder_settings,
+            self.journal, self.mix_settings, self.track_settings, file_data.all_channels, self.output_profiles,
+            self.segment_start_sec, self.segment_end_sec, bool(self.audio_only_format)
+        )
+        worker.progress_update.connect(lambda progress, i=file_index: self.update_file_progress(i, progress))
+        worker.finished_single_file.connect(lambda _, success, i=file_index: self.on_single_file_finished(i, success))
+        self.workers[file_index] = worker
+        worker.start()
+
+    def set_file_status(self, file_index, status):
+        self.input_files_data[file_index].status = status
+        self.file_model.update_rows(file_index)
+
+    def update_file_progress(self, file_index, progress):
+        self.pending_progress[file_index] = progress
+
+    def flush_progress(self):
+        """Son adımdan beri gelen tüm ilerlemeyi çubukları tek seferde yenileyerek uygular."""
+        if not self.pending_progress or not self.scheduler:
+            return
+        for file_index, progress in self.pending_progress.items():
+            self.batch_progress.update(file_index, progress.out_time_sec, progress.speed)
+            percent = progress.percent
+            if percent is None:
+                continue
+            self.scheduler.job_progress(file_index, percent)
+            self.input_files_data[file_index].percent = percent
+            self.file_model.update_rows(file_index)
+        self.pending_progress.clear()
+        self.update_total_progress()
+
+    def adapt_concurrency(self):
+        if not self.concurrency_controller or not self.scheduler or self.scheduler.stopped or not self.scheduler.is_active():
+            return
+        concurrency = self.concurrency_controller.sample(
+            self.batch_progress.processed_sec(), len(self.scheduler.running), len(self.scheduler.pending)
+        )
+        if concurrency is not None:
+            self.scheduler.set_concurrency(concurrency)
 
-    def update_current_file_progress(self, percent):
-        self.current_file_progressbar.setValue(percent)
-        self.update_total_progress() # Mevcut dosyanın ilerlemesi değiştiğinde toplam ilerlemeyi de güncelle
-        
     def update_total_progress(self):
-        if not self.input_files_data:
+        if not self.scheduler:
+            self.current_file_progressbar.setValue(0)
             self.total_progressbar.setValue(0)
             return
-        
-        total_files = len(self.input_files_data)
-        completed_files = self.current_processing_index
-        
-        if total_files > 0:
-            current_file_progress_weight = self.current_file_progressbar.value() / 100.0 if self.worker and self.worker.isRunning() else 0
-            
-            total_progress_value = int(((completed_files + current_file_progress_weight) / total_files) * 100)
-            self.total_progressbar.setValue(total_progress_value)
-        else:
-            self.total_progressbar.setValue(0)
 
+        running = self.scheduler.running
+        running_progress = int(sum(running.values()) / len(running)) if running else 0
+        self.current_file_progressbar.setValue(running_progress)
+        self.total_progressbar.setValue(self.batch_progress.percent())
+        eta_sec = self.batch_progress.eta_sec()
+        if eta_sec is not None:
+            self.label_total_progress.setText(f"{TOTAL_PROGRESS_LABEL} Kalan süre {self.format_duration(eta_sec)}, {self.batch_progress.throughput():.1f}x gerçek zamanlı")
+
+    def on_single_file_finished(self, file_index, success):
+        worker = self.workers.pop(file_index, None)
+        self.pending_progress.pop(file_index, None)
+        skipped = False
+        if worker:
+            worker.wait() # finished_single_file worker'ın son adımı
+            skipped = worker.runner.skipped
+            self.batch_report.add(worker.runner.stats)
+
+        # İşlem tamamlanan dosyanın satırını güncelle
+        if skipped:
+            status = STATUS_SKIPPED
+        elif success:
+            status = STATUS_DONE
+        else:
+            status = STATUS_STOPPED if worker and worker.runner.stopped else STATUS_FAILED
+        self.input_files_data[file_index].percent = 100 if success else None
+        self.set_file_status(file_index, status)
 
-    def on_single_file_finished(self, input_file_processed, success):
-        # İşlem tamamlanan dosyanın listedeki öğesini güncelle
-        for i in range(self.file_list_widget.count()):
-            item = self.file_list_widget.item(i)
-            file_data_index = item.data(Qt.UserRole)
-            file_data = self.input_files_data[file_data_index]
-            if file_data['path'] == input_file_processed:
-                item.setBackground(Qt.white)
-                if success:
-                    item.setForeground(Qt.darkGreen)
-                else:
-                    item.setForeground(Qt.red)
-                break
-        
-        self.current_processing_index += 1
-        self.current_file_progressbar.setValue(0) # Yeni dosyaya geçmeden önceki çubuğu sıfırla
+        self.batch_progress.finish(file_index)
+        self.scheduler.job_finished(file_index, success, skipped, stopped=status == STATUS_STOPPED)
         self.update_total_progress() # Toplam ilerlemeyi güncelle
-        self.process_next_file()
+
+    def on_batch_finished(self):
+        scheduler = self.scheduler
+        if scheduler.stopped:
+            for file_data in self.input_files_data: # Durdurma nedeniyle sırada kalan dosyalar yeniden çalıştırılabilir
+                if file_data.status == STATUS_QUEUED:
+                    file_data.status = STATUS_READY
+            self.file_model.update_rows(0, len(self.input_files_data) - 1)
+            self.append_log(f"\nToplu işlem durduruldu. {scheduler.succeeded} dosya tamamlandı, "
+                            f"{scheduler.stopped_jobs} durduruldu, {scheduler.failed} başarısız.")
+        elif scheduler.failed:
+            self.append_log(f"\nToplu işlem bitti: {scheduler.succeeded} başarılı, {scheduler.failed} başarısız.")
+        elif scheduler.stopped_jobs:
+            self.append_log(f"\nToplu işlem bitti: {scheduler.succeeded} başarılı, {scheduler.stopped_jobs} durduruldu.")
+        else:
+            self.append_log("\nTüm dosyalar başarıyla işlendi!")
+            self.total_progressbar.setValue(100) # Tüm işlem bitince %100 yap
+        if scheduler.skipped:
+            self.append_log(f"{scheduler.skipped} dosya atlandı (zaten tamamlanmış).")
+        self.write_batch_report()
+        self.btn_run.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+        self.btn_clear_files.setEnabled(True)
+        self.current_file_progressbar.setValue(0)
+        self.label_total_progress.setText(TOTAL_PROGRESS_LABEL)
+
+    def write_batch_report(self):
+        """Dosya başına kaynak kullanımını CSV olarak, toplam değerleri yanındaki bir JSON dosyasına yazar."""
+        self.batch_report.finish()
+        report_file = default_report_path(os.path.join(self.output_directory, "logs"), 'csv')
+        try:
+            self.batch_report.write(report_file)
+        except OSError as e:
+            self.append_log(f"Toplu işlem raporu yazılamadı: {e}")
+            return
+        summary = self.batch_report.summary()
+        throughput = f"saatte {summary['media_hours_per_hour'] or 0:.2f} medya saati"
+        if summary['realtime_factor_p50'] is not None:
+            throughput += (f", gerçek zaman katsayısı p50 {summary['realtime_factor_p50']:.1f}x"
+                           f" / p95 {summary['realtime_factor_p95']:.1f}x")
+        self.append_log(f"Verim: {throughput}")
+        self.append_log(f"Toplu işlem raporu: {report_file}")
 
     def stop_processing(self):
-        if self.worker and self.worker.isRunning():
-            self.worker.stop()
+        if self.scheduler and self.scheduler.is_active():
+            for file_index in self.scheduler.stop():
+                self.workers[file_index].stop()
             self.btn_stop.setEnabled(False) 
         else:
-            self.output_log.append("Durdurulacak aktif bir işlem yok.")
+            self.append_log("Durdurulacak aktif bir işlem yok.")
+
+    def closeEvent(self, event):
+        for scan in self.folder_scans:
+            scan.cancel()
+        self.probe_pool.shutdown()
+        self.save_probe_cache()
+        super().closeEvent(event)
 
 
 if __name__ == '__main__':
@@ -0,0 +1 @@
+"""Qt-free building blocks shared by the FFmpeg Audio Merger front ends."""
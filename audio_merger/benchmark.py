@@ -0,0 +1,276 @@
+"""Benchmark harness: synthetic fixtures, probe latency and sequential vs parallel batches.
+
+Run with ``python -m audio_merger.benchmark -o results.json``. Fixtures are generated
+with ffmpeg's lavfi sources (testsrc video plus one sine tone per audio track) in a
+work directory, so no media has to be checked in and runs are comparable between
+machines and commits. The JSON result contains:
+
+- ``probe``: cold (ffprobe) and warm (probe cache) latency per file.
+- ``batches``: for each mode (sequential, parallel) and mixer (``amix``, or
+  ``numpy`` as '<mode>-numpy' when NumPy is installed) the batch wall time, media
+  seconds per wall second, per-job wall time and realtime factor, plus
+  ``event_loop_busy_sec``, how long the thread that owns the scheduler was busy
+  handling progress events per tick (a stand-in for GUI-thread blocking), and
+  ``peak_rss_kib``, the peak resident memory of this process and of the largest
+  ffmpeg child so far (cumulative maxima), where the platform reports it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .engine import MergeJob, create_runner
+from .mixing import MIXER_AMIX, MixSettings, numpy_available
+from .probe import ProbeCache, probe_media, run_ffprobe
+from .report import percentile
+from .scheduler import JobScheduler, default_concurrency
+from .utils import hidden_startupinfo
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TICK_INTERVAL = 0.01  # Event loop tick of the simulated GUI thread, seconds
+TRACK_LANGUAGES = ("eng", "jpn", "ger", "fre")
+
+
+def parse_list(text, convert=str):
+    return [convert(part) for part in text.split(',') if part.strip()]
+
+
+def fixture_command(path, duration_sec, audio_tracks):
+    """Returns the ffmpeg command writing a testsrc video with ``audio_tracks`` sine tones."""
+    command = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=25:duration={duration_sec}"]
+    for track in range(audio_tracks):
+        command += ["-f", "lavfi", "-i", f"sine=frequency={220 * (track + 1)}:sample_rate=48000:duration={duration_sec}"]
+    command += ["-map", "0:v"]
+    for track in range(audio_tracks):
+        command += [
+            "-map", f"{track + 1}:a",
+            f"-metadata:s:a:{track}", f"language={TRACK_LANGUAGES[track % len(TRACK_LANGUAGES)]}",
+            f"-metadata:s:a:{track}", f"title=Track {track + 1}",
+        ]
+    command += ["-c:v", "mpeg4", "-q:v", "5", "-c:a", "aac", "-b:a", "96k", "-y", path]
+    return command
+
+
+def make_fixtures(fixture_dir, durations, track_counts, containers):
+    """Generates every duration x track count x container combination that is missing."""
+    os.makedirs(fixture_dir, exist_ok=True)
+    fixtures = []
+    for duration_sec in durations:
+        for audio_tracks in track_counts:
+            for container in containers:
+                path = os.path.join(fixture_dir, f"synthetic_{duration_sec}s_{audio_tracks}a.{container}")
+                if not os.path.exists(path):
+                    subprocess.run(fixture_command(path, duration_sec, audio_tracks), check=True,
+                                   startupinfo=hidden_startupinfo())
+                fixtures.append({'path': path, 'duration_sec': duration_sec, 'audio_tracks': audio_tracks,
+                                 'container': container})
+    return fixtures
+
+
+def summarize(values):
+    """Returns mean, p50, p95 and max of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'mean': round(sum(ordered) / len(ordered), 6),
+        'p50': round(percentile(ordered, 0.5), 6),
+        'p95': round(percentile(ordered, 0.95), 6),
+        'max': round(ordered[-1], 6),
+    }
+
+
+def peak_rss_kib():
+    """Returns the peak RSS of this process and of its largest finished child, in KiB."""
+    if resource is None:
+        return None
+    scale = 1024 if sys.platform == 'darwin' else 1  # macOS reports bytes
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    }
+
+
+def benchmark_probe(fixtures, cache_file):
+    cold = []
+    for fixture in fixtures:
+        started = time.perf_counter()
+        run_ffprobe(fixture['path'])
+        cold.append(time.perf_counter() - started)
+
+    cache = ProbeCache(cache_file)
+    for fixture in fixtures:
+        probe_media(fixture['path'], cache)  # Fill the cache
+    warm = []
+    for fixture in fixtures:
+        started = time.perf_counter()
+        probe_media(fixture['path'], cache)
+        warm.append(time.perf_counter() - started)
+    return {'cold_sec': summarize(cold), 'warm_sec': summarize(warm)}
+
+
+def batch_jobs(fixtures, media_info, output_dir, copies, mix=None):
+    """Returns ``copies`` MergeJobs per fixture, mixing all audio tracks, with distinct outputs."""
+    jobs = []
+    for copy in range(copies):
+        for fixture in fixtures:
+            info = media_info[fixture['path']]
+            name = os.path.splitext(os.path.basename(fixture['path']))[0]
+            jobs.append(MergeJob(
+                fixture['path'], os.path.join(output_dir, f"{name}_{fixture['container']}_{copy}.mkv"),
+                [stream['index'] for stream in info['audio_streams']], info['duration_sec'], mix=mix
+            ))
+    return jobs
+
+
+def run_batch(jobs, concurrency):
+    """Runs one batch the way the front ends do and returns its timings.
+
+    Worker threads run the jobs; the calling thread owns the scheduler and handles
+    every progress and finish event from a queue, like the GUI thread does with
+    queued signals. The time spent handling events between ticks is recorded.
+    """
+    events = queue.Queue()
+    job_times = {}
+
+    def start_job(job_index):
+        job = jobs[job_index]
+        os.makedirs(os.path.dirname(job.output_file), exist_ok=True)
+        runner = create_runner(job, on_progress=lambda progress: events.put(('progress', job_index, progress)))
+
+        def run():
+            started = time.perf_counter()
+            success = False
+            try:
+                success = runner.run()
+            finally:  # The loop below waits for every job to report back
+                events.put(('finished', job_index, success, time.perf_counter() - started))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    scheduler = JobScheduler(start_job, concurrency=concurrency)
+    busy = []
+    started = time.perf_counter()
+    scheduler.run(range(len(jobs)))
+    while scheduler.is_active():
+        time.sleep(TICK_INTERVAL)
+        tick_started = time.perf_counter()
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'progress':
+                progress = event[2]
+                if progress.percent is not None:
+                    scheduler.job_progress(event[1], progress.percent)
+            else:
+                _, job_index, success, wall_sec = event
+                job_times[job_index] = (success, wall_sec)
+                scheduler.job_finished(job_index, success)
+        busy.append(time.perf_counter() - tick_started)
+    wall_sec = time.perf_counter() - started
+
+    results = []
+    for job_index, job in enumerate(jobs):
+        success, job_wall_sec = job_times.get(job_index, (False, 0.0))
+        results.append({
+            'input': os.path.basename(job.input_file),
+            'success': success,
+            'wall_sec': round(job_wall_sec, 4),
+            'realtime_factor': round(job.total_duration_sec / job_wall_sec, 2) if job_wall_sec else None,
+        })
+    media_sec = sum(job.total_duration_sec for job in jobs)
+    return {
+        'concurrency': scheduler.concurrency,
+        'wall_sec': round(wall_sec, 4),
+        'media_sec': round(media_sec, 2),
+        'realtime_factor': round(media_sec / wall_sec, 2) if wall_sec else None,
+        'failed': scheduler.failed,
+        'job_wall_sec': summarize([result['wall_sec'] for result in results]),
+        'job_realtime_factor': summarize([result['realtime_factor'] or 0.0 for result in results]),
+        'event_loop_busy_sec': summarize(busy),
+        'peak_rss_kib': peak_rss_kib(),
+        'jobs': results,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m audio_merger.benchmark",
+        description="Benchmark probing and merging on synthetic lavfi fixtures."
+    )
+    parser.add_argument("-o", "--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--workdir", help="Directory for fixtures and outputs (default: a temporary directory).")
+    parser.add_argument("--durations", default="10,30", help="Fixture durations in seconds (default: %(default)s).")
+    parser.add_argument("--tracks", default="2,4", help="Audio track counts of the fixtures (default: %(default)s).")
+    parser.add_argument("--containers", default="mkv,mp4", help="Fixture containers (default: %(default)s).")
+    parser.add_argument("--copies", type=int, default=2,
+                        help="How many times every fixture is queued per batch (default: %(default)s).")
+    parser.add_argument("--mixers", default="amix,numpy" if numpy_available() else "amix",
+                        help="Mixing backends to compare (default: %(default)s).")
+    parser.add_argument("-j", "--jobs", type=int, default=default_concurrency(),
+                        help="Concurrency of the parallel batch (default: CPU core count).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="audio-merger-bench-")
+    try:
+        fixtures = make_fixtures(
+            os.path.join(workdir, "fixtures"),
+            parse_list(args.durations, int), parse_list(args.tracks, int), parse_list(args.containers)
+        )
+        probe = benchmark_probe(fixtures, os.path.join(workdir, "probe_cache.json"))
+        media_info = {fixture['path']: run_ffprobe(fixture['path']) for fixture in fixtures}
+        for path, info in media_info.items():
+            if not info['audio_streams']:
+                sys.stderr.write(f"error: ffprobe found no audio streams in '{path}'\n")
+                return 1
+
+        batches = {}
+        for mixer in parse_list(args.mixers):
+            for mode, concurrency in (('sequential', 1), ('parallel', args.jobs)):
+                name = mode if mixer == MIXER_AMIX else f"{mode}-{mixer}"
+                jobs = batch_jobs(fixtures, media_info, os.path.join(workdir, "output", name), max(1, args.copies),
+                                  MixSettings(mixer))
+                batches[name] = run_batch(jobs, concurrency)
+        results = {
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'machine': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+            },
+            'fixtures': [{**fixture, 'path': os.path.basename(fixture['path'])} for fixture in fixtures],
+            'probe': probe,
+            'batches': batches,
+        }
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
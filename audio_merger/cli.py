@@ -0,0 +1,508 @@
+"""Headless command line front end: merges audio streams of many files without Qt.
+
+Usage: ``python -m audio_merger -o merged/ [options] INPUT...``; ``--help`` lists every option.
+
+Progress is written to stdout as JSON lines, one event per line (``batch_started``,
+``job_started``, ``job_progress``, ``job_finished``, ``concurrency_changed`` and
+``batch_finished``), for example::
+
+    {"event": "job_progress", "input": "a.mkv", "percent": 42, "out_time_sec": 12.5,
+     "speed": 3.1, "total_percent": 17, "throughput": 24.8, "eta_sec": 310.5}
+
+Exit status is 0 when every job succeeded, 1 when at least one job failed,
+2 on usage errors and 130 when interrupted.
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+
+from .concurrency import ConcurrencyController
+from .encoding import PRESETS, preset_settings
+from .engine import AUDIO_ONLY_FORMATS, MergeJob, create_runner, default_output_path
+from .journal import JobJournal, journal_path
+from .logsink import default_log_path
+from .mixing import (DEFAULT_LOUDNESS_TARGET, LOUDNESS_FILTERS, MIXER_AMIX, MIXER_NUMPY, MIXERS, MixSettings,
+                     numpy_available, parse_gains, parse_weights)
+from .outputs import parse_profiles
+from .probe import ProbeCache, ProbeError, probe_media
+from .progress import BatchProgress
+from .report import BatchReport, JobStats, default_report_path
+from .scan import DEFAULT_PATTERNS, MediaFilter, iter_media_files, parse_patterns
+from .scheduler import QUEUE_POLICIES, JobScheduler, default_concurrency, default_queue_policy, order_jobs
+from .selection import parse_rule
+from .tracks import KEEP_AUDIO_MODES, TrackSettings
+from .utils import parse_time
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class UsageError(Exception):
+    """Raised for invalid command line input such as a malformed manifest."""
+
+
+def parse_keep_audio(text):
+    """Parses --keep-audio: 'selected', 'all' or a stream index list."""
+    if text in KEEP_AUDIO_MODES:
+        return text
+    try:
+        return parse_channels(text)
+    except UsageError:
+        raise UsageError(f"Invalid --keep-audio value '{text}', expected 'selected', 'all' or "
+                         f"stream indices such as '1,3'") from None
+
+
+def parse_channels(text):
+    """Parses a '1,2,5' stream index list."""
+    try:
+        return sorted({int(part) for part in text.split(',') if part.strip()})
+    except ValueError:
+        raise UsageError(f"Invalid channel list: '{text}'") from None
+
+
+def expand_inputs(patterns, media_filter=None):
+    """Expands file names, folders and glob patterns, keeping order and dropping duplicates.
+
+    Folders are searched recursively for files accepted by ``media_filter``.
+    """
+    media_filter = media_filter or MediaFilter()
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise UsageError(f"No files match '{pattern}'")
+        for match in matches:
+            paths = iter_media_files(match, media_filter) if os.path.isdir(match) else [match]
+            for path in paths:
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+
+
+def read_manifest(manifest_file):
+    """Reads a JSON array or JSON-lines manifest of {"input", "channels", "output", "priority"} entries."""
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith('['):
+            entries = json.loads(text)
+        else:
+            entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    except (OSError, ValueError) as e:
+        raise UsageError(f"Cannot read manifest '{manifest_file}': {e}") from e
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    for entry in entries:
+        if not isinstance(entry, dict) or 'input' not in entry:
+            raise UsageError(f"Manifest entry without 'input': {entry!r}")
+        channels = entry.get('channels')
+        if isinstance(channels, str):
+            channels = parse_channels(channels)
+        try:
+            priority = int(entry.get('priority', 0))
+        except (TypeError, ValueError):
+            raise UsageError(f"Manifest entry with an invalid 'priority': {entry!r}") from None
+        yield {
+            'input': os.path.join(base_dir, entry['input']),
+            'channels': channels,
+            'output': entry.get('output'),
+            'priority': priority,
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m audio_merger",
+        description="Mix the selected audio streams of video files into one track without re-encoding video."
+    )
+    parser.add_argument("inputs", nargs='*',
+                        help="Input files, folders (searched recursively) or glob patterns (e.g. 'videos/**/*.mkv').")
+    parser.add_argument("--filter", default=" ".join(DEFAULT_PATTERNS),
+                        help="File name patterns or extensions picked from input folders (default: '%(default)s').")
+    parser.add_argument("-m", "--manifest",
+                        help="JSON or JSON-lines manifest with per-file 'input' (relative to the manifest), "
+                             "'channels' and 'output' (relative to --output-dir).")
+    channels = parser.add_mutually_exclusive_group()
+    channels.add_argument("-c", "--channels", help="Audio stream indices to mix for every input, e.g. '1,2'. Default: all.")
+    channels.add_argument("-s", "--select",
+                          help="Rule picking the streams to mix from each input's metadata, e.g. "
+                               "'lang=eng,jpn codec=aac' or 'title!=commentary'. Keys: index, language, title "
+                               "(regex), codec, channels.")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory for the merged files.")
+    parser.add_argument("--order", choices=QUEUE_POLICIES,
+                        help="Order in which jobs start (default: 'longest' with more than one job, else 'fifo').")
+    parser.add_argument("--pin", action='append', default=[], metavar="PATTERN",
+                        help="Start files whose path matches this glob pattern before all others (repeatable).")
+    parser.add_argument("-j", "--jobs", type=int, default=default_concurrency(),
+                        help="Number of files processed in parallel (default: CPU core count).")
+    parser.add_argument("--adaptive", action='store_true',
+                        help="Tune the number of parallel jobs to the measured throughput, starting at --jobs.")
+    parser.add_argument("--min-jobs", type=int, default=1,
+                        help="Lower bound of --adaptive (default: %(default)s).")
+    parser.add_argument("--max-jobs", type=int, default=2 * default_concurrency(),
+                        help="Upper bound of --adaptive (default: twice the CPU core count).")
+    encoding = parser.add_argument_group("audio encoding", "Options override the values of the chosen preset.")
+    encoding.add_argument("--preset", choices=sorted(PRESETS), default='default',
+                          help="Encoder preset of the merged track (default: ffmpeg's choice for the container).")
+    encoding.add_argument("--codec", help="Audio encoder, e.g. 'aac', 'flac', 'libopus'.")
+    encoding.add_argument("--bitrate", help="Audio bitrate, e.g. '192k'.")
+    encoding.add_argument("--sample-rate", type=int, help="Output sample rate in Hz.")
+    encoding.add_argument("--channel-layout", help="Output channel layout, e.g. 'stereo' or '5.1'.")
+    encoding.add_argument("--threads", type=int, help="Encoder thread count.")
+    encoding.add_argument("--profile", action='append', default=[], metavar="NAME=CONTAINER[:PRESET]",
+                          help="Write an extra output '<output>_NAME.CONTAINER' from the same decode, e.g. "
+                               "'proxy=mp4:fast-aac' (repeatable; replaces the single output).")
+    mixing = parser.add_argument_group("mixing")
+    mixing.add_argument("--mixer", choices=MIXERS, default=MIXER_AMIX,
+                        help="'amix' (ffmpeg, scales inputs down by their count) or 'numpy' (sums the streams "
+                             "with a limiter, needs NumPy). Default: %(default)s.")
+    mixing.add_argument("--gain", action='append', default=[], metavar="INDEX=DB",
+                        help="Gain of one stream in dB, e.g. '2=-6' (repeatable).")
+    mixing.add_argument("--weight", action='append', default=[], metavar="INDEX=WEIGHT",
+                        help="amix weight of one stream, e.g. '2=0.5' (repeatable, default 1).")
+    mixing.add_argument("--no-normalize", dest='normalize', action='store_false',
+                        help="Sum the streams in amix instead of scaling them down by their count.")
+    mixing.add_argument("--dropout-transition", type=float, metavar="SEC",
+                        help="Seconds amix takes to raise the level when a stream ends (ffmpeg default: 2).")
+    mixing.add_argument("--loudness", choices=LOUDNESS_FILTERS,
+                        help="Normalize the loudness of the mix in the same pass.")
+    mixing.add_argument("--loudness-target", type=float, default=DEFAULT_LOUDNESS_TARGET, metavar="LUFS",
+                        help="Integrated loudness target of --loudness loudnorm (default: %(default)s).")
+    tracks = parser.add_argument_group("output tracks")
+    tracks.add_argument("--keep-audio", metavar="{selected,all,INDICES}",
+                        help="Also copy original audio streams into the output: the mixed ones ('selected'), "
+                             "'all', or stream indices such as '1,3'.")
+    tracks.add_argument("--keep-subtitles", action='store_true', help="Also copy the subtitle streams.")
+    tracks.add_argument("--keep-data", action='store_true',
+                        help="Also copy the data streams (needs a container that stores them, e.g. MP4 or MOV).")
+    tracks.add_argument("--mix-title", help="Title of the merged track, e.g. 'Mix'.")
+    tracks.add_argument("--mix-language", help="Language of the merged track, e.g. 'eng'.")
+    segment = parser.add_argument_group("segment and format")
+    segment.add_argument("--start", metavar="TIME",
+                         help="Start of the processed segment, e.g. '90' or '1:30'. Copied video starts at the "
+                              "keyframe before it; the segment is part of the output name.")
+    segment.add_argument("--end", metavar="TIME", help="End of the processed segment (default: end of the input).")
+    segment.add_argument("--audio-only", choices=AUDIO_ONLY_FORMATS,
+                         help="Write only the mixed audio, without video, to a file of this format.")
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--no-resume", action='store_true',
+                        help="Re-run jobs whose output was already completed by an earlier batch.")
+    resume.add_argument("--incremental", action='store_true',
+                        help="Skip jobs whose input, streams and settings are unchanged since their output "
+                             "was completed, without re-reading the output.")
+    parser.add_argument("--log-dir", help="Directory for the per-job ffmpeg logs (default: '<output dir>/logs').")
+    parser.add_argument("--report",
+                        help="Write the batch report to this .csv or .json file "
+                             "(default: '<log dir>/batch_report_<timestamp>.json').")
+    parser.add_argument("-v", "--verbose", action='store_true', help="Copy ffmpeg output to stderr.")
+    return parser
+
+
+class BatchRunner:
+    """Runs merge tasks on worker threads while the calling thread owns the scheduler."""
+
+    def __init__(self, tasks, output_dir, concurrency, encoder=None, log_dir=None, verbose=False, out=sys.stdout,
+                 resume=True, incremental=False, channel_rule=None, report_file=None, controller=None, mix=None,
+                 tracks=None, profiles=None, start_sec=None, end_sec=None, audio_only=None):
+        self.tasks = tasks
+        self.output_dir = output_dir
+        self.channel_rule = channel_rule  # Used for tasks without explicit channels
+        self.journal = JobJournal(journal_path(output_dir), verify_outputs=not incremental) if resume else None
+        self.encoder = encoder
+        self.mix = mix
+        self.tracks = tracks
+        self.profiles = profiles or []
+        self.start_sec = start_sec
+        self.end_sec = end_sec
+        self.audio_only = audio_only  # Output format of audio-only jobs, None to keep the video
+        self.log_dir = log_dir
+        self.verbose = verbose
+        self.out = out
+        self.events = queue.Queue()
+        self.runners = {}
+        self.lock = threading.Lock()
+        self.probe_cache = ProbeCache()
+        self.controller = controller  # Tunes the concurrency when set
+        if controller:
+            concurrency = controller.concurrency  # Clamped to its bounds
+            controller.on_decision = lambda concurrency, reason: self.emit(
+                'concurrency_changed', concurrency=concurrency, reason=reason)
+        self.scheduler = JobScheduler(self.start_task, concurrency=concurrency)
+        self.batch_progress = BatchProgress(len(tasks))
+        self.report = BatchReport()
+        self.report_file = report_file or default_report_path(log_dir or os.path.join(output_dir, "logs"))
+
+    def emit(self, event, **fields):
+        self.out.write(json.dumps({'event': event, **fields}) + "\n")
+        self.out.flush()
+
+    def queue_order(self, policy):
+        """Returns the task indices in the order ``policy`` starts them.
+
+        Durations come from the probe cache only, so ordering never waits for
+        ffprobe; files not probed before are estimated from their size.
+        """
+        stats = {}
+        for task_index, task in enumerate(self.tasks):
+            try:
+                stats[task_index] = os.stat(task['input'])
+            except OSError:
+                pass
+
+        def duration_of(task_index):
+            if task_index not in stats:
+                return None
+            key = os.path.normcase(os.path.abspath(self.tasks[task_index]['input']))
+            info = self.probe_cache.get(key, stats[task_index])
+            return info['duration_sec'] if info else None
+
+        return order_jobs(
+            range(len(self.tasks)), policy, duration_of,
+            size_of=lambda task_index: stats[task_index].st_size if task_index in stats else 0,
+            priority_of=lambda task_index: self.tasks[task_index].get('priority', 0)
+        )
+
+    def start_task(self, task_index):
+        threading.Thread(target=self.run_task, args=(task_index,), daemon=True).start()
+
+    def run_task(self, task_index):
+        """Runs one task on a worker thread and always queues its 'finished' event, which the batch loop waits for."""
+        result = (False, {'error': "the job ended unexpectedly"})
+        try:
+            result = self.merge_task(task_index)
+        except Exception as e:  # E.g. an OSError writing the log; the task fails, the batch goes on
+            result = (False, {'error': f"{type(e).__name__}: {e}"})
+        finally:
+            with self.lock:
+                self.runners.pop(task_index, None)
+            self.events.put(('finished', task_index, *result))
+
+    def merge_task(self, task_index):
+        """Probes and merges one task and returns its (success, details[, stats]) result."""
+        task = self.tasks[task_index]
+        input_file = task['input']
+        if self.scheduler.stopped:  # Stopped while this thread was starting
+            return False, {'error': "stopped"}, JobStats(input_file, status='stopped')
+        try:
+            media_info = probe_media(input_file, self.probe_cache)
+        except ProbeError as e:
+            return False, {'error': f"ffprobe failed: {e}"}
+
+        audio_streams = media_info['audio_streams']
+        if task['channels'] is not None:
+            selected_channels = task['channels']
+        elif self.channel_rule:
+            selected_channels = self.channel_rule.select(audio_streams)
+        else:
+            selected_channels = [stream['index'] for stream in audio_streams]
+        if not selected_channels:
+            error = "no audio stream matches the selection rule" if self.channel_rule else "no audio channels selected"
+            return False, {'error': error}
+
+        if task['output']:
+            output_file = os.path.join(self.output_dir, task['output'])  # Relative to the output dir, like the default
+        else:
+            output_file = default_output_path(input_file, self.output_dir, self.audio_only or 'mkv',
+                                              self.start_sec, self.end_sec)
+        if self.log_dir:
+            log_file = os.path.join(self.log_dir, f"{os.path.basename(output_file)}.log")
+        else:
+            log_file = default_log_path(output_file)
+        job = MergeJob(input_file, output_file, selected_channels, media_info['duration_sec'], log_file,
+                       encoder=self.encoder, mix=self.mix, tracks=self.tracks,
+                       audio_streams=[stream['index'] for stream in audio_streams], profiles=self.profiles,
+                       start_sec=self.start_sec, end_sec=self.end_sec, audio_only=bool(self.audio_only))
+        if job.total_duration_sec > 0 and job.duration_sec <= 0:
+            return False, {'error': "the segment starts after the end of the input"}
+        try:
+            job.kept_audio()
+        except ValueError as e:
+            return False, {'error': str(e)}
+        runner = create_runner(
+            job,
+            on_output=self.log_line if self.verbose else None,
+            on_progress=lambda progress: self.events.put(('progress', task_index, progress)),
+            journal=self.journal
+        )
+        with self.lock:  # stop() sets the flag first, then stops the registered runners under this lock
+            if self.scheduler.stopped:
+                return False, {'error': "stopped"}, JobStats(input_file, status='stopped')
+            self.runners[task_index] = runner
+        self.events.put(('started', task_index, [variant.output_file for variant in runner.variants], selected_channels,
+                         log_file, job.duration_sec))
+        success = runner.run()
+        if runner.skipped:
+            details = {'skipped': True}
+        else:
+            details = {'returncode': runner.returncode}
+        if self.profiles:
+            pending = runner.variants if runner.pending is None else runner.pending  # None: stopped before the check
+            details['outputs'] = [
+                {'output': variant.output_file, 'skipped': variant not in pending,
+                 'success': variant not in pending or runner.results.get(variant.output_file, False)}
+                for variant in runner.variants  # Already complete variants count as successful
+            ]
+        return success, details, runner.stats
+
+    def log_line(self, line):
+        sys.stderr.write(line + "\n")
+
+    def stop(self):
+        self.scheduler.stop()
+        with self.lock:
+            for runner in self.runners.values():
+                runner.stop()
+
+    def run(self, policy=None):
+        """Processes every task in the order of ``policy`` and returns the process exit status."""
+        policy = policy or default_queue_policy(self.scheduler.concurrency)
+        self.emit('batch_started', jobs=len(self.tasks), concurrency=self.scheduler.concurrency, order=policy)
+        self.scheduler.run(self.queue_order(policy))
+        interrupted = False
+        while self.scheduler.is_active():
+            try:
+                try:
+                    event = self.events.get(timeout=0.5)
+                except queue.Empty:
+                    event = None
+                if event is not None:
+                    self.handle_event(*event)
+                if self.controller and not self.scheduler.stopped:
+                    self.adapt_concurrency()
+            except KeyboardInterrupt:
+                interrupted = True
+                self.stop()
+
+        try:
+            self.probe_cache.save()
+        except OSError:
+            pass
+        self.report.finish()
+        summary = self.report.summary()
+        try:
+            self.report.write(self.report_file)
+            report_file = self.report_file
+        except OSError as e:
+            sys.stderr.write(f"warning: could not write the batch report: {e}\n")
+            report_file = None
+        self.emit('batch_finished', succeeded=self.scheduler.succeeded, failed=self.scheduler.failed,
+                  skipped=self.scheduler.skipped, stopped_jobs=self.scheduler.stopped_jobs,
+                  stopped=self.scheduler.stopped,
+                  media_hours_per_hour=summary['media_hours_per_hour'],
+                  realtime_factor_p50=summary['realtime_factor_p50'],
+                  realtime_factor_p95=summary['realtime_factor_p95'], report=report_file)
+        if interrupted:
+            return EXIT_INTERRUPTED
+        return EXIT_JOB_FAILED if self.scheduler.failed else EXIT_OK
+
+    def adapt_concurrency(self):
+        concurrency = self.controller.sample(self.batch_progress.processed_sec(), len(self.scheduler.running),
+                                             len(self.scheduler.pending))
+        if concurrency is not None:
+            self.scheduler.set_concurrency(concurrency)
+
+    def handle_event(self, kind, task_index, *args):
+        input_file = self.tasks[task_index]['input']
+        if kind == 'started':
+            output_files, selected_channels, log_file, duration_sec = args
+            self.batch_progress.add_job(task_index, duration_sec)
+            outputs = {'outputs': output_files} if self.profiles else {'output': output_files[0]}
+            self.emit('job_started', input=input_file, **outputs, channels=selected_channels, log=log_file,
+                      encoder=self.encoder.as_dict() if self.encoder else None,
+                      mix=self.mix.as_dict() if self.mix else None,
+                      tracks=self.tracks.as_dict() if self.tracks else None,
+                      profiles=[profile.as_dict() for profile in self.profiles] or None,
+                      segment=[self.start_sec, self.end_sec] if self.start_sec is not None or self.end_sec is not None
+                      else None, audio_only=self.audio_only)
+        elif kind == 'progress':
+            progress = args[0]
+            if progress.percent is not None:
+                self.scheduler.job_progress(task_index, progress.percent)
+            self.batch_progress.update(task_index, progress.out_time_sec, progress.speed)
+            eta_sec = self.batch_progress.eta_sec()
+            self.emit('job_progress', input=input_file, **progress.as_dict(),
+                      total_percent=self.batch_progress.percent(),
+                      throughput=round(self.batch_progress.throughput(), 2),
+                      eta_sec=round(eta_sec, 1) if eta_sec is not None else None)
+        elif kind == 'finished':
+            success, details = args[:2]
+            stats = args[2] if len(args) > 2 else JobStats(input_file)  # Failed before ffmpeg started
+            self.report.add(stats)
+            self.batch_progress.finish(task_index)
+            self.scheduler.job_finished(task_index, success, skipped=details.get('skipped', False),
+                                        stopped=stats.status == 'stopped')
+            resources = {key: value for key, value in stats.as_dict().items()
+                         if key not in ('input_file', 'output_file', 'status', 'returncode')}
+            self.emit('job_finished', input=input_file, success=success, **details, resources=resources)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        default_channels = parse_channels(args.channels) if args.channels else None
+        channel_rule = parse_rule(args.select) if args.select else None
+        mix = MixSettings(args.mixer, parse_gains(args.gain), parse_weights(args.weight), args.normalize,
+                          args.dropout_transition, args.loudness, args.loudness_target)
+        if mix.mixer == MIXER_NUMPY and not numpy_available():
+            raise UsageError("--mixer numpy needs NumPy (pip install numpy)")
+        tracks = TrackSettings(parse_keep_audio(args.keep_audio) if args.keep_audio else None, args.keep_subtitles,
+                               args.keep_data, args.mix_title, args.mix_language)
+        start_sec = (parse_time(args.start) if args.start else None) or None  # Starting at 0 is the whole input
+        end_sec = parse_time(args.end) if args.end else None
+        if end_sec is not None and end_sec <= (start_sec or 0):
+            raise UsageError("--end must be after --start")
+        if args.audio_only in ('wav', 'flac') and tracks.keeps_streams():
+            raise UsageError(f"{args.audio_only.upper()} files hold only the mix, use --audio-only m4a "
+                             f"to keep original streams")
+        # The whole task list is built before the first job starts: --order, --pin and manifest priorities
+        # sort all tasks, the batch progress weighs every job, and a pattern that matches nothing is a
+        # usage error. Folders are still walked lazily with os.scandir while the list is built.
+        tasks = [{'input': path, 'channels': default_channels, 'output': None, 'priority': 0}
+                 for path in expand_inputs(args.inputs, MediaFilter(parse_patterns(args.filter)))]
+        if args.manifest:
+            tasks.extend(read_manifest(args.manifest))
+        for task in tasks:
+            if any(fnmatch.fnmatch(task['input'], pattern) for pattern in args.pin):
+                task['priority'] = max(task['priority'], 1)
+    except (UsageError, ValueError) as e:  # RuleError and invalid mix settings are ValueErrors
+        parser.print_usage(sys.stderr)
+        sys.stderr.write(f"error: {e}\n")
+        return EXIT_USAGE
+    if not tasks:
+        parser.print_usage(sys.stderr)
+        sys.stderr.write("error: no input files given\n")
+        return EXIT_USAGE
+    if args.jobs < 1 or args.min_jobs < 1:
+        sys.stderr.write("error: --jobs and --min-jobs must be at least 1\n")
+        return EXIT_USAGE
+    if args.adaptive and args.max_jobs < args.min_jobs:
+        sys.stderr.write("error: --max-jobs must not be below --min-jobs\n")
+        return EXIT_USAGE
+
+    encoder = preset_settings(
+        args.preset, codec=args.codec, bitrate=args.bitrate, sample_rate=args.sample_rate,
+        channel_layout=args.channel_layout, threads=args.threads
+    )
+    try:
+        profiles = parse_profiles(args.profile, encoder)
+    except ValueError as e:
+        parser.print_usage(sys.stderr)
+        sys.stderr.write(f"error: {e}\n")
+        return EXIT_USAGE
+    controller = ConcurrencyController(args.jobs, args.min_jobs, args.max_jobs) if args.adaptive else None
+    os.makedirs(args.output_dir, exist_ok=True)
+    return BatchRunner(tasks, args.output_dir, args.jobs, encoder=encoder, log_dir=args.log_dir,
+                       verbose=args.verbose, resume=not args.no_resume, incremental=args.incremental,
+                       channel_rule=channel_rule, report_file=args.report,
+                       controller=controller, mix=mix, tracks=tracks,
+                       profiles=profiles, start_sec=start_sec, end_sec=end_sec,
+                       audio_only=args.audio_only).run(args.order)
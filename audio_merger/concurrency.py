@@ -0,0 +1,141 @@
+"""Adaptive concurrency: tunes the number of parallel jobs to the measured throughput.
+
+The right number of ffmpeg processes depends on where the media lives: local NVMe
+keeps every core busy, a NAS saturates long before that and more jobs only make
+the disks seek. The controller measures, over windows of a few seconds, the
+media seconds processed per wall second by the whole batch, the CPU load and the
+I/O wait, and hill-climbs the job count within fixed bounds: it adds a job while
+CPU is left idle, keeps going while each step pays off, steps back when a step
+did not improve throughput or when the disks are the bottleneck.
+"""
+
+import os
+import time
+
+GAIN_THRESHOLD = 0.05  # Relative throughput change that counts as better or worse
+CPU_BUSY_TARGET = 0.90  # Above this, more jobs only compete for the same cores
+IOWAIT_HIGH = 0.20  # Share of CPU time spent waiting for I/O that means the disks are saturated
+HOLD_WINDOWS = 3  # Windows to stay put after a step was taken back, before probing again
+
+
+class SystemLoad:
+    """Samples CPU busy and I/O wait shares since the previous sample.
+
+    Reads /proc/stat on Linux. Elsewhere the CPU share comes from the load average
+    where available and I/O wait is unknown (None).
+    """
+
+    def __init__(self):
+        self.last = self._read_proc_stat()
+
+    @staticmethod
+    def _read_proc_stat():
+        try:
+            with open("/proc/stat", encoding='ascii') as f:
+                fields = f.readline().split()
+        except OSError:
+            return None
+        if not fields or fields[0] != 'cpu':
+            return None
+        values = [int(value) for value in fields[1:9]]  # user nice system idle iowait irq softirq steal
+        values += [0] * (8 - len(values))
+        return sum(values), values[3], values[4]  # total, idle, iowait
+
+    def sample(self):
+        """Returns (cpu_busy, iowait) as shares between 0 and 1, either may be None."""
+        current = self._read_proc_stat()
+        if current is not None and self.last is not None:
+            total = current[0] - self.last[0]
+            idle = current[1] - self.last[1]
+            iowait = current[2] - self.last[2]
+            self.last = current
+            if total <= 0:
+                return None, None
+            return max(0.0, (total - idle - iowait) / total), iowait / total
+        if hasattr(os, 'getloadavg'):
+            return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1)), None
+        return None, None
+
+
+class ConcurrencyController:
+    """Decides the number of parallel jobs from throughput, CPU load and I/O wait.
+
+    The owner calls ``sample`` regularly (e.g. on every UI tick) with the media
+    seconds processed so far by the batch. Once per ``interval`` seconds it decides,
+    and when the job count changes it returns the new count and calls
+    ``on_decision(concurrency, reason)`` with the measurements behind it for the log.
+    """
+
+    def __init__(self, concurrency, min_jobs=1, max_jobs=None, interval=10.0, on_decision=None, system_load=None):
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs or 2 * (os.cpu_count() or 1))
+        self.concurrency = min(self.max_jobs, max(self.min_jobs, concurrency))
+        self.interval = interval
+        self.on_decision = on_decision
+        self.system_load = system_load or SystemLoad()
+        self.window_started = None
+        self.window_processed_sec = 0.0
+        self.previous = None  # (concurrency, throughput) of the window before the last step
+        self.last_step = 0  # +1, -1 or 0
+        self.hold = 0
+
+    def sample(self, processed_sec, running, queued, now=None):
+        """Feeds the batch's processed media seconds; returns the new job count or None."""
+        now = time.monotonic() if now is None else now
+        if self.window_started is None:
+            self._start_window(now, processed_sec)
+            return None
+        elapsed = now - self.window_started
+        if elapsed < self.interval:
+            return None
+
+        throughput = (processed_sec - self.window_processed_sec) / elapsed
+        cpu_busy, iowait = self.system_load.sample()
+        self._start_window(now, processed_sec)
+        if running < self.concurrency and not queued:
+            return None  # Batch is draining, the measurement says nothing about the job count
+
+        step, reason, reverted = self._decide(throughput, cpu_busy, iowait, queued)
+        new_concurrency = min(self.max_jobs, max(self.min_jobs, self.concurrency + step))
+        if new_concurrency == self.concurrency:
+            step = 0
+        if step:
+            # A step taken back is not judged again, or the count would oscillate
+            self.previous = None if reverted else (self.concurrency, throughput)
+            self.concurrency = new_concurrency
+        self.last_step = step
+
+        if step and self.on_decision:
+            load = f"{throughput:.1f}x realtime"
+            if cpu_busy is not None:
+                load += f", CPU {cpu_busy:.0%}"
+            if iowait is not None:
+                load += f", I/O wait {iowait:.0%}"
+            self.on_decision(self.concurrency, f"{reason} ({load})")
+        return self.concurrency if step else None
+
+    def _start_window(self, now, processed_sec):
+        self.window_started = now
+        self.window_processed_sec = processed_sec
+
+    def _decide(self, throughput, cpu_busy, iowait, queued):
+        if self.last_step and self.previous is not None:
+            previous_concurrency, previous_throughput = self.previous
+            change = (throughput - previous_throughput) / previous_throughput if previous_throughput > 0 else 1.0
+            if self.last_step > 0 and change < GAIN_THRESHOLD:
+                self.hold = HOLD_WINDOWS
+                return -1, f"{self.concurrency} jobs were no faster than {previous_concurrency}, stepping back", True
+            if self.last_step < 0 and change < -GAIN_THRESHOLD:
+                self.hold = HOLD_WINDOWS
+                return +1, f"{self.concurrency} jobs were slower than {previous_concurrency}, stepping back", True
+            if self.last_step > 0 and queued and (cpu_busy is None or cpu_busy < CPU_BUSY_TARGET) \
+                    and (iowait is None or iowait < IOWAIT_HIGH):
+                return +1, f"{self.concurrency} jobs gained {change:.0%}, adding another", False
+        if self.hold:
+            self.hold -= 1
+            return 0, f"keeping {self.concurrency} jobs", False
+        if iowait is not None and iowait >= IOWAIT_HIGH and self.concurrency > self.min_jobs:
+            return -1, "disks are saturated, removing a job", False
+        if queued and cpu_busy is not None and cpu_busy < CPU_BUSY_TARGET:
+            return +1, "CPU is not saturated, adding a job", False
+        return 0, f"keeping {self.concurrency} jobs", False
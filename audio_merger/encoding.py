@@ -0,0 +1,63 @@
+"""Encoder settings of the merged audio track and the built-in presets."""
+
+
+class EncoderSettings:
+    """Codec options of the merged track. Options left as None are chosen by ffmpeg."""
+
+    __slots__ = ('codec', 'bitrate', 'sample_rate', 'channel_layout', 'threads')
+
+    def __init__(self, codec=None, bitrate=None, sample_rate=None, channel_layout=None, threads=None):
+        self.codec = codec or None
+        self.bitrate = bitrate or None  # ffmpeg syntax, e.g. '192k'
+        self.sample_rate = int(sample_rate) if sample_rate else None
+        self.channel_layout = channel_layout or None  # e.g. 'stereo', '5.1'
+        self.threads = int(threads) if threads else None
+
+    def is_default(self):
+        """True when nothing about the audio format is forced, so a single stream can be copied."""
+        return not (self.codec or self.bitrate or self.sample_rate or self.channel_layout)
+
+    def format_filter(self):
+        """Returns the 'aformat' filter enforcing sample rate and channel layout, or None."""
+        options = []
+        if self.sample_rate:
+            options.append(f"sample_rates={self.sample_rate}")
+        if self.channel_layout:
+            options.append(f"channel_layouts={self.channel_layout}")
+        return f"aformat={':'.join(options)}" if options else None
+
+    def output_args(self, stream='a'):
+        """Returns the encoder options for the merged track (the format filter is separate).
+
+        ``stream`` is the output stream specifier, 'a:0' when other audio tracks follow the mix.
+        """
+        args = []
+        if self.codec:
+            args += [f"-c:{stream}", self.codec]
+        if self.bitrate:
+            args += [f"-b:{stream}", self.bitrate]
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def describe(self):
+        """Returns a 'codec=aac bitrate=192k ...' summary for logs."""
+        return " ".join(f"{name}={value}" for name, value in self.as_dict().items() if value) or "ffmpeg defaults"
+
+
+PRESETS = {
+    'default': EncoderSettings(),
+    'fast-aac': EncoderSettings(codec='aac', bitrate='192k', sample_rate=48000, channel_layout='stereo'),
+    'flac-archive': EncoderSettings(codec='flac'),
+    'opus-small': EncoderSettings(codec='libopus', bitrate='96k', sample_rate=48000, channel_layout='stereo'),
+}
+
+
+def preset_settings(name, **overrides):
+    """Returns a copy of a preset with every override that is not None applied."""
+    settings = PRESETS[name].as_dict()
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return EncoderSettings(**settings)
@@ -0,0 +1,399 @@
+"""Qt-free merge engine: builds the ffmpeg command of a job and runs it."""
+
+import os
+import subprocess
+import threading
+import time
+
+from .encoding import EncoderSettings
+from .filtergraph import FilterGraphBuilder
+from .mixing import MIXER_NUMPY, MixSettings
+from .progress import ProgressParser, ProgressThrottle
+from .report import JobStats, read_proc_io, wait_with_rusage
+from .tracks import TrackSettings, build_track_args
+from .utils import file_size, hidden_startupinfo
+
+AUDIO_ONLY_FORMATS = ('wav', 'flac', 'm4a')  # Containers of audio-only outputs, each picks its own default codec
+
+
+class MergeJob:
+    """One merge: the input file, the output file, the audio streams to mix and how to mix and encode them.
+
+    ``tracks`` says which original streams are copied next to the mix; ``audio_streams``
+    lists the indices of every audio stream of the input (for keeping all of them).
+    With output ``profiles`` the job writes one file per profile instead of
+    ``output_file``, all from one ffmpeg run. ``start_sec``/``end_sec`` limit the
+    job to a segment of the input, ``audio_only`` drops the video.
+    """
+
+    def __init__(self, input_file, output_file, selected_channels, total_duration_sec=0.0, log_file=None,
+                 encoder=None, mix=None, tracks=None, audio_streams=None, profiles=None, start_sec=None,
+                 end_sec=None, audio_only=False):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.selected_channels = list(selected_channels)
+        self.total_duration_sec = total_duration_sec  # Total duration for FFmpeg progress
+        self.log_file = log_file  # Receives the command and the full ffmpeg log when set
+        self.encoder = encoder or EncoderSettings()
+        self.mix = mix or MixSettings()
+        self.tracks = tracks or TrackSettings()
+        self.audio_streams = list(audio_streams) if audio_streams is not None else list(self.selected_channels)
+        self.profiles = list(profiles or [])
+        self.start_sec = start_sec or None
+        self.end_sec = end_sec
+        self.audio_only = audio_only
+
+    @property
+    def duration_sec(self):
+        """Media duration the job writes: the segment, or the whole input without one."""
+        return segment_duration(self.total_duration_sec, self.start_sec, self.end_sec)
+
+    def has_segment(self):
+        return self.start_sec is not None or self.end_sec is not None
+
+    def input_args(self):
+        """Returns '-i' for the input, preceded by fast input seeking ('-ss'/'-to') to the segment."""
+        args = []
+        if self.start_sec is not None:
+            args += ["-ss", f"{self.start_sec:.3f}"]
+        if self.end_sec is not None:
+            args += ["-to", f"{self.end_sec:.3f}"]
+        return args + ["-i", self.input_file]
+
+    def kept_audio(self):
+        """Returns the indices of the original audio streams copied next to the mix."""
+        return self.tracks.kept_audio(self.selected_channels, self.audio_streams)
+
+    def variants(self):
+        """Returns one single-output MergeJob per profile, or the job itself without profiles.
+
+        Each variant is journaled on its own, under its own output file and encoder.
+        """
+        if not self.profiles:
+            return [self]
+        return [
+            MergeJob(self.input_file, profile.output_path(self.output_file), self.selected_channels,
+                     self.total_duration_sec, self.log_file, profile.encoder, self.mix, self.tracks, self.audio_streams,
+                     start_sec=self.start_sec, end_sec=self.end_sec, audio_only=self.audio_only)
+            for profile in self.profiles
+        ]
+
+
+def segment_duration(total_duration_sec, start_sec=None, end_sec=None):
+    """Returns the length of the segment from ``start_sec`` to ``end_sec`` of an input, clamped to the input."""
+    end_sec = total_duration_sec if end_sec is None else end_sec
+    if total_duration_sec > 0:
+        end_sec = min(end_sec, total_duration_sec)
+    return max(0.0, end_sec - (start_sec or 0.0))
+
+
+def default_output_path(input_file, output_directory, extension='mkv', start_sec=None, end_sec=None):
+    """Returns '<output_directory>/<name>_merged.mkv' for an input file.
+
+    A segment is part of the name ('<name>_merged_60s-90s.wav'), so an excerpt
+    never replaces the output of the whole file.
+    """
+    name_without_ext, _ = os.path.splitext(os.path.basename(input_file))
+    suffix = ""
+    if start_sec or end_sec is not None:  # Like MergeJob.has_segment, a start of 0 is no segment
+        suffix = f"_{start_sec or 0:g}s-" + (f"{end_sec:g}s" if end_sec is not None else "end")
+    return os.path.join(output_directory, f"{name_without_ext}_merged{suffix}.{extension}")
+
+
+def partial_output_path(output_file):
+    """Returns the temporary name an output is written under until ffmpeg succeeds."""
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.partial{ext}"  # Keep the extension so ffmpeg picks the same muxer
+
+
+def build_ffmpeg_command(job, output_file=None):
+    """Returns the ffmpeg argument list that mixes the selected audio streams of a job.
+
+    Streams are addressed by their absolute index, so only the selected ones are
+    decoded. The filter graph (gains, amix, loudness, format) comes from
+    FilterGraphBuilder. A single selected stream with nothing to adjust is copied
+    as is, unless the encoder settings ask for a specific format. Original streams
+    kept by the job's TrackSettings are copied after the mix in the same run.
+    """
+    return build_fanout_command([job], [output_file or job.output_file])
+
+
+def build_fanout_command(variants, output_files):
+    """Returns the ffmpeg argument list writing every variant of a job from one decode of its input.
+
+    The variants share the input, the selected streams and the mix settings and
+    differ in output file and encoder (see MergeJob.variants).
+    """
+    job = variants[0]
+    filter_complex, labels = FilterGraphBuilder(job.selected_channels, job.mix).build(
+        [variant.encoder for variant in variants])
+    command = [
+        "ffmpeg",
+        "-nostats",  # Progress is read from the -progress pipe instead of stderr
+        "-progress", "pipe:1",
+        *job.input_args(),
+    ]
+    if filter_complex:
+        command += ["-filter_complex", filter_complex]
+    for variant, output_file, label in zip(variants, output_files, labels):
+        if label:
+            command += build_output_args(variant, f"[{label}]", output_file)
+        else:
+            command += build_output_args(variant, f"0:{job.selected_channels[0]}", output_file,
+                                         copy_audio=variant.encoder.is_default() and not variant.audio_only)
+    return command
+
+
+def build_output_args(job, audio_map, output_file, copy_audio=False):
+    """Returns the options of one output file: the copied video, the mix from ``audio_map`` and the kept tracks.
+
+    Audio-only jobs drop the video ('-vn'); the container of ``output_file`` picks
+    the default codec (PCM for WAV, FLAC, AAC for M4A).
+    """
+    args = ["-vn"] if job.audio_only else ["-map", "0:v", "-c:v", "copy"]
+    args += ["-map", audio_map]
+    kept_audio = job.kept_audio()
+    if copy_audio:
+        kept_audio = [index for index in kept_audio if f"0:{index}" != audio_map]  # Already copied
+        args += ["-c:a:0" if kept_audio else "-c:a", "copy"]  # Plain remux, nothing to mix or convert
+    else:
+        args += job.encoder.output_args("a:0" if kept_audio else "a")
+    args += build_track_args(job, kept_audio)
+    args += [
+        "-y",  # Overwrite output file if exists
+        output_file
+    ]
+    return args
+
+
+def create_runner(job, **kwargs):
+    """Returns the runner for the job's mixer: MergeRunner (amix) or PcmMixRunner (NumPy)."""
+    if job.mix.mixer == MIXER_NUMPY:
+        from .pcmmix import PcmMixRunner  # Imported on use, NumPy is optional
+        return PcmMixRunner(job, **kwargs)
+    return MergeRunner(job, **kwargs)
+
+
+def progress_percent(current_time_sec, total_duration_sec):
+    if current_time_sec is None or total_duration_sec <= 0:
+        return None
+    return min(100, int((current_time_sec / total_duration_sec) * 100))  # Don't exceed 100%
+
+
+class MergeRunner:
+    """Runs the ffmpeg process of a MergeJob, forwarding its log and progress.
+
+    ``on_output(line)`` receives the human-readable stderr lines of ffmpeg (from a
+    reader thread), which are also written to ``job.log_file`` when it is set, and
+    ``on_progress(progress)`` an FFmpegProgress for every block of the '-progress'
+    pipe whose percent (or position, when the duration is unknown) changed, or at
+    least every ``progress_interval`` seconds while it does not. ``stop`` may be
+    called from any thread; the process is terminated at the next progress block.
+
+    ffmpeg writes to a '.partial' file that is renamed to the output only on success.
+    With a ``journal`` every run is recorded, and the job is skipped (``skipped`` is set
+    and ``run`` returns True) when the journal shows an intact output made from the same
+    inputs and settings.
+
+    ``stats`` is a JobStats holding the outcome and resource usage of the run once
+    ``run`` returns.
+
+    A job with output profiles writes all its variants in one ffmpeg run. Each one
+    is journaled and finalized on its own: variants already complete are left out
+    (``pending``), ``results`` maps every output written by the run to its success,
+    and progress carries the size of every output so far.
+    """
+
+    def __init__(self, job, on_output=None, on_progress=None, progress_interval=0.25, journal=None):
+        self.job = job
+        self.on_output = on_output
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.journal = journal
+        self.stopped = False
+        self.skipped = False
+        self.returncode = None
+        self.last_progress = None
+        self.variants = job.variants()
+        self.pending = None  # The incomplete variants, set once by already_complete
+        self.results = {}  # Output file -> True when this run wrote it
+        self.stats = JobStats(job.input_file, ";".join(variant.output_file for variant in self.variants),
+                              job.duration_sec)
+
+    @property
+    def command(self):
+        variants = self.variants if self.pending is None else self.pending
+        return build_fanout_command(variants, [partial_output_path(variant.output_file) for variant in variants])
+
+    def stop(self):
+        self.stopped = True
+
+    def already_complete(self):
+        """Checks the journal for intact outputs of this job and sets ``skipped`` when all of them exist."""
+        self.pending = [variant for variant in self.variants
+                        if not (self.journal and self.journal.is_complete(variant))]
+        self.skipped = not self.pending
+        return self.skipped
+
+    def run(self):
+        """Runs ffmpeg to completion and returns True when the output was written (or skipped)."""
+        if self.stopped:
+            self.stats.status = 'stopped'
+            return False
+        if self.pending is None:
+            self.already_complete()
+        if self.skipped:
+            self.stats.status = 'skipped'
+            return True
+
+        success = self._run_ffmpeg()
+        self.stats.status = 'done' if success else 'stopped' if self.stopped else 'failed'
+        if self.journal:
+            try:
+                for variant in self.pending:
+                    if self.results.get(variant.output_file):
+                        self.journal.record_completed(variant)
+                    else:
+                        self.journal.record(variant, 'stopped' if self.stopped else 'failed',
+                                            returncode=self.returncode)
+            except OSError as e:
+                if self.on_output:
+                    self.on_output(f"Could not update the job journal: {e}")
+        return success
+
+    def _run_ffmpeg(self):
+        started = time.perf_counter()
+
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdout=subprocess.PIPE,  # -progress key=value lines
+                stderr=subprocess.PIPE,  # Human-readable log
+                text=True,
+                startupinfo=hidden_startupinfo()
+            )
+        except OSError as e:
+            if self.on_output:
+                self.on_output(f"Could not start ffmpeg: {e}")
+            return False
+        self._record_started()
+
+        log_file = self._open_log_file()
+        log_reader = threading.Thread(target=self._read_log, args=(process.stderr, log_file), daemon=True)
+        log_reader.start()
+
+        self._follow_progress(process.stdout, [process])
+
+        rusage = wait_with_rusage(process)
+        log_reader.join()
+        self.returncode = process.returncode
+        self._finish_stats(started, [rusage])
+        self._close_log_file(log_file)
+        return self._finalize_outputs(not self.stopped and self.returncode == 0)
+
+    def _record_started(self):
+        if not self.journal:
+            return
+        try:
+            for variant in self.pending:
+                self.journal.record(variant, 'started')
+        except OSError as e:  # The merge does not depend on it, only a later resume does
+            if self.on_output:
+                self.on_output(f"Could not update the job journal: {e}")
+
+    def _follow_progress(self, progress_lines, processes):
+        """Parses the '-progress' lines until ffmpeg closes them, terminating ``processes`` on stop."""
+        parser = ProgressParser()
+        throttle = ProgressThrottle(self.progress_interval)
+        for line in progress_lines:
+            if self.stopped:
+                for process in processes:
+                    process.terminate()
+                break
+
+            progress = parser.feed(line)
+            if progress is not None:
+                progress.percent = progress_percent(progress.out_time_sec, self.job.duration_sec)
+                self.last_progress = progress
+                self._sample_io(processes)
+                reported_value = progress.percent if progress.percent is not None else progress.out_time_us
+                if self.on_progress and throttle.should_report(reported_value, final=progress.state == 'end'):
+                    if self.job.profiles:
+                        progress.outputs = [
+                            {'output': variant.output_file, 'size': file_size(partial_output_path(variant.output_file))}
+                            for variant in self.pending
+                        ]
+                    self.on_progress(progress)
+
+    def _sample_io(self, processes):
+        counters = [read_proc_io(process.pid) for process in processes]  # /proc is gone once reaped
+        if all(counter is not None for counter in counters):
+            self.stats.bytes_read = sum(counter[0] for counter in counters)
+            self.stats.bytes_written = sum(counter[1] for counter in counters)
+
+    def _finalize_outputs(self, success):
+        """Renames the '.partial' file of every pending output on success, removes it otherwise.
+
+        Returns True when all of them were written; ``results`` has the outcome per output.
+        """
+        for variant in self.pending:
+            partial_file = partial_output_path(variant.output_file)
+            try:
+                if success:
+                    os.replace(partial_file, variant.output_file)  # Atomic: never a half-written output
+                elif os.path.exists(partial_file):
+                    os.remove(partial_file)
+                self.results[variant.output_file] = success
+            except OSError as e:
+                if self.on_output:
+                    self.on_output(f"Could not finalize '{variant.output_file}': {e}")
+                self.results[variant.output_file] = False
+        return all(self.results.get(variant.output_file) for variant in self.pending)
+
+    def _finish_stats(self, started, rusages):
+        stats = self.stats
+        stats.wall_sec = time.perf_counter() - started
+        stats.returncode = self.returncode
+        block_io = stats.bytes_read is None
+        for rusage in rusages:
+            stats.add_rusage(rusage, block_io)
+        if self.last_progress is not None:
+            stats.speed = self.last_progress.speed
+
+    def _close_log_file(self, log_file):
+        if log_file:
+            log_file.write(f"Exit code: {self.returncode}\n")
+            log_file.write(f"Resources: {self.stats.describe()}\n")
+            log_file.close()
+
+    def _open_log_file(self):
+        if not self.job.log_file:
+            return None
+        try:
+            os.makedirs(os.path.dirname(self.job.log_file) or ".", exist_ok=True)
+            log_file = open(self.job.log_file, 'w', encoding='utf-8')
+        except OSError as e:
+            if self.on_output:
+                self.on_output(f"Could not open log file '{self.job.log_file}': {e}")
+            return None
+        log_file.write(f"Command: {' '.join(self.command)}\n")
+        log_file.write(f"Encoder settings: {self.job.encoder.describe()}\n")
+        if not self.job.mix.is_default():
+            log_file.write(f"Mix settings: {self.job.mix.describe()}\n")
+        if not self.job.tracks.is_default():
+            log_file.write(f"Output tracks: {self.job.tracks.describe()}\n")
+        for profile in self.job.profiles:
+            log_file.write(f"Output profile {profile.describe()}\n")
+        if self.job.has_segment():
+            end = f"{self.job.end_sec:g}s" if self.job.end_sec is not None else "end"
+            log_file.write(f"Segment: {self.job.start_sec or 0:g}s to {end}\n")
+        return log_file
+
+    def _read_log(self, stream, log_file, prefix=""):
+        for line in stream:  # Always drain stderr so ffmpeg never blocks on a full pipe
+            if prefix:
+                line = prefix + line
+            if log_file:
+                log_file.write(line)
+            if self.on_output:
+                self.on_output(line.rstrip())
@@ -0,0 +1,90 @@
+"""File records and the row store behind the file list of the GUI, indexed by path."""
+
+from .selection import stream_signature
+
+STATUS_PROBING = 'probing'
+STATUS_PROBE_FAILED = 'probe_failed'
+STATUS_READY = 'ready'
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_SKIPPED = 'skipped'
+STATUS_FAILED = 'failed'
+STATUS_STOPPED = 'stopped'
+
+
+class FileRecord:
+    """One input file: its probe results, the selected audio streams and its job state.
+
+    Holds no widgets, so thousands of queued files cost a few hundred bytes each
+    plus their stream metadata, which is shared with the probe cache.
+    """
+
+    __slots__ = ('path', 'duration_sec', 'audio_streams', 'signature', 'selected_channels', 'status', 'percent',
+                 'priority')
+
+    def __init__(self, path):
+        self.path = path
+        self.duration_sec = 0.0
+        self.audio_streams = ()
+        self.signature = ()  # Stream layout, computed once for bulk selection rules
+        self.selected_channels = []  # Sorted stream indices
+        self.status = STATUS_PROBING
+        self.percent = None
+        self.priority = 0  # Pinned files (priority > 0) are queued before all others
+
+    @property
+    def all_channels(self):
+        return [stream['index'] for stream in self.audio_streams]
+
+    def set_media_info(self, media_info, status=STATUS_READY):
+        """Stores probe results and selects every audio stream."""
+        self.duration_sec = media_info['duration_sec']
+        self.audio_streams = media_info['audio_streams']
+        self.signature = stream_signature(self.audio_streams)
+        self.selected_channels = self.all_channels
+        self.status = status
+
+    def select_channel(self, channel_index, selected):
+        if selected and channel_index not in self.selected_channels:
+            self.selected_channels.append(channel_index)
+            self.selected_channels.sort()
+        elif not selected and channel_index in self.selected_channels:
+            self.selected_channels.remove(channel_index)
+
+
+class FileStore:
+    """Keeps the file records in row order with an O(1) path -> row index.
+
+    Rows never move, so a row number stays valid as a job id until the store is
+    cleared.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.index = {}  # path -> row
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, row):
+        return self.rows[row]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def add(self, record):
+        """Appends a record and returns its row, or None when the path is already listed."""
+        path = record.path
+        if path in self.index:
+            return None
+        self.index[path] = len(self.rows)
+        self.rows.append(record)
+        return self.index[path]
+
+    def row_of(self, path):
+        return self.index.get(path)
+
+    def clear(self):
+        self.rows.clear()
+        self.index.clear()
@@ -0,0 +1,113 @@
+"""Builds the ffmpeg filter graph that turns the selected streams into the merged track.
+
+Everything that changes levels happens in this one graph, so it costs no extra
+pass over the media::
+
+    [0:1]volume=-6.0dB[g0];[g0][0:2]amix=inputs=2:duration=longest:weights=1 0.5,loudnorm=I=-23:TP=-1:LRA=11,aresample=48000[a]
+
+Per-stream gains become ``volume`` filters in front of amix, weights,
+``normalize`` and ``dropout_transition`` become amix options, and the loudness
+filter and the encoder's ``aformat`` follow the mix. When one run writes several
+outputs, the mix is split after the loudness filter, so it is decoded and
+computed once for all of them.
+"""
+
+from .encoding import EncoderSettings
+from .mixing import LOUDNESS_LOUDNORM, MixSettings
+
+LOUDNORM_TRUE_PEAK = -1.0  # dBTP
+LOUDNORM_RANGE = 11.0  # LU, loudness range target
+LOUDNORM_SAMPLE_RATE = 48000  # loudnorm outputs 192 kHz, resampled to this unless the encoder sets a rate
+
+
+class FilterGraphBuilder:
+    """Builds the '-filter_complex' of a merge from the selected streams and the mix settings.
+
+    ``build`` takes the encoder settings of every output. With several outputs
+    the mix is computed once and split with asplit, and each branch gets the
+    format filter of its own encoder.
+    """
+
+    def __init__(self, streams, mix=None, input_index=0):
+        self.streams = list(streams)
+        self.mix = mix or MixSettings()
+        self.input_index = input_index
+
+    def build(self, encoders=None, label='a'):
+        """Returns (graph, labels): the graph (None when no filter is needed) and one label per output.
+
+        A single output is labelled ``label``, several ones ``label0``, ``label1``...
+        A label is None when that output can map the single selected stream as is.
+        """
+        encoders = encoders or [EncoderSettings()]
+        chains, inputs, filters = self._mix_chains(encoders)
+        direct = [not filters and len(self.streams) == 1 and not encoder.format_filter() for encoder in encoders]
+        filtered = [output for output in range(len(encoders)) if not direct[output]]
+        labels = [None] * len(encoders)
+        if not filtered:
+            return None, labels
+        for output in filtered:
+            labels[output] = label if len(encoders) == 1 else f"{label}{output}"
+
+        if len(filtered) == 1:
+            format_filter = encoders[filtered[0]].format_filter()
+            chains.append(f"{inputs}{','.join(filters + ([format_filter] if format_filter else []))}"
+                          f"[{labels[filtered[0]]}]")
+            return ";".join(chains), labels
+
+        # One decode and mix, then a branch per output, e.g. ...amix=inputs=2,asplit=2[a0][s1];[s1]aformat=...[a1]
+        branches = []
+        formats = []
+        for output in filtered:
+            format_filter = encoders[output].format_filter()
+            if format_filter:
+                branches.append(f"[s{output}]")
+                formats.append(f"[s{output}]{format_filter}[{labels[output]}]")
+            else:
+                branches.append(f"[{labels[output]}]")
+        chains.append(f"{inputs}{','.join(filters + [f'asplit={len(filtered)}'])}{''.join(branches)}")
+        return ";".join(chains + formats), labels
+
+    def _mix_chains(self, encoders):
+        """Returns the gain chains, the input labels and the filters shared by all outputs."""
+        chains = []
+        inputs = []
+        filters = []
+        if len(self.streams) > 1:
+            for track, index in enumerate(self.streams):
+                gain_db = self.mix.gain_db(index)
+                if gain_db:
+                    chains.append(f"[{self.input_index}:{index}]volume={gain_db:.1f}dB[g{track}]")
+                    inputs.append(f"[g{track}]")
+                else:
+                    inputs.append(f"[{self.input_index}:{index}]")
+            filters.append(self.mix_filter())
+        else:
+            inputs.append(f"[{self.input_index}:{self.streams[0]}]")
+            if self.mix.gain_db(self.streams[0]):
+                filters.append(f"volume={self.mix.gain_db(self.streams[0]):.1f}dB")
+        sample_rates = {encoder.sample_rate for encoder in encoders}
+        filters += self.loudness_filters(sample_rates.pop() if len(sample_rates) == 1 else None)
+        return chains, ''.join(inputs), filters
+
+    def mix_filter(self):
+        """Returns the amix filter with the weights and options of the mix settings."""
+        options = [f"inputs={len(self.streams)}", "duration=longest"]
+        if self.mix.weights:
+            options.append("weights=" + " ".join(f"{self.mix.weight(index):g}" for index in self.streams))
+        if not self.mix.normalize:
+            options.append("normalize=0")
+        if self.mix.dropout_transition is not None:
+            options.append(f"dropout_transition={self.mix.dropout_transition:g}")
+        return "amix=" + ":".join(options)
+
+    def loudness_filters(self, sample_rate=None):
+        """Returns the single-pass loudness filters for the mix, empty without loudness settings."""
+        if not self.mix.loudness:
+            return []
+        if self.mix.loudness == LOUDNESS_LOUDNORM:
+            return [
+                f"loudnorm=I={self.mix.loudness_target:g}:TP={LOUDNORM_TRUE_PEAK:g}:LRA={LOUDNORM_RANGE:g}",
+                f"aresample={sample_rate or LOUDNORM_SAMPLE_RATE}",
+            ]
+        return [self.mix.loudness]
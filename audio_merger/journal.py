@@ -0,0 +1,142 @@
+"""Append-only JSON-lines journal of merge jobs, used to resume interrupted batches."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+JOURNAL_NAME = ".audio_merger_journal.jsonl"
+# Signature keys left out while their setting is at its default; a record holding one no longer matches a default job
+OPTIONAL_SIGNATURE_KEYS = ('mix', 'tracks', 'segment', 'audio_only')
+CHECKSUM_CHUNK = 1024 * 1024
+
+
+def journal_path(output_directory):
+    """Returns the journal file kept in a batch's output directory."""
+    return os.path.join(output_directory, JOURNAL_NAME)
+
+
+def quick_checksum(file_path):
+    """Hashes the size plus the first and last MiB of a file.
+
+    Reading whole multi-GB outputs on every resume would cost as much as the
+    merge itself; head, tail and size catch truncated and rewritten files.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(str(size).encode())
+        digest.update(f.read(CHECKSUM_CHUNK))
+        if size > CHECKSUM_CHUNK:
+            f.seek(max(CHECKSUM_CHUNK, size - CHECKSUM_CHUNK))
+            digest.update(f.read(CHECKSUM_CHUNK))
+    return digest.hexdigest()
+
+
+def job_signature(job):
+    """Returns the fingerprint that must be unchanged for an existing output to be reused.
+
+    It covers the input path, size and modification time, the selected streams and
+    the encoder, mix and output track settings, the segment and audio-only mode (all
+    but the encoder only when they differ from the defaults, so outputs recorded
+    before these settings existed stay valid).
+    """
+    try:
+        stat = os.stat(job.input_file)
+        input_size, input_mtime_ns = stat.st_size, stat.st_mtime_ns
+    except OSError:
+        input_size = input_mtime_ns = None
+    signature = {
+        'input': os.path.abspath(job.input_file),
+        'input_size': input_size,
+        'input_mtime_ns': input_mtime_ns,
+        'channels': list(job.selected_channels),
+        'encoder': job.encoder.as_dict(),
+    }
+    if not job.mix.is_default():
+        signature['mix'] = job.mix.as_dict()
+    if not job.tracks.is_default():
+        signature['tracks'] = {**job.tracks.as_dict(), 'kept_audio': job.kept_audio()}
+    if job.has_segment():
+        signature['segment'] = [job.start_sec, job.end_sec]
+    if job.audio_only:
+        signature['audio_only'] = True
+    return signature
+
+
+class JobJournal:
+    """Records every job's inputs, settings, status and output size/checksum.
+
+    The latest record of an output wins; only 'completed' records let a later
+    batch skip the job, and only while the output file still matches them.
+    With ``verify_outputs=False`` (incremental mode) an unchanged fingerprint and
+    an output of the recorded size are enough, so no output data is read.
+    Safe to use from several worker threads.
+    """
+
+    def __init__(self, journal_file, verify_outputs=True):
+        self.journal_file = journal_file
+        self.verify_outputs = verify_outputs
+        self.completed = {}  # output path -> latest 'completed' record
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.journal_file, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A crash may leave a torn last line
+                    self._apply(record)
+        except OSError:
+            pass
+
+    def _apply(self, record):
+        if record.get('status') == 'completed':
+            self.completed[record['output']] = record
+        else:
+            self.completed.pop(record.get('output'), None)
+
+    def record(self, job, status, **details):
+        record = {
+            'time': time.time(),
+            'status': status,
+            'output': os.path.abspath(job.output_file),
+            **job_signature(job),
+            **details,
+        }
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._apply(record)
+
+    def record_completed(self, job):
+        self.record(
+            job, 'completed',
+            output_size=os.path.getsize(job.output_file),
+            output_checksum=quick_checksum(job.output_file)
+        )
+
+    def is_complete(self, job):
+        """True when the job's output was completed with the same inputs and settings and is intact."""
+        output_file = os.path.abspath(job.output_file)
+        with self.lock:
+            record = self.completed.get(output_file)
+        if record is None:
+            return False
+        signature = job_signature(job)
+        if any(record.get(key) != value for key, value in signature.items()):
+            return False
+        if any(key in record and key not in signature for key in OPTIONAL_SIGNATURE_KEYS):
+            return False  # Recorded with a setting that is now back at its default
+        try:
+            if os.path.getsize(output_file) != record.get('output_size'):
+                return False
+            return not self.verify_outputs or quick_checksum(output_file) == record.get('output_checksum')
+        except OSError:
+            return False
@@ -0,0 +1,40 @@
+"""Thread-safe log buffering so workers never signal the GUI once per line."""
+
+import os
+import threading
+from collections import deque
+
+
+def default_log_path(output_file):
+    """Returns '<output dir>/logs/<output name>.log', where a job's full ffmpeg log is kept."""
+    output_dir, output_name = os.path.split(output_file)
+    return os.path.join(output_dir, "logs", f"{output_name}.log")
+
+
+class LogBuffer:
+    """Collects log lines from any thread until the owner drains them in one batch.
+
+    At most ``max_lines`` lines are kept; when the reader falls behind the oldest
+    lines are dropped and a single notice reports how many were skipped.
+    """
+
+    def __init__(self, max_lines=5000):
+        self.lines = deque(maxlen=max_lines)
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def write(self, line):
+        with self.lock:
+            if len(self.lines) == self.lines.maxlen:
+                self.dropped += 1
+            self.lines.append(line)
+
+    def drain(self):
+        """Returns and clears the buffered lines."""
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            lines.insert(0, f"... {dropped} log line(s) skipped, see the job log files ...")
+        return lines
@@ -0,0 +1,122 @@
+"""Mix settings of the merged track: which mixer combines the streams and at what levels."""
+
+import importlib.util
+
+MIXER_AMIX = 'amix'
+MIXER_NUMPY = 'numpy'
+MIXERS = (MIXER_AMIX, MIXER_NUMPY)
+
+LOUDNESS_LOUDNORM = 'loudnorm'
+LOUDNESS_DYNAUDNORM = 'dynaudnorm'
+LOUDNESS_FILTERS = (LOUDNESS_LOUDNORM, LOUDNESS_DYNAUDNORM)
+DEFAULT_LOUDNESS_TARGET = -23.0  # LUFS, EBU R128
+
+
+class MixSettings:
+    """How the selected streams are combined.
+
+    ``mixer`` is 'amix' (ffmpeg's filter, which scales every input down by the
+    number of inputs) or 'numpy' (the PCM mixer in pcmmix, which sums the streams
+    at their gains and keeps the peaks below full scale with a limiter).
+    ``gains`` maps stream indices to a gain in dB; streams not listed keep 0 dB.
+    ``weights`` maps stream indices to amix weights (1 when not listed), which are
+    relative to each other while amix normalizes; the NumPy mixer multiplies them
+    into the gains. ``normalize`` and ``dropout_transition`` (seconds) are passed to
+    amix. ``loudness`` is None, 'loudnorm' (single pass, to ``loudness_target``
+    LUFS) or 'dynaudnorm', applied to the mix in the same ffmpeg run.
+    """
+
+    __slots__ = ('mixer', 'gains', 'weights', 'normalize', 'dropout_transition', 'loudness', 'loudness_target')
+
+    def __init__(self, mixer=MIXER_AMIX, gains=None, weights=None, normalize=True, dropout_transition=None,
+                 loudness=None, loudness_target=DEFAULT_LOUDNESS_TARGET):
+        if mixer not in MIXERS:
+            raise ValueError(f"Unknown mixer '{mixer}', expected one of: {', '.join(MIXERS)}")
+        if loudness and loudness not in LOUDNESS_FILTERS:
+            raise ValueError(f"Unknown loudness filter '{loudness}', expected one of: {', '.join(LOUDNESS_FILTERS)}")
+        self.mixer = mixer
+        self.gains = {int(index): float(gain_db) for index, gain_db in (gains or {}).items() if float(gain_db)}
+        self.weights = {int(index): float(weight) for index, weight in (weights or {}).items() if float(weight) != 1.0}
+        if any(weight < 0 for weight in self.weights.values()):
+            raise ValueError("Stream weights must not be negative")
+        self.normalize = bool(normalize)
+        self.dropout_transition = float(dropout_transition) if dropout_transition is not None else None
+        if self.dropout_transition is not None and self.dropout_transition < 0:
+            raise ValueError("The dropout transition must not be negative")
+        self.loudness = loudness or None
+        self.loudness_target = float(loudness_target)
+
+    def gain_db(self, stream_index):
+        return self.gains.get(stream_index, 0.0)
+
+    def weight(self, stream_index):
+        return self.weights.get(stream_index, 1.0)
+
+    def is_default(self):
+        return self.mixer == MIXER_AMIX and not self.gains and not self._amix_options() and not self.loudness
+
+    def as_dict(self):
+        settings = {'mixer': self.mixer,
+                    'gains': {str(index): gain_db for index, gain_db in sorted(self.gains.items())}}
+        settings.update(self._amix_options())  # Only what was set, so older journal entries keep matching
+        if self.loudness:
+            settings['loudness'] = self.loudness
+            if self.loudness == LOUDNESS_LOUDNORM:
+                settings['loudness_target'] = self.loudness_target
+        return settings
+
+    def describe(self):
+        """Returns a 'mixer=numpy gains=1:+3.0dB,2:-6.0dB loudness=loudnorm(-23 LUFS)' summary for logs."""
+        text = f"mixer={self.mixer}"
+        if self.gains:
+            text += " gains=" + ",".join(f"{index}:{gain_db:+.1f}dB" for index, gain_db in sorted(self.gains.items()))
+        if self.weights:
+            text += " weights=" + ",".join(f"{index}:{weight:g}" for index, weight in sorted(self.weights.items()))
+        if not self.normalize:
+            text += " normalize=off"
+        if self.dropout_transition is not None:
+            text += f" dropout_transition={self.dropout_transition:g}s"
+        if self.loudness == LOUDNESS_LOUDNORM:
+            text += f" loudness=loudnorm({self.loudness_target:g} LUFS)"
+        elif self.loudness:
+            text += f" loudness={self.loudness}"
+        return text
+
+    def _amix_options(self):
+        options = {}
+        if self.weights:
+            options['weights'] = {str(index): weight for index, weight in sorted(self.weights.items())}
+        if not self.normalize:
+            options['normalize'] = False
+        if self.dropout_transition is not None:
+            options['dropout_transition'] = self.dropout_transition
+        return options
+
+
+def numpy_available():
+    """True when NumPy is installed, without importing it (the GUI asks at startup)."""
+    return importlib.util.find_spec('numpy') is not None
+
+
+def parse_gains(values):
+    """Parses 'INDEX=DB' strings such as '2=-6' or '1=+3.5' into a stream index -> dB dict."""
+    return _parse_indexed(values, lambda text: float(text.lower().removesuffix('db')), "gain",
+                          "INDEX=DB such as '2=-6'")
+
+
+def parse_weights(values):
+    """Parses 'INDEX=WEIGHT' strings such as '2=0.5' into a stream index -> weight dict."""
+    return _parse_indexed(values, float, "weight", "INDEX=WEIGHT such as '2=0.5'")
+
+
+def _parse_indexed(values, convert, name, expected):
+    parsed = {}
+    for value in values:
+        index, sep, number = value.partition('=')
+        try:
+            if not sep:
+                raise ValueError
+            parsed[int(index)] = convert(number)
+        except ValueError:
+            raise ValueError(f"Invalid {name} '{value}', expected {expected}") from None
+    return parsed
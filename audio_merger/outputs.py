@@ -0,0 +1,65 @@
+"""Output profiles: several deliverables of one merge written by a single ffmpeg run.
+
+A job with profiles writes one file per profile, for example an MKV master with
+FLAC and an MP4 proxy with AAC, from one decode of the input. The mix is split
+with asplit (see filtergraph) and each profile has its own container and
+encoder. Every output has its own journal entry and its own result, so a profile
+that already exists is not written again.
+"""
+
+import os
+import re
+
+from .encoding import PRESETS, EncoderSettings, preset_settings
+
+PROFILE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')  # Becomes part of the file name
+
+
+class OutputProfile:
+    """One output of a job: '<output root>_<name>.<container>' encoded with ``encoder``."""
+
+    __slots__ = ('name', 'container', 'encoder')
+
+    def __init__(self, name, container, encoder=None):
+        if not PROFILE_NAME_PATTERN.match(name or ''):
+            raise ValueError(f"Invalid profile name '{name}', use letters, digits, '-' and '_'")
+        if not PROFILE_NAME_PATTERN.match(container or ''):
+            raise ValueError(f"Invalid container '{container}' for profile '{name}', e.g. 'mkv' or 'mp4'")
+        self.name = name
+        self.container = container.lower()
+        self.encoder = encoder or EncoderSettings()
+
+    def output_path(self, output_file):
+        """Returns the file of this profile for a job whose output is ``output_file``."""
+        root, _ = os.path.splitext(output_file)
+        return f"{root}_{self.name}.{self.container}"
+
+    def as_dict(self):
+        return {'name': self.name, 'container': self.container, 'encoder': self.encoder.as_dict()}
+
+    def describe(self):
+        """Returns a 'proxy: mp4, codec=aac bitrate=192k' summary for logs."""
+        return f"{self.name}: {self.container}, {self.encoder.describe()}"
+
+
+def parse_profiles(values, default_encoder=None):
+    """Parses 'NAME=CONTAINER[:PRESET]' strings such as 'proxy=mp4:fast-aac' into OutputProfiles.
+
+    Profiles without a preset use ``default_encoder``, the batch's own encoder settings.
+    """
+    profiles = []
+    for value in values:
+        name, sep, spec = value.partition('=')
+        container, _, preset = spec.partition(':')
+        if not sep or not container:
+            raise ValueError(f"Invalid output profile '{value}', expected NAME=CONTAINER[:PRESET] "
+                             f"such as 'proxy=mp4:fast-aac'")
+        if preset and preset not in PRESETS:
+            raise ValueError(f"Unknown preset '{preset}' in output profile '{value}', expected one of: "
+                             f"{', '.join(sorted(PRESETS))}")
+        encoder = preset_settings(preset) if preset else default_encoder
+        profiles.append(OutputProfile(name, container, encoder))
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError("Output profile names must be unique")
+    return profiles
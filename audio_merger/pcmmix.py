@@ -0,0 +1,282 @@
+"""PCM mixing backend: mixes the selected streams in NumPy instead of ffmpeg's amix.
+
+amix divides every input by the number of inputs, so the merged track gets
+quieter with each stream added. This backend sums the streams at their own
+gains and keeps the peaks below full scale with a limiter:
+
+    ffmpeg (decode) --f32le, all tracks interleaved--> PcmMixer --f32le--> ffmpeg (encode + mux)
+
+The decoder converts every selected stream to the output rate and layout and
+interleaves them with amerge, so the input is demuxed once. The mixer reads
+fixed-size blocks into a preallocated buffer, so memory stays constant however
+long the file is. The muxer copies the video from the input, encodes the mix
+(into every output of a job with output profiles, in the format of the first)
+and reports progress as usual; the loudness filter of the mix settings, if
+any, runs there as well. Weights multiply the gains; amix's ``normalize`` and
+``dropout_transition`` have no meaning for a plain sum. NumPy is optional;
+``mixing.numpy_available()`` tells the front ends whether to offer this mixer.
+"""
+
+import io
+import math
+import subprocess
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # The amix backend needs nothing beyond ffmpeg
+    np = None
+
+from .engine import MergeRunner, build_output_args, partial_output_path
+from .filtergraph import FilterGraphBuilder
+from .mixing import MixSettings
+from .report import wait_with_rusage
+from .utils import hidden_startupinfo
+
+DEFAULT_SAMPLE_RATE = 48000
+DEFAULT_LAYOUT = 'stereo'
+BLOCK_FRAMES = 8192  # ~0.17 s at 48 kHz
+LIMITER_CEILING_DB = -1.0
+LIMITER_RELEASE_SEC = 0.25
+MAX_MERGED_CHANNELS = 64  # amerge limit: tracks x channels per track
+LAYOUT_CHANNELS = {
+    'mono': 1, 'stereo': 2, '2.1': 3, '3.0': 3, 'quad': 4, '4.0': 4, '5.0': 5, '5.1': 6, '6.1': 7, '7.1': 8,
+}
+
+
+def output_format(encoder):
+    """Returns (sample_rate, layout, channels) of the mix for the encoder settings."""
+    layout = encoder.channel_layout or DEFAULT_LAYOUT
+    if layout not in LAYOUT_CHANNELS:
+        raise ValueError(f"The NumPy mixer does not support the channel layout '{layout}'")
+    return encoder.sample_rate or DEFAULT_SAMPLE_RATE, layout, LAYOUT_CHANNELS[layout]
+
+
+def build_decode_command(job, sample_rate, layout):
+    """Returns the ffmpeg command writing the selected streams as interleaved f32le PCM to stdout."""
+    chains = []
+    labels = []
+    for track, index in enumerate(job.selected_channels):
+        chain = f"[0:{index}]aresample={sample_rate},aformat=sample_fmts=flt:channel_layouts={layout}"
+        if job.duration_sec > 0:
+            chain += f",apad=whole_dur={job.duration_sec:.3f}"  # amerge stops at the shortest input
+        chains.append(f"{chain}[t{track}]")
+        labels.append(f"[t{track}]")
+    if len(labels) > 1:
+        chains.append(f"{''.join(labels)}amerge=inputs={len(labels)}[pcm]")
+    else:
+        chains[0] = chains[0][:-len(labels[0])] + "[pcm]"
+    return [
+        "ffmpeg", "-nostdin", "-nostats",
+        *job.input_args(),
+        "-filter_complex", ";".join(chains),
+        "-map", "[pcm]",
+        "-f", "f32le", "-c:a", "pcm_f32le",
+        "pipe:1",
+    ]
+
+
+def build_mux_command(variants, output_files, sample_rate, channels):
+    """Returns the ffmpeg command muxing the input's video with the mix read from stdin.
+
+    Every variant of the job (see MergeJob.variants) gets its own output file.
+    Original streams kept by the job's TrackSettings are copied from the input
+    after the mix.
+    """
+    job = variants[0]
+    mix = MixSettings(loudness=job.mix.loudness, loudness_target=job.mix.loudness_target)  # Gains are already applied
+    filter_complex, labels = FilterGraphBuilder(['a'], mix, input_index=1).build(
+        [variant.encoder for variant in variants])
+    command = [
+        "ffmpeg",
+        "-nostats",
+        "-progress", "pipe:1",
+        *job.input_args(),  # Same segment as the decoder, so the video and kept tracks line up with the mix
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+    ]
+    if filter_complex:
+        command += ["-filter_complex", filter_complex]
+    for variant, output_file, label in zip(variants, output_files, labels):
+        command += build_output_args(variant, f"[{label}]" if label else "1:a", output_file)
+    return command
+
+
+class PcmMixer:
+    """Mixes blocks of interleaved tracks with per-track gains and a peak limiter.
+
+    ``process`` takes a (frames, tracks, channels) float32 block and returns the
+    (frames, channels) mix, each track scaled by its gain (dB) times its weight.
+    The limiter lowers the gain at once when a block would exceed the ceiling and
+    recovers with a linear ramp per block; a final clip catches whatever is left
+    of the peak.
+    """
+
+    def __init__(self, gains_db, sample_rate, weights=None, ceiling_db=LIMITER_CEILING_DB,
+                 release_sec=LIMITER_RELEASE_SEC):
+        weights = weights or [1.0] * len(gains_db)
+        self.gains = np.array([10 ** (gain_db / 20) * weight for gain_db, weight in zip(gains_db, weights)],
+                              dtype=np.float32)
+        self.sample_rate = sample_rate
+        self.ceiling = 10 ** (ceiling_db / 20)
+        self.release_sec = release_sec
+        self.gain = 1.0  # Limiter gain at the end of the previous block
+        self.min_gain = 1.0
+
+    def process(self, block):
+        mixed = np.tensordot(block, self.gains, axes=([1], [0]))  # Sum over tracks
+        frames = mixed.shape[0]
+        if not frames:
+            return mixed
+        peak = float(np.abs(mixed).max())
+        target = min(1.0, self.ceiling / peak) if peak > 0 else 1.0
+        if target < self.gain:
+            mixed *= target  # Attack: no overshoot
+            self.gain = target
+        elif self.gain < 1.0:
+            step = frames / (self.sample_rate * self.release_sec)
+            new_gain = min(target, self.gain + (1.0 - self.gain) * min(1.0, step))
+            mixed *= np.linspace(self.gain, new_gain, frames, dtype=np.float32)[:, None]
+            self.gain = new_gain
+        self.min_gain = min(self.min_gain, self.gain)
+        np.clip(mixed, -self.ceiling, self.ceiling, out=mixed)
+        return mixed
+
+
+class PcmMixRunner(MergeRunner):
+    """MergeRunner whose mix is computed in NumPy between a decoding and a muxing ffmpeg.
+
+    Progress, stop, the journal, the '.partial' output and the resource statistics
+    (summed over both ffmpeg processes) behave as with the amix backend.
+    """
+
+    def __init__(self, job, block_frames=BLOCK_FRAMES, **kwargs):
+        super().__init__(job, **kwargs)
+        self.block_frames = block_frames
+        try:
+            self.sample_rate, self.layout, self.channels = output_format(self.variants[0].encoder)
+            self.format_error = None
+        except ValueError as e:  # Reported by run, like any other failure of the job
+            self.sample_rate, self.layout, self.channels = DEFAULT_SAMPLE_RATE, DEFAULT_LAYOUT, 2
+            self.format_error = str(e)
+        self.mix_error = None
+        self.limiter_min_gain = None
+
+    @property
+    def command(self):
+        variants = self.variants if self.pending is None else self.pending
+        return build_mux_command(variants, [partial_output_path(variant.output_file) for variant in variants],
+                                 self.sample_rate, self.channels)
+
+    @property
+    def decode_command(self):
+        return build_decode_command(self.job, self.sample_rate, self.layout)
+
+    def _run_ffmpeg(self):
+        if np is None:
+            self._report("The NumPy mixer needs NumPy, install it with 'pip install numpy'")
+            return False
+        if self.format_error:
+            self._report(self.format_error)
+            return False
+        tracks = len(self.job.selected_channels)
+        if tracks * self.channels > MAX_MERGED_CHANNELS:
+            self._report(f"The NumPy mixer handles at most {MAX_MERGED_CHANNELS // self.channels} "
+                         f"{self.layout} streams, {tracks} are selected")
+            return False
+
+        started = time.perf_counter()
+        try:
+            decoder = subprocess.Popen(self.decode_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       startupinfo=hidden_startupinfo())
+        except OSError as e:
+            self._report(f"Could not start ffmpeg: {e}")
+            return False
+        try:
+            muxer = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, startupinfo=hidden_startupinfo())
+        except OSError as e:
+            decoder.kill()
+            wait_with_rusage(decoder)
+            self._report(f"Could not start ffmpeg: {e}")
+            return False
+        self._record_started()
+
+        log_file = self._open_log_file()
+        log_readers = [
+            threading.Thread(target=self._read_log, args=(self._text(decoder.stderr), log_file, "[decode] "),
+                             daemon=True),
+            threading.Thread(target=self._read_log, args=(self._text(muxer.stderr), log_file), daemon=True),
+        ]
+        for reader in log_readers:
+            reader.start()
+        pump = threading.Thread(target=self._pump, args=(decoder, muxer, tracks), daemon=True)
+        pump.start()
+
+        self._follow_progress(self._text(muxer.stdout), [decoder, muxer])
+
+        muxer_rusage = wait_with_rusage(muxer)
+        pump.join()
+        decoder.stdout.close()  # A decoder still writing (stop, muxer failure) gets a broken pipe
+        if muxer.returncode != 0 or self.stopped:
+            decoder.terminate()
+        decoder_rusage = wait_with_rusage(decoder)
+        for reader in log_readers:
+            reader.join()
+        self.returncode = decoder.returncode if decoder.returncode and not muxer.returncode else muxer.returncode
+        self._finish_stats(started, [decoder_rusage, muxer_rusage])
+        if log_file and self.limiter_min_gain is not None and self.limiter_min_gain < 1.0:  # Only when it engaged
+            log_file.write(f"Limiter: peak gain reduction {-20 * math.log10(self.limiter_min_gain):.1f} dB\n")
+        if log_file and self.mix_error:
+            log_file.write(f"Mixer error: {self.mix_error}\n")
+        self._close_log_file(log_file)
+        success = not self.stopped and self.returncode == 0 and self.mix_error is None
+        return self._finalize_outputs(success)
+
+    def _pump(self, decoder, muxer, tracks):
+        """Reads PCM blocks from the decoder, mixes them and writes the mix to the muxer."""
+        frame_bytes = tracks * self.channels * 4
+        buffer = bytearray(self.block_frames * frame_bytes)
+        view = memoryview(buffer)
+        mix = self.job.mix
+        mixer = PcmMixer([mix.gain_db(index) for index in self.job.selected_channels], self.sample_rate,
+                         [mix.weight(index) for index in self.job.selected_channels])
+        try:
+            while not self.stopped:
+                filled = 0
+                while filled < len(buffer):  # Pipes return short reads
+                    count = decoder.stdout.readinto(view[filled:])
+                    if not count:
+                        break
+                    filled += count
+                frames = filled // frame_bytes
+                if frames:
+                    block = np.frombuffer(buffer, dtype='<f4', count=frames * tracks * self.channels)
+                    mixed = mixer.process(block.reshape(frames, tracks, self.channels))
+                    muxer.stdin.write(mixed.astype('<f4', copy=False).tobytes())
+                if filled < len(buffer):
+                    break  # End of the decoded stream
+        except (OSError, ValueError) as e:  # Muxer gone (broken pipe) or stopped
+            if not self.stopped:
+                self.mix_error = str(e)
+            decoder.terminate()
+        finally:
+            self.limiter_min_gain = mixer.min_gain
+            try:
+                muxer.stdin.close()  # EOF lets the muxer finish the file
+            except OSError:
+                pass
+
+    def _open_log_file(self):
+        log_file = super()._open_log_file()
+        if log_file:
+            log_file.write(f"Decoder command: {' '.join(self.decode_command)}\n")
+        return log_file
+
+    def _report(self, message):
+        if self.on_output:
+            self.on_output(message)
+
+    @staticmethod
+    def _text(stream):
+        return io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
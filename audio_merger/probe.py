@@ -0,0 +1,200 @@
+"""Media probing with a single JSON ffprobe call and a persistent LRU cache."""
+
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import hidden_startupinfo, user_cache_dir
+
+PROBE_ENTRIES = (
+    "format=duration"
+    ":stream=index,codec_name,channels,channel_layout"
+    ":stream_tags=language,title"
+)
+
+
+class ProbeError(Exception):
+    """Raised when ffprobe cannot read a media file."""
+
+
+def parse_probe_output(data):
+    """Converts ffprobe's JSON document into the media info dict used by the app.
+
+    The result looks like ``{'duration_sec': 12.5, 'audio_streams': [{'index': 1,
+    'codec': 'aac', 'channels': 2, 'channel_layout': 'stereo', 'language': 'eng',
+    'title': ''}, ...]}`` with streams sorted by their absolute index.
+    """
+    try:
+        duration_sec = float(data.get('format', {}).get('duration', 0.0))
+    except (TypeError, ValueError):
+        duration_sec = 0.0
+
+    audio_streams = []
+    for stream in data.get('streams', []):
+        if 'index' not in stream:
+            continue
+        tags = stream.get('tags', {})
+        audio_streams.append({
+            'index': int(stream['index']),
+            'codec': stream.get('codec_name', ''),
+            'channels': int(stream.get('channels', 0)),
+            'channel_layout': stream.get('channel_layout', ''),
+            'language': tags.get('language', ''),
+            'title': tags.get('title', ''),
+        })
+    audio_streams.sort(key=lambda s: s['index'])
+    return {'duration_sec': duration_sec, 'audio_streams': audio_streams}
+
+
+def run_ffprobe(file_path):
+    """Probes duration and audio streams of a file with one ffprobe process."""
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a",
+        "-show_entries", PROBE_ENTRIES,
+        "-of", "json",
+        file_path
+    ]
+    try:
+        process = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            startupinfo=hidden_startupinfo()
+        )
+    except OSError as e:
+        raise ProbeError(str(e)) from e
+    if process.returncode != 0:
+        raise ProbeError(process.stderr.strip() or f"ffprobe exited with code {process.returncode}")
+    try:
+        return parse_probe_output(json.loads(process.stdout))
+    except ValueError as e:
+        raise ProbeError(f"Invalid ffprobe output: {e}") from e
+
+
+class ProbeCache:
+    """On-disk cache of probe results keyed by path and validated by size and mtime.
+
+    Entries are kept in least-recently-used order and the oldest ones are dropped
+    once ``max_entries`` is exceeded. Call ``save`` to persist changes. All methods
+    are safe to call from several probe threads at once.
+    """
+
+    def __init__(self, cache_file=None, max_entries=20000):
+        self.cache_file = cache_file or os.path.join(user_cache_dir(), "probe_cache.json")
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                self.entries = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+
+    def get(self, key, stat):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+                return None
+            self.entries.move_to_end(key)
+            return entry['info']
+
+    def put(self, key, stat, info):
+        with self.lock:
+            self.entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'info': info}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+
+
+def probe_media(file_path, cache=None):
+    """Returns the media info of a file, running ffprobe only on a cache miss."""
+    if cache is None:
+        return run_ffprobe(file_path)
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        raise ProbeError(str(e)) from e
+    key = os.path.normcase(os.path.abspath(file_path))
+    info = cache.get(key, stat)
+    if info is None:
+        info = run_ffprobe(file_path)
+        cache.put(key, stat, info)
+    return info
+
+
+def describe_audio_stream(stream):
+    """Returns a short 'codec, layout, language' summary of a probed audio stream."""
+    layout = stream['channel_layout'] or (f"{stream['channels']}ch" if stream['channels'] else "")
+    return ", ".join(part for part in (stream['codec'], layout, stream['language']) if part)
+
+
+def default_probe_workers():
+    """Returns the default number of concurrent ffprobe processes."""
+    return min(8, (os.cpu_count() or 1) * 2)
+
+
+class ProbePool:
+    """Probes files on a bounded thread pool so callers never block on ffprobe.
+
+    ``callback(file_path, info, error)`` is invoked from a pool thread with either the
+    media info or the error message; GUI callers must hand it over to their own thread.
+    """
+
+    def __init__(self, cache=None, max_workers=None):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or default_probe_workers(),
+            thread_name_prefix="probe"
+        )
+        self.futures = set()
+        self.lock = threading.Lock()
+
+    def submit(self, file_path, callback):
+        future = self.executor.submit(self._probe, file_path, callback)
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def cancel(self):
+        """Cancels every probe that has not started yet; running probes still report back."""
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+    def _probe(self, file_path, callback):
+        try:
+            info, error = probe_media(file_path, self.cache), None
+        except ProbeError as e:
+            info, error = None, str(e)
+        callback(file_path, info, error)
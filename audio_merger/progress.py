@@ -0,0 +1,183 @@
+"""Parsing of ffmpeg's machine-readable '-progress' output."""
+
+import time
+
+
+class FFmpegProgress:
+    """One '-progress' block of ffmpeg. Fields are None while ffmpeg reports N/A."""
+
+    __slots__ = ('frame', 'fps', 'bitrate_kbps', 'total_size', 'out_time_us', 'speed', 'state', 'percent', 'outputs')
+
+    def __init__(self):
+        self.frame = None
+        self.fps = None
+        self.bitrate_kbps = None
+        self.total_size = None
+        self.out_time_us = None
+        self.speed = None
+        self.state = None  # 'continue' or 'end'
+        self.percent = None  # Filled in by the runner when the duration is known
+        self.outputs = None  # [{'output', 'size'}] of a job writing several outputs, filled in by the runner
+
+    @property
+    def out_time_sec(self):
+        return self.out_time_us / 1_000_000 if self.out_time_us is not None else None
+
+    def as_dict(self):
+        progress = {
+            'out_time_sec': self.out_time_sec,
+            'speed': self.speed,
+            'fps': self.fps,
+            'bitrate_kbps': self.bitrate_kbps,
+            'total_size': self.total_size,
+            'percent': self.percent,
+        }
+        if self.outputs is not None:
+            progress['outputs'] = self.outputs
+        return progress
+
+
+def _int(value):
+    return int(value) if value != 'N/A' else None
+
+
+def _float(value):
+    return float(value) if value != 'N/A' else None
+
+
+def _speed(value):
+    return float(value[:-1]) if value.endswith('x') else None  # '1.5x' or 'N/A'
+
+
+def _bitrate(value):
+    return float(value[:-7]) if value.endswith('kbits/s') else None  # '  69.0kbits/s' or 'N/A'
+
+
+FIELD_PARSERS = {
+    'frame': ('frame', _int),
+    'fps': ('fps', _float),
+    'bitrate': ('bitrate_kbps', _bitrate),
+    'total_size': ('total_size', _int),
+    'out_time_us': ('out_time_us', _int),
+    'speed': ('speed', _speed),
+}
+
+
+class ProgressParser:
+    """Incremental parser of 'key=value' lines written by 'ffmpeg -progress pipe:1'.
+
+    ``feed`` returns the completed FFmpegProgress when a block ends with its
+    'progress=' line and None otherwise. Unknown keys are ignored without
+    allocating anything beyond the split of the line.
+    """
+
+    def __init__(self):
+        self.current = FFmpegProgress()
+
+    def feed(self, line):
+        key, _, value = line.partition('=')
+        if key == 'progress':
+            progress = self.current
+            progress.state = value.strip()
+            self.current = FFmpegProgress()
+            return progress
+        field = FIELD_PARSERS.get(key)
+        if field is not None:
+            name, convert = field
+            try:
+                setattr(self.current, name, convert(value.strip()))
+            except ValueError:
+                setattr(self.current, name, None)
+        return None
+
+
+class ProgressThrottle:
+    """Decides which progress updates are worth reporting.
+
+    An update passes when its value (usually the percent) differs from the last
+    reported one, or when ``min_interval`` seconds have passed since the last
+    report, so a stalled value still gets a periodic update; final updates
+    always pass.
+    """
+
+    def __init__(self, min_interval=0.25, clock=time.monotonic):
+        self.min_interval = min_interval
+        self.clock = clock
+        self.last_value = None
+        self.last_time = None
+
+    def should_report(self, value, final=False):
+        now = self.clock()
+        if not final and value == self.last_value:
+            if self.last_time is not None and now - self.last_time < self.min_interval:
+                return False  # Unchanged, and the last report is still recent
+        self.last_value = value
+        self.last_time = now
+        return True
+
+
+class BatchProgress:
+    """Batch progress weighted by media duration, with throughput and ETA.
+
+    Every job counts with its media duration; jobs whose duration is unknown (or not
+    reported yet) count with the average known duration. Throughput is the sum of
+    ffmpeg's reported speed over the running jobs, i.e. media seconds processed per
+    wall-clock second across all parallel jobs.
+    """
+
+    def __init__(self, total_jobs):
+        self.total_jobs = total_jobs
+        self.durations = {}  # job -> media seconds (0 when unknown)
+        self.known_sec = 0.0
+        self.known_jobs = 0
+        self.finished_known_sec = 0.0
+        self.finished_unknown_jobs = 0
+        self.running = {}  # job -> (processed media seconds, speed)
+
+    def add_job(self, job, duration_sec):
+        if job in self.durations:
+            return
+        self.durations[job] = duration_sec if duration_sec and duration_sec > 0 else 0.0
+        if self.durations[job]:
+            self.known_sec += self.durations[job]
+            self.known_jobs += 1
+
+    def update(self, job, out_time_sec, speed):
+        duration_sec = self.durations.get(job, 0.0)
+        position = min(out_time_sec, duration_sec) if duration_sec and out_time_sec is not None else 0.0
+        self.running[job] = (position, speed)
+
+    def finish(self, job):
+        self.running.pop(job, None)
+        duration_sec = self.durations.get(job, 0.0)
+        if duration_sec:
+            self.finished_known_sec += duration_sec
+        else:
+            self.finished_unknown_jobs += 1
+
+    def average_duration(self):
+        return self.known_sec / self.known_jobs if self.known_jobs else 1.0
+
+    def total_sec(self):
+        return self.known_sec + (self.total_jobs - self.known_jobs) * self.average_duration()
+
+    def processed_sec(self):
+        running_sec = sum(position for position, _ in self.running.values())
+        return self.finished_known_sec + self.finished_unknown_jobs * self.average_duration() + running_sec
+
+    def percent(self):
+        total_sec = self.total_sec()
+        if total_sec <= 0:
+            return 0
+        return min(100, int(self.processed_sec() / total_sec * 100))
+
+    def throughput(self):
+        """Returns the media seconds processed per wall-clock second by all running jobs."""
+        return sum(speed for _, speed in self.running.values() if speed)
+
+    def eta_sec(self):
+        """Returns the estimated seconds until the batch is done, or None while unknown."""
+        throughput = self.throughput()
+        if throughput <= 0:
+            return None
+        return max(0.0, self.total_sec() - self.processed_sec()) / throughput
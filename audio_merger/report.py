@@ -0,0 +1,190 @@
+"""Per-job resource statistics and the batch report written when a batch ends.
+
+Every MergeRunner fills a JobStats: wall time, CPU user/system time and peak RSS
+of the ffmpeg child (from ``os.wait4`` where the platform has it), bytes read and
+written, ffmpeg's final speed and its exit status. A BatchReport collects them
+and exports CSV or JSON with aggregates such as the p50/p95 realtime factor and
+the throughput in media hours per wall-clock hour.
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+
+STATS_FIELDS = (
+    'input_file', 'output_file', 'status', 'returncode', 'duration_sec', 'wall_sec', 'cpu_user_sec',
+    'cpu_sys_sec', 'peak_rss_kib', 'bytes_read', 'bytes_written', 'speed', 'realtime_factor',
+)
+
+
+def percentile(ordered, fraction):
+    """Returns the nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def read_proc_io(pid):
+    """Returns (bytes read, bytes written) of a running process from /proc, or None elsewhere.
+
+    Uses ``rchar``/``wchar``, the bytes passed through read and write calls, so
+    files served from the page cache are counted too.
+    """
+    try:
+        with open(f"/proc/{pid}/io", encoding='ascii') as f:
+            counters = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def wait_with_rusage(process):
+    """Waits for a Popen child and returns its resource usage, or None without ``os.wait4``."""
+    if not hasattr(os, 'wait4'):  # Windows
+        process.wait()
+        return None
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+class JobStats:
+    """Resource usage and outcome of one job."""
+
+    __slots__ = ('input_file', 'output_file', 'status', 'returncode', 'duration_sec', 'wall_sec', 'cpu_user_sec',
+                 'cpu_sys_sec', 'peak_rss_kib', 'bytes_read', 'bytes_written', 'speed')
+
+    def __init__(self, input_file, output_file=None, duration_sec=0.0, status='failed'):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.status = status  # done, skipped, stopped or failed
+        self.returncode = None
+        self.duration_sec = duration_sec  # Media duration
+        self.wall_sec = None
+        self.cpu_user_sec = None
+        self.cpu_sys_sec = None
+        self.peak_rss_kib = None
+        self.bytes_read = None
+        self.bytes_written = None
+        self.speed = None  # ffmpeg's last reported speed, e.g. 12.5 for 12.5x
+
+    @property
+    def realtime_factor(self):
+        """Media seconds processed per wall second, for jobs that ran ffmpeg to completion."""
+        if self.status != 'done' or not self.wall_sec or not self.duration_sec:
+            return None
+        return self.duration_sec / self.wall_sec
+
+    def add_rusage(self, rusage, block_io=False):
+        """Adds the usage of one ffmpeg process; CPU times add up, the peak RSS is the largest.
+
+        With ``block_io`` (no /proc counters) the bytes read and written are taken
+        from the block I/O counts, which miss reads served from the page cache.
+        """
+        if rusage is None:
+            return
+        self.cpu_user_sec = (self.cpu_user_sec or 0.0) + rusage.ru_utime
+        self.cpu_sys_sec = (self.cpu_sys_sec or 0.0) + rusage.ru_stime
+        peak_rss_kib = rusage.ru_maxrss // (1024 if sys.platform == 'darwin' else 1)  # macOS reports bytes
+        self.peak_rss_kib = max(self.peak_rss_kib or 0, peak_rss_kib)
+        if block_io:
+            self.bytes_read = (self.bytes_read or 0) + rusage.ru_inblock * 512
+            self.bytes_written = (self.bytes_written or 0) + rusage.ru_oublock * 512
+
+    def as_dict(self):
+        stats = {field: getattr(self, field) for field in STATS_FIELDS}
+        for field in ('wall_sec', 'cpu_user_sec', 'cpu_sys_sec', 'realtime_factor'):
+            if stats[field] is not None:
+                stats[field] = round(stats[field], 3)
+        return stats
+
+    def describe(self):
+        """Returns a short one-line summary for logs."""
+        parts = []
+        if self.wall_sec is not None:
+            parts.append(f"{self.wall_sec:.1f}s wall")
+        if self.cpu_user_sec is not None:
+            parts.append(f"{self.cpu_user_sec + self.cpu_sys_sec:.1f}s CPU")
+        if self.peak_rss_kib:
+            parts.append(f"{self.peak_rss_kib / 1024:.0f} MiB peak RSS")
+        if self.realtime_factor is not None:
+            parts.append(f"{self.realtime_factor:.1f}x realtime")
+        return ", ".join(parts)
+
+
+class BatchReport:
+    """Collects the JobStats of a batch and exports them with aggregates."""
+
+    def __init__(self):
+        self.jobs = []
+        self.started = time.time()
+        self.finished = None
+
+    def add(self, stats):
+        if stats is not None:
+            self.jobs.append(stats)
+
+    def finish(self):
+        self.finished = time.time()
+
+    def summary(self):
+        finished = self.finished or time.time()
+        wall_sec = finished - self.started
+        counts = {}
+        for stats in self.jobs:
+            counts[stats.status] = counts.get(stats.status, 0) + 1
+        processed = [stats for stats in self.jobs if stats.status == 'done']
+        media_sec = sum(stats.duration_sec for stats in processed)
+        factors = sorted(stats.realtime_factor for stats in processed if stats.realtime_factor is not None)
+        cpu_sec = sum(stats.cpu_user_sec + stats.cpu_sys_sec for stats in self.jobs if stats.cpu_user_sec is not None)
+        peak_rss = [stats.peak_rss_kib for stats in self.jobs if stats.peak_rss_kib is not None]
+        return {
+            'started': time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            'wall_sec': round(wall_sec, 3),
+            'jobs': len(self.jobs),
+            'done': counts.get('done', 0),
+            'skipped': counts.get('skipped', 0),
+            'stopped': counts.get('stopped', 0),
+            'failed': counts.get('failed', 0),
+            'media_sec': round(media_sec, 3),
+            'media_hours_per_hour': round(media_sec / wall_sec, 3) if wall_sec > 0 else None,
+            'realtime_factor_p50': round(percentile(factors, 0.5), 3) if factors else None,
+            'realtime_factor_p95': round(percentile(factors, 0.95), 3) if factors else None,
+            'cpu_sec': round(cpu_sec, 3),
+            'peak_rss_kib': max(peak_rss) if peak_rss else None,
+            'bytes_written': sum(stats.bytes_written or 0 for stats in processed),
+        }
+
+    def describe(self):
+        summary = self.summary()
+        text = f"{summary['media_hours_per_hour'] or 0:.2f} media hours per hour"
+        if summary['realtime_factor_p50'] is not None:
+            text += (f", realtime factor p50 {summary['realtime_factor_p50']:.1f}x"
+                     f" / p95 {summary['realtime_factor_p95']:.1f}x")
+        return text
+
+    def write(self, path):
+        """Writes the report as CSV (one row per job) when ``path`` ends in .csv, JSON otherwise.
+
+        The CSV has no room for the aggregates, so they go to a '<name>.summary.json'
+        next to it.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=STATS_FIELDS)
+                writer.writeheader()
+                for stats in self.jobs:
+                    writer.writerow(stats.as_dict())
+            path = f"{os.path.splitext(path)[0]}.summary.json"
+            report = self.summary()
+        else:
+            report = {'summary': self.summary(), 'jobs': [stats.as_dict() for stats in self.jobs]}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+def default_report_path(directory, extension='json'):
+    """Returns '<directory>/batch_report_<timestamp>.<extension>'."""
+    return os.path.join(directory, f"batch_report_{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
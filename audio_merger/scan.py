@@ -0,0 +1,119 @@
+"""Streaming enumeration of media files in folders, filtered by extension or glob patterns."""
+
+import fnmatch
+import glob
+import os
+import re
+import threading
+import time
+
+DEFAULT_PATTERNS = ("*.mp4", "*.mkv", "*.mov", "*.avi")
+
+
+def parse_patterns(text):
+    """Parses a filter such as '*.mkv *.mp4', 'mkv, mp4' or '.mkv;*_final.*' into glob patterns."""
+    patterns = []
+    for token in re.split(r"[\s,;]+", text.strip()):
+        if not token:
+            continue
+        if not glob.has_magic(token):
+            token = f"*.{token.lstrip('.')}"  # Bare extension
+        patterns.append(token)
+    return tuple(patterns) or DEFAULT_PATTERNS
+
+
+class MediaFilter:
+    """Matches file names against glob patterns, case-insensitively."""
+
+    def __init__(self, patterns=DEFAULT_PATTERNS):
+        self.patterns = tuple(patterns)
+        # One compiled regex instead of an fnmatch call per pattern and file
+        self.regex = re.compile("|".join(fnmatch.translate(pattern.lower()) for pattern in self.patterns))
+
+    def matches(self, file_name):
+        return self.regex.match(file_name.lower()) is not None
+
+    def dialog_filter(self):
+        """Returns the patterns as a QFileDialog name filter list."""
+        return " ".join(self.patterns)
+
+
+def iter_media_files(folder, media_filter, recursive=True, cancelled=None):
+    """Yields the matching files below ``folder`` as they are found.
+
+    Uses ``os.scandir`` so file types come from the directory listing without a
+    stat per entry. Directory symlinks are not followed, unreadable directories
+    are skipped and entries are sorted by name within each directory.
+    """
+    folders = [folder]
+    while folders:
+        if cancelled is not None and cancelled.is_set():
+            return
+        current = folders.pop()
+        try:
+            with os.scandir(current) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subfolders = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append(entry.path)
+                elif entry.is_file() and media_filter.matches(entry.name):
+                    yield entry.path
+            except OSError:
+                continue
+        if recursive:
+            folders.extend(reversed(subfolders))  # Depth-first, in name order
+
+
+class FolderScan:
+    """Enumerates folders on a background thread and reports the files in batches.
+
+    ``on_files(scan, paths)`` is called from the scan thread with up to
+    ``batch_size`` paths, or fewer once ``batch_interval`` seconds have passed, so
+    the first files can be probed while a large tree is still being listed.
+    ``on_finished(scan, count)`` is called once when the scan ends or is cancelled.
+    """
+
+    def __init__(self, folders, media_filter, recursive=True, on_files=None, on_finished=None,
+                 batch_size=256, batch_interval=0.1):
+        self.folders = list(folders)
+        self.media_filter = media_filter
+        self.recursive = recursive
+        self.on_files = on_files
+        self.on_finished = on_finished
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.cancelled = threading.Event()
+        self.count = 0
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            for folder in self.folders:
+                for path in iter_media_files(folder, self.media_filter, self.recursive, self.cancelled):
+                    batch.append(path)
+                    now = time.monotonic()
+                    if len(batch) >= self.batch_size or now - last_flush >= self.batch_interval:
+                        self._flush(batch)
+                        batch = []
+                        last_flush = now
+            self._flush(batch)
+        finally:
+            if self.on_finished:
+                self.on_finished(self, self.count)
+
+    def _flush(self, batch):
+        if batch and not self.cancelled.is_set():
+            self.count += len(batch)
+            if self.on_files:
+                self.on_files(self, batch)
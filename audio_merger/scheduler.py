@@ -0,0 +1,166 @@
+"""Concurrency-limited job scheduler used to run merge jobs in parallel, and queue ordering."""
+
+import os
+from collections import deque
+
+QUEUE_FIFO = 'fifo'
+QUEUE_LONGEST_FIRST = 'longest'
+QUEUE_SHORTEST_FIRST = 'shortest'
+QUEUE_POLICIES = (QUEUE_FIFO, QUEUE_LONGEST_FIRST, QUEUE_SHORTEST_FIRST)
+
+
+def default_concurrency():
+    """Returns the default number of parallel jobs (one per CPU core)."""
+    return os.cpu_count() or 1
+
+
+def default_queue_policy(concurrency):
+    """Longest-first when jobs run in parallel, so no long job is left to run alone at the end."""
+    return QUEUE_LONGEST_FIRST if concurrency > 1 else QUEUE_FIFO
+
+
+def estimate_durations(jobs, duration_of, size_of=None):
+    """Returns job -> media seconds, estimating unknown durations from the file size.
+
+    Jobs without a probed duration are assumed to have the average bytes per
+    second of the jobs with one; ``size_of`` is only called for those jobs.
+    """
+    durations = {}
+    unknown = []
+    for job in jobs:
+        duration_sec = duration_of(job)
+        if duration_sec and duration_sec > 0:
+            durations[job] = duration_sec
+        else:
+            unknown.append(job)
+    if not unknown:
+        return durations
+    if size_of is None:
+        durations.update((job, 0.0) for job in unknown)
+        return durations
+    known_bytes = sum(size_of(job) or 0 for job in durations)
+    seconds_per_byte = sum(durations.values()) / known_bytes if known_bytes else 1.0
+    for job in unknown:
+        durations[job] = (size_of(job) or 0) * seconds_per_byte
+    return durations
+
+
+def order_jobs(jobs, policy, duration_of, size_of=None, priority_of=None):
+    """Returns the jobs in the order ``policy`` runs them.
+
+    Jobs with a higher ``priority_of(job)`` (pinned files) come first; within the
+    same priority the policy decides and ties keep their original order.
+    """
+    jobs = list(jobs)
+    if policy == QUEUE_FIFO:
+        keys = {job: 0 for job in jobs}
+    elif policy in (QUEUE_LONGEST_FIRST, QUEUE_SHORTEST_FIRST):
+        durations = estimate_durations(jobs, duration_of, size_of)
+        sign = -1 if policy == QUEUE_LONGEST_FIRST else 1
+        keys = {job: sign * durations[job] for job in jobs}
+    else:
+        raise ValueError(f"Unknown queue policy '{policy}', expected one of: {', '.join(QUEUE_POLICIES)}")
+    if priority_of is None:
+        return sorted(jobs, key=keys.__getitem__)
+    return sorted(jobs, key=lambda job: (-priority_of(job), keys[job]))  # sorted is stable
+
+
+class JobScheduler:
+    """Keeps at most ``concurrency`` jobs running and starts queued jobs as slots free up.
+
+    The scheduler does not run anything itself: ``start_job(job)`` is called when a
+    job gets a slot and the owner must report back through ``job_progress`` and
+    ``job_finished``. Jobs are pulled lazily from the source passed to ``run`` so at
+    most ``queue_size`` of them are waiting in memory at any time.
+    """
+
+    def __init__(self, start_job, concurrency=None, queue_size=None, on_batch_finished=None):
+        self.start_job = start_job
+        self.on_batch_finished = on_batch_finished
+        self.concurrency = max(1, concurrency or default_concurrency())
+        self.queue_size = max(1, queue_size or self.concurrency * 2)
+        self.pending = deque()
+        self.running = {}  # job -> current progress in percent
+        self.source = iter(())
+        self.total_jobs = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.stopped_jobs = 0  # Jobs stopped while running
+        self.stopped = False  # The batch was stopped
+        self._filling = False
+
+    @property
+    def finished_jobs(self):
+        return self.succeeded + self.failed + self.skipped + self.stopped_jobs
+
+    def is_active(self):
+        return bool(self.running or self.pending)
+
+    def run(self, jobs, total_jobs=None):
+        """Starts a new batch from an iterable of jobs."""
+        self.pending.clear()
+        self.running.clear()
+        self.source = iter(jobs)
+        self.total_jobs = total_jobs if total_jobs is not None else len(jobs)
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.stopped_jobs = 0
+        self.stopped = False
+        self._fill_slots()
+
+    def job_progress(self, job, percent):
+        if job in self.running:
+            self.running[job] = percent
+
+    def job_finished(self, job, success, skipped=False, stopped=False):
+        """Frees the slot of a job; ``skipped`` jobs (nothing to do) and ``stopped`` ones count separately."""
+        if self.running.pop(job, None) is None:
+            return
+        if skipped:
+            self.skipped += 1
+        elif stopped and not success:
+            self.stopped_jobs += 1
+        elif success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self._fill_slots()
+
+    def set_concurrency(self, concurrency):
+        """Changes the number of parallel jobs; running jobs above a lowered limit finish normally."""
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(self.queue_size, self.concurrency * 2)
+        if self.running or self.pending:
+            self._fill_slots()
+
+    def stop(self):
+        """Drops every queued job and returns the jobs that are still running."""
+        self.stopped = True
+        self.pending.clear()
+        self.source = iter(())
+        return list(self.running)
+
+    def _refill_queue(self):
+        while len(self.pending) < self.queue_size:
+            job = next(self.source, None)
+            if job is None:
+                break
+            self.pending.append(job)
+
+    def _fill_slots(self):
+        if self._filling:  # start_job reported back synchronously; the outer call continues
+            return
+        self._filling = True
+        try:
+            self._refill_queue()
+            while self.pending and len(self.running) < self.concurrency and not self.stopped:
+                job = self.pending.popleft()
+                self.running[job] = 0
+                self.start_job(job)
+                self._refill_queue()
+        finally:
+            self._filling = False
+        if not self.running and not self.pending and self.on_batch_finished:
+            self.on_batch_finished()
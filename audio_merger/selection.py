@@ -0,0 +1,110 @@
+"""Rule-based selection of audio streams, applied in bulk over probed files.
+
+A rule is a list of conditions on the probed stream metadata, for example
+``language=eng,jpn codec=aac`` or ``title!=commentary channels=2``. A stream is
+selected when it meets every condition; the comma-separated values of one
+condition are alternatives. ``title`` values are case-insensitive regular
+expressions, the other keys compare exactly (language and codec ignore case).
+"""
+
+import re
+
+RULE_KEYS = {
+    'index': 'index',
+    'language': 'language',
+    'lang': 'language',
+    'title': 'title',
+    'codec': 'codec',
+    'channels': 'channels',
+}
+SIGNATURE_FIELDS = ('index', 'codec', 'channels', 'channel_layout', 'language', 'title')
+
+CONDITION_PATTERN = re.compile(r"^(\w+)\s*(!?=)\s*(.*)$")
+
+
+class RuleError(ValueError):
+    """Raised for a channel selection rule that cannot be parsed."""
+
+
+class ChannelRule:
+    """Selects the audio streams whose metadata meets every condition of the rule."""
+
+    def __init__(self, conditions=()):
+        self.conditions = list(conditions)  # (key, test(stream) -> bool, negated)
+
+    def matches(self, stream):
+        return all(test(stream) != negated for _, test, negated in self.conditions)
+
+    def select(self, streams):
+        """Returns the indices of the matching streams."""
+        return [stream['index'] for stream in streams if self.matches(stream)]
+
+
+def parse_rule(text):
+    """Parses 'key=value[,value] key!=value ...' into a ChannelRule."""
+    conditions = []
+    for part in re.split(r"[;\s]+(?=\w+\s*!?=)", text.strip()):
+        if not part:
+            continue
+        match = CONDITION_PATTERN.match(part)
+        if not match or match.group(1).lower() not in RULE_KEYS:
+            raise RuleError(f"Invalid condition '{part}', expected one of: {', '.join(sorted(RULE_KEYS))}")
+        key = RULE_KEYS[match.group(1).lower()]
+        values = [value.strip() for value in match.group(3).split(',') if value.strip()]
+        if not values:
+            raise RuleError(f"Condition '{part}' has no value")
+        conditions.append((key, _condition_test(key, values), match.group(2) == '!='))
+    if not conditions:
+        raise RuleError("Empty channel selection rule")
+    return ChannelRule(conditions)
+
+
+def _condition_test(key, values):
+    if key in ('index', 'channels'):
+        try:
+            numbers = {int(value) for value in values}
+        except ValueError:
+            raise RuleError(f"'{key}' takes whole numbers, got '{','.join(values)}'") from None
+        return lambda stream: stream[key] in numbers
+    if key == 'title':
+        try:
+            regex = re.compile("|".join(f"(?:{value})" for value in values), re.IGNORECASE)
+        except re.error as e:
+            raise RuleError(f"Invalid title pattern: {e}") from None
+        return lambda stream: regex.search(stream['title'] or "") is not None
+    names = {value.lower() for value in values}
+    return lambda stream: (stream[key] or "").lower() in names
+
+
+def stream_signature(streams):
+    """Returns a hashable description of a file's audio stream layout."""
+    return tuple(tuple(stream[field] for field in SIGNATURE_FIELDS) for stream in streams)
+
+
+def group_by_signature(records):
+    """Groups records by identical stream layout.
+
+    Records are objects with ``audio_streams`` and their precomputed ``signature``
+    (see FileRecord), so grouping costs one dict lookup per file.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record.signature, []).append(record)
+    return groups
+
+
+def apply_rule(records, rule):
+    """Sets ``selected_channels`` of every record from the rule, deciding once per stream layout.
+
+    Returns ``(groups, unmatched)``: the number of distinct layouts and the number
+    of records left without any selected stream.
+    """
+    groups = group_by_signature(records)
+    unmatched = 0
+    for group in groups.values():
+        selection = rule.select(group[0].audio_streams)
+        for record in group:
+            record.selected_channels = list(selection)  # Records edit their selection in place
+        if not selection:
+            unmatched += len(group)
+    return len(groups), unmatched
@@ -0,0 +1,106 @@
+"""Output track settings: original streams copied next to the mix and the labels of the mix track.
+
+Keeping the originals in the merge itself reads the input once. Otherwise a
+second ffmpeg run would have to read the whole file again just to copy streams.
+The output holds the video, the mix (first audio track, marked default), then
+the kept audio, subtitle and data streams, all stream-copied with their own
+titles and languages.
+"""
+
+KEEP_SELECTED = 'selected'  # The streams that went into the mix
+KEEP_ALL = 'all'  # Every audio stream of the input
+KEEP_AUDIO_MODES = (KEEP_SELECTED, KEEP_ALL)
+
+
+class TrackSettings:
+    """Which original streams go into the output next to the mix, and how the mix is labelled.
+
+    ``keep_audio`` is None, 'selected', 'all' or a list of stream indices.
+    Subtitle and data streams are copied when they exist; note that Matroska
+    cannot store data streams. ``mix_title`` and ``mix_language`` (ISO 639-2,
+    e.g. 'eng') tag the merged track.
+    """
+
+    __slots__ = ('keep_audio', 'keep_subtitles', 'keep_data', 'mix_title', 'mix_language')
+
+    def __init__(self, keep_audio=None, keep_subtitles=False, keep_data=False, mix_title=None, mix_language=None):
+        if isinstance(keep_audio, str) and keep_audio not in KEEP_AUDIO_MODES:
+            raise ValueError(f"Unknown audio keep mode '{keep_audio}', expected one of: "
+                             f"{', '.join(KEEP_AUDIO_MODES)} or stream indices")
+        self.keep_audio = [int(index) for index in keep_audio] if isinstance(keep_audio, (list, tuple)) \
+            else keep_audio or None
+        self.keep_subtitles = bool(keep_subtitles)
+        self.keep_data = bool(keep_data)
+        self.mix_title = mix_title or None
+        self.mix_language = mix_language or None
+
+    def kept_audio(self, selected_channels, audio_streams):
+        """Returns the indices of the original audio streams to copy, in input order.
+
+        Raises ValueError when explicit indices are not audio streams of the input.
+        """
+        if self.keep_audio == KEEP_SELECTED:
+            return sorted(selected_channels)
+        if self.keep_audio == KEEP_ALL:
+            return sorted(audio_streams)
+        missing = sorted(set(self.keep_audio or []) - set(audio_streams))
+        if missing:
+            raise ValueError(f"Stream(s) {', '.join(map(str, missing))} to keep are not audio streams of the input "
+                             f"(audio streams: {', '.join(map(str, sorted(audio_streams))) or 'none'})")
+        return sorted(self.keep_audio or [])
+
+    def keeps_streams(self):
+        return bool(self.keep_audio or self.keep_subtitles or self.keep_data)
+
+    def is_default(self):
+        return not self.keeps_streams() and not self.mix_title and not self.mix_language
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def describe(self):
+        """Returns a 'keep_audio=all keep_subtitles mix_title=Mix' summary for logs."""
+        parts = []
+        if self.keep_audio:
+            keep_audio = self.keep_audio if isinstance(self.keep_audio, str) else ",".join(map(str, self.keep_audio))
+            parts.append(f"keep_audio={keep_audio}")
+        if self.keep_subtitles:
+            parts.append("keep_subtitles")
+        if self.keep_data:
+            parts.append("keep_data")
+        if self.mix_title:
+            parts.append(f"mix_title={self.mix_title}")
+        if self.mix_language:
+            parts.append(f"mix_language={self.mix_language}")
+        return " ".join(parts) or "mix only"
+
+
+def build_track_args(job, kept_audio, input_index=0):
+    """Returns the ffmpeg options mapping and tagging the output tracks that follow the mix.
+
+    The mix must be the first output audio stream. Kept audio is copied stream by
+    stream (``-c:a:N copy``), so the mix's codec options must target ``a:0``.
+    """
+    tracks = job.tracks
+    args = []
+    for index in kept_audio:
+        args += ["-map", f"{input_index}:{index}"]
+    if tracks.keep_subtitles:
+        args += ["-map", f"{input_index}:s?"]  # '?': inputs without subtitles are fine
+    if tracks.keep_data:
+        args += ["-map", f"{input_index}:d?"]
+    for position in range(1, len(kept_audio) + 1):
+        args += [f"-c:a:{position}", "copy"]
+    if tracks.keep_subtitles:
+        args += ["-c:s", "copy"]
+    if tracks.keep_data:
+        args += ["-c:d", "copy"]
+    if tracks.mix_title:
+        args += ["-metadata:s:a:0", f"title={tracks.mix_title}"]
+    if tracks.mix_language:
+        args += ["-metadata:s:a:0", f"language={tracks.mix_language}"]
+    if kept_audio:
+        args += ["-disposition:a:0", "default"]  # Players pick the mix, not a copied original
+        for position in range(1, len(kept_audio) + 1):
+            args += [f"-disposition:a:{position}", "0"]
+    return args
@@ -0,0 +1,54 @@
+"""Small helpers shared by the audio_merger modules."""
+
+import math
+import os
+import subprocess
+
+APP_NAME = "ffmpeg-audio-merger"
+
+
+def hidden_startupinfo():
+    """Returns a STARTUPINFO that hides the console window on Windows, None elsewhere."""
+    if os.name != 'nt':
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # Hide CMD window
+    return startupinfo
+
+
+def user_cache_dir():
+    """Returns the per-user cache directory of the application (not created)."""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser("~")
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_NAME)
+
+
+def file_size(file_path):
+    """Returns the size of a file in bytes, 0 when it cannot be read."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def parse_time(text):
+    """Parses a position such as '90', '1:30' or '01:02:03.5' into seconds.
+
+    Every component must be a finite, non-negative number; minutes and seconds
+    after the first component must be below 60.
+    """
+    parts = text.strip().split(':')
+    try:
+        if len(parts) > 3:
+            raise ValueError
+        seconds = 0.0
+        for position, part in enumerate(parts):
+            value = float(part)
+            if part.strip().startswith(('-', '+')) or not math.isfinite(value) or (position and value >= 60):
+                raise ValueError
+            seconds = seconds * 60 + value
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}', expected seconds or [HH:]MM:SS such as '1:30'") from None
+    return seconds
@@ -0,0 +1,56 @@
+from audio_merger.encoding import EncoderSettings
+from audio_merger.engine import default_output_path, segment_duration
+from audio_merger.filtergraph import FilterGraphBuilder
+from audio_merger.mixing import LOUDNESS_LOUDNORM, MixSettings
+
+
+def test_single_stream_is_mapped_directly():
+    assert FilterGraphBuilder([1]).build() == (None, [None])
+
+
+def test_two_streams_are_mixed():
+    graph, labels = FilterGraphBuilder([1, 2]).build()
+    assert graph == "[0:1][0:2]amix=inputs=2:duration=longest[a]"
+    assert labels == ['a']
+
+
+def test_gains_weights_and_amix_options():
+    mix = MixSettings(gains={1: -6}, weights={2: 0.5}, normalize=False, dropout_transition=0.5)
+    graph, _ = FilterGraphBuilder([1, 2], mix).build()
+    assert graph == ("[0:1]volume=-6.0dB[g0];"
+                     "[g0][0:2]amix=inputs=2:duration=longest:weights=1 0.5:normalize=0:dropout_transition=0.5[a]")
+
+
+def test_single_stream_gain_is_inline():
+    graph, labels = FilterGraphBuilder([2], MixSettings(gains={2: 3})).build()
+    assert graph == "[0:2]volume=3.0dB[a]"
+
+
+def test_loudnorm_resamples_to_the_encoder_rate():
+    mix = MixSettings(loudness=LOUDNESS_LOUDNORM, loudness_target=-16)
+    graph, _ = FilterGraphBuilder([1], mix).build([EncoderSettings(sample_rate=44100)])
+    assert graph == "[0:1]loudnorm=I=-16:TP=-1:LRA=11,aresample=44100,aformat=sample_rates=44100[a]"
+
+
+def test_several_outputs_split_one_mix():
+    encoders = [EncoderSettings(), EncoderSettings(sample_rate=48000)]
+    graph, labels = FilterGraphBuilder([1, 2], input_index=1).build(encoders)
+    assert graph == ("[1:1][1:2]amix=inputs=2:duration=longest,asplit=2[a0][s1];"
+                     "[s1]aformat=sample_rates=48000[a1]")
+    assert labels == ['a0', 'a1']
+
+
+def test_single_stream_outputs_without_filters_map_directly():
+    graph, labels = FilterGraphBuilder([1]).build([EncoderSettings(), EncoderSettings(channel_layout='stereo')])
+    assert graph == "[0:1]aformat=channel_layouts=stereo[a1]"
+    assert labels == [None, 'a1']
+
+
+def test_segment_output_names_and_durations():
+    assert default_output_path("/in/a.mkv", "/out") == "/out/a_merged.mkv"
+    assert default_output_path("/in/a.mkv", "/out", 'wav', 60, 90) == "/out/a_merged_60s-90s.wav"
+    assert default_output_path("/in/a.mkv", "/out", 'mkv', 0, None) == "/out/a_merged.mkv"
+    assert default_output_path("/in/a.mkv", "/out", 'mkv', 30, None) == "/out/a_merged_30s-end.mkv"
+    assert segment_duration(100.0, 30.0, None) == 70.0
+    assert segment_duration(100.0, 90.0, 200.0) == 10.0
+    assert segment_duration(100.0, 150.0, None) == 0.0
@@ -0,0 +1,67 @@
+from audio_merger.engine import MergeJob
+from audio_merger.journal import JobJournal, job_signature
+from audio_merger.mixing import MixSettings
+from audio_merger.tracks import TrackSettings
+
+
+def make_job(tmp_path, **options):
+    input_file = tmp_path / "in.mkv"
+    if not input_file.exists():
+        input_file.write_bytes(b"input")
+    return MergeJob(str(input_file), str(tmp_path / "out.mkv"), [1, 2], 60.0, **options)
+
+
+def complete(journal, job, data=b"output"):
+    with open(job.output_file, 'wb') as f:
+        f.write(data)
+    journal.record_completed(job)
+
+
+def test_default_settings_leave_out_the_optional_keys(tmp_path):
+    signature = job_signature(make_job(tmp_path))
+    assert not {'mix', 'tracks', 'segment', 'audio_only'} & set(signature)
+
+
+def test_completed_output_is_reused_with_the_same_settings(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.jsonl"))
+    job = make_job(tmp_path)
+    complete(journal, job)
+    assert journal.is_complete(make_job(tmp_path))
+    assert JobJournal(journal.journal_file).is_complete(make_job(tmp_path))  # Reloaded from disk
+
+
+def test_mix_settings_default_then_gain_then_default(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.jsonl"))
+    complete(journal, make_job(tmp_path))
+    gained = make_job(tmp_path, mix=MixSettings(gains={1: -20}))
+    assert not journal.is_complete(gained)
+    complete(journal, gained, b"gained output")
+    assert journal.is_complete(gained)
+    assert not journal.is_complete(make_job(tmp_path))  # The gained file must not pass for a default run
+
+
+def test_optional_keys_of_other_settings(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.jsonl"))
+    for options in ({'tracks': TrackSettings('all')}, {'start_sec': 10.0, 'end_sec': 20.0}, {'audio_only': True}):
+        job = make_job(tmp_path, **options)
+        complete(journal, job)
+        assert journal.is_complete(make_job(tmp_path, **options))
+        assert not journal.is_complete(make_job(tmp_path)), options
+
+
+def test_changed_or_missing_output_is_not_complete(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.jsonl"))
+    job = make_job(tmp_path)
+    complete(journal, job)
+    with open(job.output_file, 'wb') as f:
+        f.write(b"OUTPUT")  # Same size, other content
+    assert not journal.is_complete(job)
+    assert JobJournal(journal.journal_file, verify_outputs=False).is_complete(job)  # Incremental mode: size only
+    (tmp_path / "out.mkv").unlink()
+    assert not journal.is_complete(job)
+
+
+def test_start_of_zero_is_no_segment(tmp_path):
+    job = make_job(tmp_path, start_sec=0)
+    assert not job.has_segment()
+    assert 'segment' not in job_signature(job)
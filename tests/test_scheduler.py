@@ -0,0 +1,50 @@
+from audio_merger.scheduler import (
+    QUEUE_FIFO, QUEUE_LONGEST_FIRST, QUEUE_SHORTEST_FIRST, JobScheduler, estimate_durations, order_jobs
+)
+
+DURATIONS = {'a': 30.0, 'b': 120.0, 'c': 60.0, 'd': 60.0}
+
+
+def test_fifo_keeps_the_given_order():
+    assert order_jobs('abcd', QUEUE_FIFO, DURATIONS.get) == list('abcd')
+
+
+def test_longest_and_shortest_first_keep_ties_in_order():
+    assert order_jobs('abcd', QUEUE_LONGEST_FIRST, DURATIONS.get) == list('bcda')
+    assert order_jobs('abcd', QUEUE_SHORTEST_FIRST, DURATIONS.get) == list('acdb')
+
+
+def test_priority_comes_before_the_policy():
+    priority = {'a': 1}
+    assert order_jobs('abcd', QUEUE_LONGEST_FIRST, DURATIONS.get,
+                      priority_of=lambda job: priority.get(job, 0)) == list('abcd')
+
+
+def test_unknown_durations_are_estimated_from_the_size():
+    durations = {'a': 10.0, 'b': None}
+    sizes = {'a': 1000, 'b': 3000}
+    assert estimate_durations('ab', durations.get, sizes.get) == {'a': 10.0, 'b': 30.0}
+    assert order_jobs('ab', QUEUE_LONGEST_FIRST, durations.get, sizes.get) == ['b', 'a']
+
+
+def test_unknown_policy_is_rejected():
+    try:
+        order_jobs('ab', 'random', DURATIONS.get)
+    except ValueError as e:
+        assert "random" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_scheduler_counts_skipped_stopped_and_failed_jobs():
+    started = []
+    scheduler = JobScheduler(started.append, concurrency=2)
+    scheduler.run(range(4))
+    assert started == [0, 1]
+    scheduler.job_finished(0, True)
+    scheduler.job_finished(1, False, skipped=True)
+    assert started == [0, 1, 2, 3]
+    scheduler.job_finished(2, False, stopped=True)
+    scheduler.job_finished(3, False)
+    assert (scheduler.succeeded, scheduler.skipped, scheduler.stopped_jobs, scheduler.failed) == (1, 1, 1, 1)
+    assert not scheduler.is_active()
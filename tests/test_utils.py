@@ -0,0 +1,19 @@
+import pytest
+
+from audio_merger.utils import parse_time
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("90", 90.0),
+    ("1:30", 90.0),
+    ("01:02:03.5", 3723.5),
+    (" 0 ", 0.0),
+])
+def test_parse_time(text, seconds):
+    assert parse_time(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["", "1::2", ":5", "1:2:3:4", "a", "-3", "1:-5", "+5", "1:75", "inf", "nan", "1e400"])
+def test_parse_time_rejects_invalid_positions(text):
+    with pytest.raises(ValueError):
+        parse_time(text)